@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the warm worker pool.
+Runs the same jobs (each scoring slices of one long text on quadgrams)
+on a fresh ProcessPoolExecutor per job, as run_tasks does, and on one
+WarmPool, then reports the per-task overhead over in-process scoring.
+
+Run: python -m benchmarks.bench_pool [--jobs N] [--tasks N]
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ciphers.analysis.english import REFERENCE_TEXT
+from ciphers.analysis.fitness import english_scorer
+from ciphers.analysis.pool import WarmPool
+
+
+def score_slice(text: str, start: int, stop: int) -> float:
+    return english_scorer(4).score(text[start:stop])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=10, help='searches to run')
+    parser.add_argument('--tasks', type=int, default=64, help='tasks per search')
+    parser.add_argument('--slice', type=int, default=2000, help='characters scored per task')
+    parser.add_argument('--copies', type=int, default=200, help='reference text copies in the input')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    text = REFERENCE_TEXT * args.copies
+    step = max(1, (len(text) - args.slice) // args.tasks)
+    tasks = [(text, i * step, i * step + args.slice) for i in range(args.tasks)]
+    total = args.jobs * args.tasks
+    print(f"{args.jobs} jobs x {args.tasks} tasks, input {len(text) / 1e6:.1f} MB")
+
+    english_scorer(4)
+    t0 = time.perf_counter()
+    expected = [score_slice(*task) for task in tasks]
+    compute = (time.perf_counter() - t0) * args.jobs
+    print(f"in-process      {compute:7.2f}s")
+
+    t0 = time.perf_counter()
+    for _ in range(args.jobs):
+        with ProcessPoolExecutor(args.workers) as pool:
+            results = list(pool.map(score_slice, *zip(*tasks)))
+    fresh = time.perf_counter() - t0
+    assert results == expected
+
+    t0 = time.perf_counter()
+    with WarmPool(args.workers, share_scorers=(4,)) as pool:
+        # Shared once for every job; map() alone would share it per call
+        ref = pool.share(text)
+        for _ in range(args.jobs):
+            results = list(pool.map(score_slice, [(ref,) + task[1:] for task in tasks]))
+    warm = time.perf_counter() - t0
+    assert results == expected
+
+    for name, elapsed in (('fresh pool', fresh), ('warm pool', warm)):
+        overhead = max(0.0, elapsed - compute) / total
+        print(f"{name:<15} {elapsed:7.2f}s  {overhead * 1e3:7.3f} ms/task overhead")
+
+
+if __name__ == '__main__':
+    main()
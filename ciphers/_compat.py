@@ -0,0 +1,17 @@
+"""
+Optional dependency handling.
+The cipher modules only need the standard library; NumPy speeds up the
+bulk and analysis tools when it is installed.
+"""
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - depends on the environment
+    numpy = None
+
+
+def require_numpy(feature: str):
+    """Return the numpy module or raise a helpful ImportError."""
+    if numpy is None:
+        raise ImportError(f"{feature} requires NumPy (pip install numpy)")
+    return numpy
@@ -0,0 +1,34 @@
+"""
+ADFGX cipher implementation.
+The 5x5 predecessor of ADFGVX: letters are replaced by their row and
+column in a keyed Polybius square (I and J share a cell), written as the
+letters ADFGX, followed by a columnar transposition.
+"""
+
+from .fractionation import compile_grid, fractionated_columnar
+
+
+def encrypt(plaintext: str, polybius_key: str = '', columnar_key: str = '') -> str:
+    """
+    Encrypt text using ADFGX cipher.
+
+    Args:
+        plaintext: Text to encrypt
+        polybius_key: Optional key for Polybius square arrangement
+        columnar_key: Key for columnar transposition
+    """
+    return fractionated_columnar(plaintext, compile_grid('5x5', polybius_key), 'ADFGX',
+                                 columnar_key)
+
+
+def decrypt(ciphertext: str, polybius_key: str = '', columnar_key: str = '') -> str:
+    """
+    Decrypt text using ADFGX cipher.
+
+    Args:
+        ciphertext: Text to decrypt
+        polybius_key: Optional key for Polybius square arrangement
+        columnar_key: Key for columnar transposition
+    """
+    return fractionated_columnar(ciphertext, compile_grid('5x5', polybius_key), 'ADFGX',
+                                 columnar_key, decrypt=True)
@@ -0,0 +1,28 @@
+"""
+Cryptanalysis tools for the classic ciphers in this package.
+Includes n-gram fitness scoring and corpus statistics, transposition
+key search, an ADFGVX solver, an Autokey primer solver, cipher-type
+identification, a wordlist key attack, multi-key batch evaluation,
+crib dragging, distributed key search, a keyed substitution solver, a
+warm shared-memory worker pool, anytime (budgeted) solvers and a
+key-depth index for ciphertext archives.
+"""
+
+from . import adfgvx
+from . import autokey
+from . import corpus
+from . import cribs
+from . import depth
+from . import dictionary
+from . import distributed
+from . import fitness
+from . import identify
+from . import multikey
+from . import pool
+from . import solvers
+from . import substitution
+from . import transposition
+
+__all__ = ['adfgvx', 'autokey', 'corpus', 'cribs', 'depth', 'dictionary',
+           'distributed', 'fitness', 'identify', 'multikey', 'pool', 'solvers',
+           'substitution', 'transposition']
@@ -0,0 +1,271 @@
+"""
+Two-stage cryptanalysis of the ADFGVX cipher.
+Stage one recovers the columnar transposition order by how well each
+candidate order pairs the ADFGVX symbols into a monoalphabetic-looking
+digraph distribution. Stage two solves the resulting 36-symbol
+substitution by hill climbing the Polybius square on n-gram fitness.
+"""
+
+import heapq
+import itertools
+import random
+import string
+
+from .fitness import Candidate, choose_scorer
+from .parallel import ProgressTracker, run_tasks
+from .transposition import columnar_gather, order_to_key
+from ..adfgvx import create_polybius_square
+
+SYMBOLS = 'ADFGVX'
+SQUARE_CHARS = string.ascii_uppercase + string.digits
+# Most common English letters first, used to seed the substitution solve
+_ENGLISH_ORDER = 'ETAOINSHRDLCUMWFGYPBVKJXQZ' + string.digits
+
+
+def _symbol_codes(ciphertext: str) -> list[int]:
+    return [SYMBOLS.index(c) for c in ciphertext.upper() if c in SYMBOLS]
+
+
+def _digraphs(symbols) -> list[int]:
+    """Pair consecutive symbols into Polybius cell numbers 0-35."""
+    return [symbols[i] * 6 + symbols[i + 1] for i in range(0, len(symbols) - 1, 2)]
+
+
+def _ioc(values, size: int) -> float:
+    counts = [0] * size
+    for value in values:
+        counts[value] += 1
+    n = len(values)
+    if n < 2:
+        return 0.0
+    return sum(c * (c - 1) for c in counts) / (n * (n - 1))
+
+
+def digraph_score(cells: list[int]) -> float:
+    """
+    How much a sequence of Polybius cells looks like a monoalphabetic
+    substitution of English: the IoC of the cells plus the IoC of
+    consecutive cell pairs. Orders that only shuffle whole symbol pairs
+    within a row tie on the first term, the second separates them.
+    Both terms are scaled so random text scores about 1 each.
+    """
+    pairs = [cells[i] * 36 + cells[i + 1] for i in range(len(cells) - 1)]
+    return _ioc(cells, 36) * 36 + _ioc(pairs, 36 * 36) * 36 * 36 / 8
+
+
+def _order_score(symbols: list[int], order: tuple[int, ...]) -> float:
+    gather = columnar_gather(order, len(symbols))
+    return digraph_score(_digraphs([symbols[i] for i in gather]))
+
+
+def _order_exhaustive_task(ciphertext: str, num_cols: int, first: int,
+                           top: int) -> tuple[list[tuple[float, tuple]], int]:
+    """Score every column order of num_cols starting with column first."""
+    symbols = _symbol_codes(ciphertext)
+    best = []
+    evaluated = 0
+    rest = [c for c in range(num_cols) if c != first]
+    for tail in itertools.permutations(rest):
+        order = (first,) + tail
+        item = (_order_score(symbols, order), order)
+        evaluated += 1
+        if len(best) < top:
+            heapq.heappush(best, item)
+        elif item > best[0]:
+            heapq.heapreplace(best, item)
+    return best, evaluated
+
+
+def _order_climb_task(ciphertext: str, num_cols: int, seed: int,
+                      iterations: int) -> tuple[list[tuple[float, tuple]], int]:
+    """One hill-climbing restart over column orders of length num_cols."""
+    rng = random.Random(seed)
+    symbols = _symbol_codes(ciphertext)
+    order = list(range(num_cols))
+    rng.shuffle(order)
+    best_order = tuple(order)
+    best_score = _order_score(symbols, best_order)
+    evaluated = 1
+    for _ in range(iterations):
+        i, j = sorted(rng.sample(range(num_cols), 2))
+        trial = list(best_order)
+        if rng.random() < 0.6:
+            trial[i], trial[j] = trial[j], trial[i]
+        else:
+            trial[i:j + 1] = reversed(trial[i:j + 1])
+        trial = tuple(trial)
+        score = _order_score(symbols, trial)
+        evaluated += 1
+        if score > best_score:
+            best_order, best_score = trial, score
+    return [(best_score, best_order)], evaluated
+
+
+def order_tasks(ciphertext: str, min_key_length: int = 2, max_key_length: int = 10,
+                exhaustive_limit: int = 7, restarts: int = 20, iterations: int = 1500,
+                top: int = 3, seed: int | None = None):
+    """
+    Split the stage one search into (exhaustive, climb) task argument lists
+    for _order_exhaustive_task and _order_climb_task.
+    """
+    symbols = _symbol_codes(ciphertext)
+    if len(symbols) < 4 or len(symbols) % 2:
+        raise ValueError("ADFGVX ciphertext must have an even number of ADFGVX symbols")
+    text = ''.join(SYMBOLS[s] for s in symbols)
+    rng = random.Random(seed)
+    exhaustive, climbs = [], []
+    for num_cols in range(max(2, min_key_length), min(max_key_length, len(symbols)) + 1):
+        if num_cols <= exhaustive_limit:
+            exhaustive += [(text, num_cols, first, top) for first in range(num_cols)]
+        else:
+            climbs += [(text, num_cols, rng.getrandbits(32), iterations)
+                       for _ in range(restarts)]
+    return exhaustive, climbs
+
+
+def recover_column_orders(ciphertext: str, min_key_length: int = 2,
+                          max_key_length: int = 10, exhaustive_limit: int = 7,
+                          restarts: int = 20, iterations: int = 1500, top: int = 3,
+                          seed: int | None = None, workers: int | None = None,
+                          progress=None) -> list[tuple[float, tuple[int, ...]]]:
+    """
+    Stage one: rank transposition column orders by digraph statistics.
+
+    Returns (score, order) pairs, best first. Only key lengths that leave
+    an even number of symbols per Polybius pair are meaningful, so the
+    ciphertext must have an even length.
+    """
+    exhaustive, climbs = order_tasks(ciphertext, min_key_length, max_key_length,
+                                     exhaustive_limit, restarts, iterations, top, seed)
+    tracker = ProgressTracker('column order', len(exhaustive) + len(climbs), progress)
+    ranked = {}
+    for func, tasks in ((_order_exhaustive_task, exhaustive), (_order_climb_task, climbs)):
+        for best, evaluated in run_tasks(func, tasks, workers):
+            for score, order in best:
+                ranked[order] = score
+            tracker.update(evaluated, max((s for s, _ in best), default=float('-inf')))
+    return heapq.nlargest(top, ((s, o) for o, s in ranked.items()))
+
+
+def order_cells(ciphertext: str, order: tuple[int, ...]) -> list[int]:
+    """Undo the transposition for a column order and pair symbols into cells 0-35."""
+    symbols = _symbol_codes(ciphertext)
+    gather = columnar_gather(order, len(symbols))
+    return _digraphs([symbols[i] for i in gather])
+
+
+def _decode(cells: list[int], square: list[int]) -> list[int]:
+    return [square[c] for c in cells]
+
+
+def _square_text(square: list[int]) -> str:
+    return ''.join(SQUARE_CHARS[c] for c in square)
+
+
+def _fitness(scorer, codes: list[int]) -> float:
+    """
+    N-gram fitness of decoded cells. Digits are dropped before scoring but
+    each one costs more than any n-gram it removed, so the climb cannot
+    improve its score by mapping common cells to digits.
+    """
+    letters = [c for c in codes if c < 26]
+    penalty = scorer.floor * scorer.n * (len(codes) - len(letters))
+    return scorer.score_codes(letters) + penalty
+
+
+def _substitution_climb_task(cells: list[int], seed: int,
+                             iterations: int) -> tuple[Candidate, int]:
+    """One hill-climbing restart solving the 36-cell substitution."""
+    rng = random.Random(seed)
+    scorer = choose_scorer(len(cells))
+
+    # Seed by frequency rank, then perturb so restarts explore differently
+    counts = [0] * 36
+    for cell in cells:
+        counts[cell] += 1
+    by_freq = sorted(range(36), key=lambda c: -counts[c])
+    square = [0] * 36
+    for rank, cell in enumerate(by_freq):
+        square[cell] = SQUARE_CHARS.index(_ENGLISH_ORDER[rank])
+    used = [c for c in by_freq if counts[c]]
+    for _ in range(len(used) // 3):
+        a, b = rng.sample(used, 2) if len(used) > 1 else (used[0], used[0])
+        square[a], square[b] = square[b], square[a]
+
+    best_score = _fitness(scorer, _decode(cells, square))
+    evaluated = 1
+    stale = 0
+    for _ in range(iterations):
+        a = rng.choice(used)
+        b = rng.randrange(36)
+        if a == b:
+            continue
+        square[a], square[b] = square[b], square[a]
+        score = _fitness(scorer, _decode(cells, square))
+        evaluated += 1
+        if score > best_score:
+            best_score = score
+            stale = 0
+        else:
+            square[a], square[b] = square[b], square[a]
+            stale += 1
+            if stale > iterations // 3:
+                break
+
+    # Cell number = row * 6 + col indexes straight into the Polybius square
+    plaintext = ''.join(SQUARE_CHARS[c] for c in _decode(cells, square))
+    return Candidate(best_score, _square_text(square), plaintext), evaluated
+
+
+def solve_substitution(cells: list[int], restarts: int = 8, iterations: int = 6000,
+                       seed: int | None = None, workers: int | None = None,
+                       progress=None) -> Candidate:
+    """
+    Stage two: recover the Polybius square for a sequence of cells 0-35.
+    Returns the best Candidate whose key is the 36-character square.
+    """
+    rng = random.Random(seed)
+    tasks = [(cells, rng.getrandbits(32), iterations) for _ in range(restarts)]
+    tracker = ProgressTracker('substitution', len(tasks), progress)
+    best = None
+    for cand, evaluated in run_tasks(_substitution_climb_task, tasks, workers):
+        tracker.update(evaluated, cand.score)
+        if best is None or cand.score > best.score:
+            best = cand
+    return best
+
+
+def crack(ciphertext: str, min_key_length: int = 2, max_key_length: int = 10,
+          orders: int = 2, restarts: int = 8, iterations: int = 6000,
+          seed: int | None = None, workers: int | None = None,
+          progress=None) -> list[Candidate]:
+    """
+    Break an ADFGVX ciphertext and return ranked candidates.
+
+    Each Candidate key is a (polybius_square, columnar_key) tuple that can
+    be passed straight to adfgvx.encrypt to reproduce the ciphertext.
+
+    Args:
+        ciphertext: ADFGVX ciphertext
+        min_key_length: Shortest transposition key length to try
+        max_key_length: Longest transposition key length to try
+        orders: Number of best column orders carried into stage two
+        restarts: Hill-climbing restarts for the substitution solve
+        iterations: Maximum swaps per substitution restart
+        seed: Seed for reproducible searches
+        workers: Worker processes (defaults to the CPU count)
+        progress: Optional callback receiving Progress snapshots
+    """
+    rng = random.Random(seed)
+    ranked = recover_column_orders(ciphertext, min_key_length, max_key_length,
+                                   top=orders, seed=rng.getrandbits(32),
+                                   workers=workers, progress=progress)
+    results = []
+    for _, order in ranked:
+        cells = order_cells(ciphertext, order)
+        cand = solve_substitution(cells, restarts, iterations, rng.getrandbits(32),
+                                  workers, progress)
+        square = create_polybius_square(cand.key)
+        results.append(Candidate(cand.score, (square, order_to_key(order)), cand.plaintext))
+    results.sort(reverse=True)
+    return results
@@ -0,0 +1,127 @@
+"""
+Primer recovery for the Autokey cipher.
+With a primer of length k, plaintext letter i is decrypted with the key
+letter k positions earlier, so each primer letter only decides one chain
+of every k-th letter. Along a chain the plaintext alternates:
+p[t] = c[t] - c[t-1] + c[t-2] - ... -/+ primer[j], so all 26 choices of
+one primer letter decrypt with a single vectorized expression. The
+solver starts from the best primer letter per chain by letter frequency,
+then sweeps the primer one position at a time on n-gram fitness.
+"""
+
+import heapq
+import random
+
+from .english import LETTER_FREQUENCIES
+from .fitness import Candidate, choose_scorer, letter_codes
+from .parallel import ProgressTracker, run_tasks
+from .._compat import numpy as np, require_numpy
+
+
+def chain_terms(codes, length: int):
+    """
+    Decompose an Autokey decryption with a primer of the given length.
+    Returns (base, sign) with plaintext[i] == (base[i] - sign[i] *
+    primer[i % length]) % 26 for every letter i.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    base = np.empty_like(codes)
+    sign = np.empty_like(codes)
+    for j in range(length):
+        chain = codes[j::length]
+        s = np.where(np.arange(len(chain)) % 2, -1, 1)
+        base[j::length] = s * np.cumsum(s * chain) % 26
+        sign[j::length] = s
+    return base, sign
+
+
+def decrypt_rows(base, sign, primers):
+    """Decrypt under a (R, k) array of primer codes; returns (R, N) codes."""
+    primers = np.asarray(primers, dtype=np.int64)
+    columns = np.arange(len(base)) % primers.shape[1]
+    return (base[None, :] - sign[None, :] * primers[:, columns]) % 26
+
+
+def _frequency_start(base, sign, length: int):
+    """Best primer letter for each chain judged by single-letter frequencies alone."""
+    log_freq = np.log10(np.asarray(LETTER_FREQUENCIES) / 100)
+    letters = np.arange(26)[:, None]
+    primer = []
+    for j in range(length):
+        chain = (base[None, j::length] - sign[None, j::length] * letters) % 26
+        primer.append(int(np.argmax(log_freq[chain].sum(axis=1))))
+    return primer
+
+
+def _primer_climb_task(ciphertext: str, length: int, seed: int, sweeps: int,
+                       perturb: bool) -> tuple[Candidate, int]:
+    """One restart: optionally perturb the frequency start, then sweep primer positions."""
+    rng = random.Random(seed)
+    codes = letter_codes(ciphertext)
+    scorer = choose_scorer(len(codes))
+    base, sign = chain_terms(codes, length)
+    primer = _frequency_start(base, sign, length)
+    if perturb:
+        for j in rng.sample(range(length), max(length // 3, 1)):
+            primer[j] = rng.randrange(26)
+
+    best_score = float('-inf')
+    evaluated = 0
+    trials = np.empty((26, length), dtype=np.int64)
+    for _ in range(sweeps):
+        changed = False
+        for j in rng.sample(range(length), length):
+            trials[:] = primer
+            trials[:, j] = np.arange(26)
+            scores = scorer.score_rows(decrypt_rows(base, sign, trials))
+            evaluated += 26
+            best = int(np.argmax(scores))
+            if scores[best] > best_score + 1e-9:
+                changed = changed or best != primer[j]
+                primer[j] = best
+                best_score = float(scores[best])
+        if not changed:
+            break
+
+    plain = decrypt_rows(base, sign, [primer])[0]
+    return Candidate(best_score, ''.join(chr(c + 65) for c in primer),
+                     ''.join(chr(c + 65) for c in plain)), evaluated
+
+
+def crack(ciphertext: str, min_length: int = 1, max_length: int = 12,
+          restarts: int = 8, sweeps: int = 10, top: int = 5,
+          seed: int | None = None, workers: int | None = None,
+          progress=None) -> list[Candidate]:
+    """
+    Recover the Autokey primer and return ranked candidates.
+
+    Each Candidate key is a primer that autokey.decrypt accepts; the
+    plaintext covers the letters of the ciphertext.
+
+    Args:
+        ciphertext: Autokey ciphertext (letters only are considered)
+        min_length: Shortest primer length to try
+        max_length: Longest primer length to try
+        restarts: Restarts per primer length
+        sweeps: Maximum passes over the primer positions per restart
+        top: Number of ranked candidates to return
+        seed: Seed for reproducible searches
+        workers: Worker processes (defaults to the CPU count)
+        progress: Optional callback receiving Progress snapshots
+    """
+    require_numpy('Autokey primer recovery')
+    text = ''.join(chr(c + 65) for c in letter_codes(ciphertext))
+    if len(text) < 4:
+        raise ValueError("Ciphertext too short to crack")
+    rng = random.Random(seed)
+    # The first restart of each length keeps the frequency start unperturbed
+    tasks = [(text, length, rng.getrandbits(32), sweeps, r > 0)
+             for length in range(max(1, min_length), min(max_length, len(text) - 1) + 1)
+             for r in range(restarts)]
+    tracker = ProgressTracker('primer', len(tasks), progress)
+    unique = {}
+    for cand, evaluated in run_tasks(_primer_climb_task, tasks, workers):
+        tracker.update(evaluated, cand.score)
+        if cand.key not in unique or cand.score > unique[cand.key].score:
+            unique[cand.key] = cand
+    return heapq.nlargest(top, unique.values())
@@ -0,0 +1,180 @@
+"""
+N-gram statistics from local text corpora.
+Memory-maps arbitrarily large text files, normalizes them the way the
+ciphers see text, counts 1- to 4-grams with NumPy bincount over chunks
+of the corpus in parallel processes, merges the partial counts and
+writes each table as a compact .npz of float32 log10 probabilities.
+
+Profiles:
+    letters   A-Z (case folded, everything else dropped)
+    playfair  A-Z with J merged into I
+    adfgvx    A-Z and 0-9 (base-36 n-gram codes)
+
+Run: python -m ciphers.analysis.corpus CORPUS... --out DIR [--profile P]
+"""
+
+import argparse
+import mmap
+import os
+import time
+
+from .fitness import NgramScorer
+from .parallel import run_tasks
+from .._compat import numpy as np, require_numpy
+
+PROFILES = {'letters': 26, 'playfair': 26, 'adfgvx': 36}
+_DROP = 255
+# Bytes read past a chunk's end while collecting the symbols that finish its last n-grams
+_TAIL_BYTES = 4096
+
+
+def profile_table(profile: str):
+    """256-entry byte -> symbol code table (255 = dropped) for a profile."""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown corpus profile: {profile}")
+    require_numpy('Corpus statistics')
+    table = np.full(256, _DROP, dtype=np.uint8)
+    for i in range(26):
+        table[65 + i] = table[97 + i] = i
+    if profile == 'playfair':
+        table[ord('J')] = table[ord('j')] = ord('I') - 65
+    elif profile == 'adfgvx':
+        table[48:58] = np.arange(26, 36)
+    return table
+
+
+def normalize(data: bytes, profile: str = 'letters') -> 'np.ndarray':
+    """Symbol codes of a byte string under a profile, as a uint8 array."""
+    codes = profile_table(profile)[np.frombuffer(data, dtype=np.uint8)]
+    return codes[codes != _DROP]
+
+
+def _count_codes(codes, own: int, base: int, max_n: int) -> list:
+    """Counts of the n-grams (n = 1..max_n) starting within the first own codes."""
+    counts = []
+    idx = codes.astype(np.int64)
+    for n in range(1, max_n + 1):
+        if n > 1:
+            idx = idx[:-1] * base + codes[n - 1:]
+        counts.append(np.bincount(idx[:own], minlength=base ** n))
+    return counts
+
+
+def _count_range(path: str, start: int, end: int, profile: str, max_n: int) -> list:
+    """Worker: n-gram counts for the n-grams that start in path[start:end]."""
+    table = profile_table(profile)
+    base = PROFILES[profile]
+    size = os.path.getsize(path)
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        codes = table[np.frombuffer(mm, dtype=np.uint8, count=end - start, offset=start)]
+        codes = codes[codes != _DROP]
+        own = len(codes)
+        # N-grams that start near the end continue into the next chunk
+        tail, pos = [], end
+        while sum(map(len, tail)) < max_n - 1 and pos < size:
+            block = table[np.frombuffer(mm, dtype=np.uint8,
+                                        count=min(_TAIL_BYTES, size - pos), offset=pos)]
+            tail.append(block[block != _DROP])
+            pos += _TAIL_BYTES
+        codes = np.concatenate([codes] + tail)[:own + max_n - 1]
+    return _count_codes(codes, own, base, max_n)
+
+
+def count_ngrams(paths, profile: str = 'letters', max_n: int = 4,
+                 chunk_bytes: int = 8 << 20, workers: int | None = None) -> list:
+    """
+    Count 1- to max_n-grams over corpus files, split into chunk_bytes
+    pieces counted in parallel. Returns one int64 count array per n.
+    N-grams do not span file boundaries.
+    """
+    require_numpy('Corpus statistics')
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown corpus profile: {profile}")
+    if not 1 <= max_n <= 4:
+        raise ValueError("Corpus statistics support n from 1 to 4")
+    paths = [paths] if isinstance(paths, str) else list(paths)
+    tasks = [(path, start, min(start + chunk_bytes, os.path.getsize(path)), profile, max_n)
+             for path in paths for start in range(0, os.path.getsize(path), chunk_bytes)]
+    base = PROFILES[profile]
+    totals = [np.zeros(base ** n, dtype=np.int64) for n in range(1, max_n + 1)]
+    for partial in run_tasks(_count_range, tasks, workers):
+        for total, counts in zip(totals, partial):
+            total += counts
+    return totals
+
+
+def log_probabilities(counts, smoothing: float = 0.01):
+    """
+    Additive smoothing: log10((count + smoothing) / (total + smoothing * size)).
+    Returns (float32 table, floor) where floor is the unseen n-gram score.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum()
+    if not total:
+        raise ValueError("Cannot build n-gram table from empty counts")
+    denom = total + smoothing * len(counts)
+    floor = float(np.log10(smoothing / denom)) if smoothing else float(np.log10(0.01 / total))
+    with np.errstate(divide='ignore'):
+        table = np.log10((counts + smoothing) / denom)
+    table[~np.isfinite(table)] = floor
+    return table.astype(np.float32), floor
+
+
+def save_table(path: str, counts, profile: str, smoothing: float = 0.01) -> None:
+    """Write one n-gram table as .npz (log10 probabilities plus metadata)."""
+    base = PROFILES[profile]
+    n = round(np.log(len(counts)) / np.log(base))
+    table, floor = log_probabilities(counts, smoothing)
+    tmp = path + '.tmp.npz'
+    np.savez(tmp, log_probs=table, n=n, base=base, floor=floor,
+             total=int(np.sum(counts)), profile=profile)
+    os.replace(tmp, path)
+
+
+def load_scorer(path: str) -> NgramScorer:
+    """NgramScorer from a table written by save_table."""
+    require_numpy('Corpus statistics')
+    with np.load(path) as data:
+        scorer = NgramScorer(int(data['n']), data['log_probs'].astype(np.float64).tolist(),
+                             float(data['floor']), base=int(data['base']))
+    return scorer
+
+
+def build_tables(paths, out_dir: str, profile: str = 'letters', max_n: int = 4,
+                 smoothing: float = 0.01, chunk_bytes: int = 8 << 20,
+                 workers: int | None = None) -> list[str]:
+    """
+    Count a corpus and write {profile}_{n}.npz for n = 1..max_n into
+    out_dir. Returns the written paths.
+    """
+    counts = count_ngrams(paths, profile, max_n, chunk_bytes, workers)
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for n, table in enumerate(counts, start=1):
+        path = os.path.join(out_dir, f'{profile}_{n}.npz')
+        save_table(path, table, profile, smoothing)
+        written.append(path)
+    return written
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Build n-gram tables from text corpora.")
+    parser.add_argument('corpus', nargs='+', help="Text files to count")
+    parser.add_argument('--out', required=True, help="Directory for the .npz tables")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='letters')
+    parser.add_argument('--max-n', type=int, default=4, help="Largest n-gram size (1-4)")
+    parser.add_argument('--smoothing', type=float, default=0.01, help="Additive smoothing")
+    parser.add_argument('--workers', type=int, help="Worker processes")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    written = build_tables(args.corpus, args.out, args.profile, args.max_n,
+                           args.smoothing, workers=args.workers)
+    size = sum(os.path.getsize(p) for p in args.corpus)
+    elapsed = time.perf_counter() - started
+    print(f"Counted {size / 1e6:.1f} MB in {elapsed:.2f}s ({size / 1e6 / elapsed:.1f} MB/s)")
+    for path in written:
+        print(f"  {path}")
+
+
+if __name__ == '__main__':
+    main()
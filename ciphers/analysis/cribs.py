@@ -0,0 +1,132 @@
+"""
+Crib dragging for Vigenere and Autokey ciphertexts.
+Slides a probable plaintext word (the crib) across the ciphertext and
+computes ciphertext minus crib at every offset with whole-array NumPy
+operations, one pass per crib letter. At the right offset the difference
+is a fragment of the key: for Vigenere it repeats with the key period,
+for Autokey it is earlier plaintext (or the primer) and so reads like
+English.
+
+Offsets count letters only, as both ciphers only advance the key on
+letters; each hit also reports the character index in the original text.
+"""
+
+from typing import NamedTuple
+
+from .fitness import english_scorer
+from .._compat import numpy as np, require_numpy
+
+
+class CribHit(NamedTuple):
+    """One ranked crib position."""
+    score: float
+    position: int        # character index of the crib in the ciphertext
+    letter_offset: int   # index among the ciphertext letters
+    key_fragment: str    # ciphertext minus crib at this offset
+    period: int          # best repeat period of the fragment (0 if none)
+
+
+def _letters(text: str):
+    buf = np.frombuffer(text.encode('ascii', 'replace'), dtype=np.uint8) | 0x20
+    mask = (buf >= 97) & (buf <= 122)
+    return (buf[mask] - 97).astype(np.uint8), np.flatnonzero(mask)
+
+
+def _shifted(codes, crib, j: int, n: int):
+    """Key letters at crib position j for all n offsets: codes[o + j] - crib[j]."""
+    return (codes[j:j + n] + np.uint8(26 - crib[j])) % 26
+
+
+def _periodicity(codes, crib, n: int, max_period: int):
+    """
+    Best share of positions j with key[j] == key[j + p] over p, and that p.
+    key[j] == key[j + p] exactly when codes[o + j] - codes[o + j + p] equals
+    crib[j] - crib[j + p], so each period costs one difference array and
+    one compare per crib position, all over the full offset range.
+    """
+    m = len(crib)
+    best = np.zeros(n)
+    period = np.zeros(n, dtype=np.int64)
+    for p in range(1, max_period + 1):
+        diff = (codes[:-p] + np.uint8(26) - codes[p:]) % 26
+        count = np.zeros(n, dtype=np.uint8)
+        for j in range(m - p):
+            count += diff[j:j + n] == (crib[j] - crib[j + p]) % 26
+        share = count / (m - p)
+        better = share > best + 1e-9
+        best[better] = share[better]
+        period[better] = p
+    return best, period
+
+
+def _readability(codes, crib, n: int, scorer):
+    """Mean log10 n-gram probability of the key fragment at every offset."""
+    table = scorer.array()
+    total = np.zeros(n)
+    idx = None
+    window = []
+    for j in range(len(crib)):
+        window.append(_shifted(codes, crib, j, n).astype(np.int64))
+        if len(window) == scorer.n:
+            idx = window[0]
+            for w in window[1:]:
+                idx = idx * 26 + w
+            total += table[idx]
+            window.pop(0)
+    return total / max(len(crib) - scorer.n + 1, 1)
+
+
+def drag(ciphertext: str, crib: str, cipher: str = 'vigenere', top: int = 20,
+         max_period: int | None = None) -> list[CribHit]:
+    """
+    Rank every offset of crib in the ciphertext.
+
+    Args:
+        ciphertext: Vigenere or Autokey ciphertext
+        crib: Probable plaintext word (letters only are used)
+        cipher: 'vigenere' ranks by how periodic the key fragment is, then
+            by how readable; 'autokey' ranks by how readable it is
+        top: Number of hits to return
+        max_period: Longest Vigenere key period to test (default: half
+            the crib length, the longest period that can repeat within it;
+            at most the crib length minus one)
+
+    The score is the periodic share (0-1) for Vigenere and the mean log10
+    n-gram probability of the fragment for Autokey.
+    """
+    require_numpy('Crib dragging')
+    if cipher not in ('vigenere', 'autokey'):
+        raise ValueError("Crib dragging supports 'vigenere' and 'autokey'")
+    crib_codes = [int(c) for c in _letters(crib)[0]]
+    codes, positions = _letters(ciphertext)
+    m = len(crib_codes)
+    if m < 2:
+        raise ValueError("Crib must contain at least two letters")
+    n = len(codes) - m + 1
+    if n <= 0:
+        return []
+    scorer = english_scorer(2)
+
+    if cipher == 'autokey':
+        scores = _readability(codes, crib_codes, n, scorer)
+        best = np.argsort(-scores, kind='stable')[:top]
+        periods = np.zeros(len(best), dtype=np.int64)
+    else:
+        # A period must leave at least one pair of crib letters to compare
+        max_period = min(max_period or max(m // 2, 1), m - 1)
+        scores, period_all = _periodicity(codes, crib_codes, n, max_period)
+        # Shortlist by periodicity, then break ties by fragment readability
+        shortlist = np.argsort(-scores, kind='stable')[:max(top * 20, 200)]
+        windows = np.lib.stride_tricks.sliding_window_view(codes, m)[shortlist]
+        frags = (windows.astype(np.int64) - crib_codes) % 26
+        readable = scorer.score_rows(frags)
+        best = shortlist[np.lexsort((-readable, -scores[shortlist]))[:top]]
+        periods = period_all[best]
+
+    crib_codes = np.array(crib_codes, dtype=np.int64)
+    hits = []
+    for o, period in zip(best, periods):
+        frag = ((codes[o:o + m] - crib_codes) % 26 + 65).astype(np.uint8)
+        hits.append(CribHit(float(scores[o]), int(positions[o]), int(o),
+                            frag.tobytes().decode('ascii'), int(period)))
+    return hits
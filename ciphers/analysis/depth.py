@@ -0,0 +1,448 @@
+"""
+Key-depth detection for large ciphertext archives.
+Messages encrypted under the same Vigenere key (or Autokey primer) are
+"in depth": column j of each is shifted by the same key letter, so their
+per-column letter histograms agree. Each message is reduced in one
+streaming pass to a compact DepthSignature (estimated period, column
+histograms and IoC), from which the most likely key letter of every
+column is read off. Signatures are stored in an SQLite index and
+bucketed by windows of consecutive estimated key letters, a
+bit-sampling LSH over the estimated key: messages in depth share most
+windows, unrelated ones almost never share one, so only messages that
+share a bucket are ever compared, on their column cross-IoC.
+
+For Autokey the columns are the chains of every period-th letter, split
+by parity: along a chain the alternating sums of the ciphertext equal
+the plaintext shifted by +k or -k (see autokey.chain_terms).
+
+Run: python -m ciphers.analysis.depth INDEX add FILE... | clusters | query FILE
+"""
+
+import argparse
+import itertools
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import NamedTuple
+
+from .english import LETTER_FREQUENCIES
+from .parallel import run_tasks
+from .._compat import numpy as np, require_numpy
+
+CIPHERS = ('vigenere', 'autokey')
+
+_ENGLISH_IOC = sum(f * f for f in LETTER_FREQUENCIES) / sum(LETTER_FREQUENCIES) ** 2
+_RANDOM_IOC = 1 / 26
+# Column cross-IoC above which a key letter is taken to be shared
+_COLUMN_THRESHOLD = (_ENGLISH_IOC + _RANDOM_IOC) / 2
+# Share of key letters two messages must share to be reported in depth
+MATCH_THRESHOLD = 0.8
+# The period is the smallest whose mean column IoC reaches this share of
+# the way from random to English text (or the best IoC when none does),
+# so multiples of the true period are not chosen
+_PERIOD_LEVEL = 0.9
+# Periods are only considered with this many letters per column on average
+_MIN_COLUMN_LETTERS = 3
+# Characters read at a time from files, and messages per worker task
+_READ_CHARS = 1 << 20
+_BATCH = 2000
+# Longest period an index accepts, and most key letters per bucket window
+_MAX_PERIOD = 64
+_MAX_WINDOW = 6
+# Signatures kept in memory while clustering
+_SIGNATURE_CACHE = 1 << 16
+
+
+class DepthSignature(NamedTuple):
+    """Per-message summary used for depth detection."""
+    cipher: str
+    period: int
+    letters: int
+    ioc: float
+    counts: 'np.ndarray'    # (columns, 26) letter counts; period or 2 * period columns
+
+    @property
+    def key(self) -> str:
+        """Most likely key (or primer) letters judged by English letter frequencies."""
+        return ''.join(chr(65 + k) for k in _estimate_key(self.cipher, self.counts))
+
+
+def _columns(cipher: str, period: int) -> int:
+    return 2 * period if cipher == 'autokey' else period
+
+
+def _shift_scores():
+    """(26, 26) matrix: log-likelihood of letter x under English shifted by s at [x, s]."""
+    log_freq = np.log(np.asarray(LETTER_FREQUENCIES) / sum(LETTER_FREQUENCIES))
+    x = np.arange(26)
+    return log_freq[(x[:, None] - x[None, :]) % 26]
+
+
+def _estimate_key(cipher: str, counts) -> 'np.ndarray':
+    """Key letter codes maximising the likelihood of the column histograms."""
+    counts = np.asarray(counts, dtype=np.float64)
+    scores = _shift_scores()
+    if cipher == 'vigenere':
+        return (counts @ scores).argmax(axis=1)
+    # Autokey: even chain terms are plaintext + k, odd ones plaintext - k
+    return (counts[0::2] @ scores + counts[1::2] @ scores[:, (-np.arange(26)) % 26]).argmax(axis=1)
+
+
+class SignatureBuilder:
+    """
+    Streaming signature of one message: feed it the text in chunks of
+    any size, then call signature(). Column histograms are kept for
+    every candidate period up to max_period at once.
+
+    Args:
+        cipher: 'vigenere' (periodic key) or 'autokey' (primer length)
+        max_period: Longest key or primer length considered
+    """
+
+    def __init__(self, cipher: str = 'vigenere', max_period: int = 16):
+        require_numpy('Key-depth signatures')
+        if cipher not in CIPHERS:
+            raise ValueError(f"Unknown depth cipher: {cipher}")
+        self.cipher = cipher
+        self.max_period = max_period
+        self.letters = 0
+        widths = [_columns(cipher, p) for p in range(1, max_period + 1)]
+        self._starts = np.concatenate(([0], np.cumsum(widths)))
+        self._counts = np.zeros(int(self._starts[-1]) * 26, dtype=np.int64)
+        self._totals = np.zeros(26, dtype=np.int64)
+        # Autokey: running alternating sum of every chain, mod 26
+        self._sums = [np.zeros(p, dtype=np.int64) for p in range(1, max_period + 1)]
+
+    def update(self, text: str) -> None:
+        """Add the next chunk of the message; only ASCII letters count."""
+        raw = np.frombuffer(text.encode('ascii', 'ignore'), dtype=np.uint8)
+        codes = ((raw[((raw | 0x20) >= 97) & ((raw | 0x20) <= 122)] | 0x20) - 97).astype(np.int64)
+        n = len(codes)
+        if not n:
+            return
+        self._totals += np.bincount(codes, minlength=26)
+        pos = self.letters + np.arange(n)
+        index = []
+        for p in range(1, self.max_period + 1):
+            start = self._starts[p - 1]
+            if self.cipher == 'vigenere':
+                index.append((start + pos % p) * 26 + codes)
+            else:
+                base, parity = self._chain_terms(p, codes)
+                index.append((start + pos % p * 2 + parity) * 26 + base)
+        self._counts += np.bincount(np.concatenate(index), minlength=len(self._counts))
+        self.letters += n
+
+    def _chain_terms(self, p: int, codes):
+        """Autokey chain terms of this chunk for primer length p, carrying the running sums."""
+        lead = self.letters % p
+        rows = -(-(lead + len(codes)) // p)
+        grid = np.zeros(rows * p, dtype=np.int64)
+        grid[lead:lead + len(codes)] = codes
+        grid = grid.reshape(rows, p)
+        parity = (self.letters // p + np.arange(rows)) % 2
+        sign = np.where(parity, -1, 1)[:, None]
+        sums = np.cumsum(sign * grid, axis=0) + self._sums[p - 1]
+        self._sums[p - 1] = sums[-1] % 26
+        base = (sign * sums % 26).reshape(-1)[lead:lead + len(codes)]
+        return base, np.repeat(parity, p)[lead:lead + len(codes)]
+
+    def column_iocs(self) -> 'np.ndarray':
+        """Mean column IoC for each candidate period 1..max_period (0 when too short)."""
+        counts = self._counts.reshape(-1, 26)
+        n = counts.sum(axis=1)
+        coinc = (counts * (counts - 1)).sum(axis=1)
+        col_ioc = np.where(n > 1, coinc / np.maximum(n * (n - 1), 1), 0.0)
+        widths = np.diff(self._starts)
+        iocs = np.add.reduceat(col_ioc, self._starts[:-1]) / widths
+        return np.where(self.letters >= widths * _MIN_COLUMN_LETTERS, iocs, 0.0)
+
+    def signature(self) -> DepthSignature:
+        """Signature of the text seen so far."""
+        iocs = self.column_iocs()
+        level = min(_RANDOM_IOC + _PERIOD_LEVEL * (_ENGLISH_IOC - _RANDOM_IOC), iocs.max())
+        period = int(np.argmax(iocs >= level)) + 1
+        n = self.letters
+        ioc = float((self._totals * (self._totals - 1)).sum() / max(n * (n - 1), 1))
+        counts = self._counts.reshape(-1, 26)[self._starts[period - 1]:self._starts[period]]
+        if self.cipher == 'vigenere':
+            # A multiple of the key length shows the key repeated; fold it back
+            key = _estimate_key(self.cipher, counts)
+            period = next(d for d in range(1, period + 1)
+                          if period % d == 0 and (key == np.roll(key, d)).all())
+            counts = counts.reshape(-1, period, 26).sum(axis=0)
+        return DepthSignature(self.cipher, period, n, ioc, counts.astype(np.uint32))
+
+
+def signature(text: str, cipher: str = 'vigenere', max_period: int = 16) -> DepthSignature:
+    """DepthSignature of a whole message."""
+    builder = SignatureBuilder(cipher, max_period)
+    builder.update(text)
+    return builder.signature()
+
+
+def _signature_batch(texts, cipher: str, max_period: int) -> list[DepthSignature]:
+    return [signature(text, cipher, max_period) for text in texts]
+
+
+def match_score(a: DepthSignature, b: DepthSignature) -> float:
+    """
+    Share of the key letters of two signatures that look the same: the
+    cross-IoC of their columns is nearer the English IoC (0.066) than
+    1/26. 1.0 for messages in depth, about 0 for unrelated ones and 0
+    when the periods differ.
+    """
+    if a.cipher != b.cipher or a.period != b.period:
+        return 0.0
+    ca, cb = a.counts.astype(np.float64), b.counts.astype(np.float64)
+    # Per key letter: one column, or the even and odd chain columns of a primer letter
+    group = _columns(a.cipher, 1)
+    coinc = (ca * cb).sum(axis=1).reshape(-1, group).sum(axis=1)
+    pairs = (ca.sum(axis=1) * cb.sum(axis=1)).reshape(-1, group).sum(axis=1)
+    valid = pairs > 0
+    if not valid.any():
+        return 0.0
+    return float(np.mean(coinc[valid] / pairs[valid] >= _COLUMN_THRESHOLD))
+
+
+def key_buckets(sig: DepthSignature, window: int = 3) -> list[int]:
+    """
+    Bucket numbers of a signature: one per window of consecutive estimated
+    key letters (cyclically, with the period and start column included).
+    Keys shorter than the window give a single bucket for the whole key.
+    """
+    if not sig.letters:
+        return []
+    key = _estimate_key(sig.cipher, sig.counts)
+    width = min(window, sig.period)
+    starts = range(sig.period) if width < sig.period else range(1)
+    place = 26 ** np.arange(width, dtype=np.int64)
+    return [int(((sig.period * _MAX_PERIOD + start) * 26 ** width)
+                + np.take(key, range(start, start + width), mode='wrap') @ place)
+            for start in starts]
+
+
+class DepthIndex:
+    """
+    On-disk index of message signatures, bucketed by estimated key windows.
+
+    Args:
+        path: SQLite file (created if missing)
+        cipher: 'vigenere' or 'autokey'
+        max_period: Longest key or primer length considered
+        window: Key letters per bucket; longer windows give fewer false
+            candidates but miss more messages whose key estimates differ
+
+    Settings are stored in the file on creation; an existing index keeps
+    its own and ignores the arguments.
+    """
+
+    def __init__(self, path: str, cipher: str = 'vigenere', max_period: int = 16,
+                 window: int = 3):
+        require_numpy('Key-depth index')
+        if cipher not in CIPHERS:
+            raise ValueError(f"Unknown depth cipher: {cipher}")
+        if not 1 <= max_period <= _MAX_PERIOD:
+            raise ValueError(f"Depth index periods must be between 1 and {_MAX_PERIOD}")
+        if not 1 <= window <= _MAX_WINDOW:
+            raise ValueError(f"Bucket window must be between 1 and {_MAX_WINDOW} letters")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(
+            'CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value);'
+            'CREATE TABLE IF NOT EXISTS messages (id INTEGER PRIMARY KEY, name TEXT UNIQUE, '
+            'period INTEGER, letters INTEGER, ioc REAL, counts BLOB);'
+            'CREATE TABLE IF NOT EXISTS buckets (bucket INTEGER, message INTEGER, '
+            'PRIMARY KEY (bucket, message)) WITHOUT ROWID;')
+        settings = {'cipher': cipher, 'max_period': max_period, 'window': window}
+        self._db.executemany('INSERT OR IGNORE INTO meta VALUES (?, ?)', settings.items())
+        self._db.commit()
+        stored = dict(self._db.execute('SELECT name, value FROM meta'))
+        self.cipher = stored['cipher']
+        self.max_period, self.window = int(stored['max_period']), int(stored['window'])
+        self._cache = OrderedDict()
+
+    def __len__(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM messages').fetchone()[0]
+
+    def _insert(self, name: str, sig: DepthSignature) -> None:
+        if sig.cipher != self.cipher:
+            raise ValueError(f"Index holds {self.cipher} signatures, not {sig.cipher}")
+        cur = self._db.execute('INSERT OR IGNORE INTO messages VALUES (NULL, ?, ?, ?, ?, ?)',
+                               (name, sig.period, sig.letters, sig.ioc,
+                                sig.counts.astype('<u4').tobytes()))
+        if cur.rowcount:
+            self._db.executemany('INSERT OR IGNORE INTO buckets VALUES (?, ?)',
+                                 [(b, cur.lastrowid) for b in self._buckets(sig)])
+
+    def _buckets(self, sig: DepthSignature) -> list[int]:
+        return key_buckets(sig, self.window)
+
+    def add_signature(self, name: str, sig: DepthSignature) -> None:
+        """Store a signature under name; names already in the index are skipped."""
+        self._insert(name, sig)
+        self._db.commit()
+
+    def add(self, name: str, text: str) -> None:
+        """Index one message."""
+        self.add_signature(name, signature(text, self.cipher, self.max_period))
+
+    def add_file(self, path: str, name: str | None = None) -> None:
+        """Index a message file, streamed in chunks; named by its path by default."""
+        builder = SignatureBuilder(self.cipher, self.max_period)
+        with open(path, encoding='utf-8', errors='replace') as fh:
+            for chunk in iter(lambda: fh.read(_READ_CHARS), ''):
+                builder.update(chunk)
+        self.add_signature(name or path, builder.signature())
+
+    def add_many(self, items, workers: int | None = 1) -> int:
+        """
+        Index (name, text) pairs, committing once per batch. Signatures
+        are computed in worker processes when workers is not 1.
+        Returns the number of messages read.
+        """
+        items = iter(items)
+        total = 0
+        while True:
+            batches = [batch for batch in (list(itertools.islice(items, _BATCH))
+                                           for _ in range(max(workers or 1, 1) * 4)) if batch]
+            if not batches:
+                return total
+            tasks = [([text for _, text in batch], self.cipher, self.max_period)
+                     for batch in batches]
+            for batch, sigs in zip(batches, run_tasks(_signature_batch, tasks, workers)):
+                for (name, _), sig in zip(batch, sigs):
+                    self._insert(name, sig)
+                total += len(batch)
+            self._db.commit()
+
+    def _row_signature(self, row) -> DepthSignature:
+        period, letters, ioc, blob = row
+        counts = np.frombuffer(blob, dtype='<u4').reshape(_columns(self.cipher, period), 26)
+        return DepthSignature(self.cipher, period, letters, ioc, counts)
+
+    def signature(self, name: str) -> DepthSignature:
+        """Stored signature of a message."""
+        row = self._db.execute('SELECT period, letters, ioc, counts FROM messages '
+                               'WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return self._row_signature(row)
+
+    def _signature_by_id(self, message: int) -> DepthSignature:
+        if message in self._cache:
+            self._cache.move_to_end(message)
+            return self._cache[message]
+        sig = self._row_signature(self._db.execute(
+            'SELECT period, letters, ioc, counts FROM messages WHERE id = ?',
+            (message,)).fetchone())
+        self._cache[message] = sig
+        if len(self._cache) > _SIGNATURE_CACHE:
+            self._cache.popitem(last=False)
+        return sig
+
+    def query(self, sig, threshold: float = MATCH_THRESHOLD) -> list[tuple[str, float]]:
+        """
+        Indexed messages in depth with a message, as (name, score) pairs,
+        best first. sig is a DepthSignature or the ciphertext itself.
+        Only messages sharing an LSH bucket are scored.
+        """
+        if isinstance(sig, str):
+            sig = signature(sig, self.cipher, self.max_period)
+        buckets = self._buckets(sig)
+        if not buckets:
+            return []
+        marks = ','.join('?' * len(buckets))
+        rows = self._db.execute(
+            'SELECT name, period, letters, ioc, counts FROM messages WHERE id IN '
+            f'(SELECT DISTINCT message FROM buckets WHERE bucket IN ({marks}))', buckets)
+        found = [(name, match_score(sig, self._row_signature(rest))) for name, *rest in rows]
+        return sorted((m for m in found if m[1] >= threshold), key=lambda m: -m[1])
+
+    def clusters(self, threshold: float = MATCH_THRESHOLD, min_size: int = 2) -> list[list[str]]:
+        """
+        Groups of indexed messages that appear to share a key, largest
+        first. Within each bucket a message is scored against one member
+        of each group found there so far, so a large depth costs a linear
+        number of comparisons rather than all pairs.
+        """
+        parent = {}
+
+        def find(x):
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        rows = self._db.execute('SELECT bucket, message FROM buckets ORDER BY bucket')
+        for _, group in itertools.groupby(rows, key=lambda row: row[0]):
+            members = [message for _, message in group]
+            if len(members) < 2:
+                continue
+            reps = []
+            for message in members:
+                root = find(message)
+                if any(find(rep) == root for rep in reps):
+                    continue
+                sig = self._signature_by_id(message)
+                for rep in reps:
+                    if match_score(sig, self._signature_by_id(rep)) >= threshold:
+                        parent[root] = find(rep)
+                        break
+                else:
+                    reps.append(message)
+
+        groups = {}
+        for message in parent:
+            groups.setdefault(find(message), []).append(message)
+        names = []
+        for members in groups.values():
+            if len(members) >= min_size:
+                marks = ','.join('?' * len(members))
+                names.append(sorted(name for name, in self._db.execute(
+                    f'SELECT name FROM messages WHERE id IN ({marks})', members)))
+        return sorted(names, key=lambda group: (-len(group), group))
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> 'DepthIndex':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Find ciphertexts encrypted under the same key.")
+    parser.add_argument('index', help="SQLite index file")
+    parser.add_argument('--cipher', choices=CIPHERS, default='vigenere',
+                        help="Cipher of a new index")
+    parser.add_argument('--threshold', type=float, default=MATCH_THRESHOLD,
+                        help="Share of key letters two messages must share")
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help="Index message files")
+    add.add_argument('files', nargs='+')
+    commands.add_parser('clusters', help="List groups of messages in depth")
+    query = commands.add_parser('query', help="Indexed messages in depth with a file")
+    query.add_argument('file')
+    args = parser.parse_args(argv)
+    with DepthIndex(args.index, args.cipher) as index:
+        if args.command == 'add':
+            for path in args.files:
+                index.add_file(path)
+            print(f"{len(index)} messages indexed")
+        elif args.command == 'clusters':
+            for group in index.clusters(args.threshold):
+                print(' '.join(group))
+        else:
+            with open(args.file, encoding='utf-8', errors='replace') as fh:
+                text = fh.read()
+            for name, score in index.query(text, args.threshold):
+                print(f"{score:.2f}  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+"""
+Dictionary (wordlist) key attack.
+Streams a wordlist through mmap, compiles every word into a key schedule
+for the chosen cipher, decrypts only a fixed-length prefix of the
+ciphertext and ranks the words by n-gram fitness. The wordlist is split
+into byte ranges that worker processes scan independently; progress can
+be checkpointed and resumed from the last fully scanned offset.
+"""
+
+import heapq
+import json
+import mmap
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .fitness import Candidate, choose_scorer, letter_codes
+from .parallel import ProgressTracker, default_workers
+from .transposition import columnar_gather
+from ..normalize import normalize
+from ..playfair import _build_playfair_matrix
+
+ATTACKS = ('vigenere', 'autokey', 'playfair', 'columnar')
+
+
+def _key_shifts(word: str) -> list[int]:
+    return [ord(c) - 65 for c in word if 'A' <= c <= 'Z']
+
+
+def _decrypt_vigenere(codes: list[int], shifts: list[int]) -> list[int]:
+    period = len(shifts)
+    return [(c - shifts[i % period]) % 26 for i, c in enumerate(codes)]
+
+
+def _decrypt_autokey(codes: list[int], shifts: list[int]) -> list[int]:
+    # The running key is the primer followed by the recovered plaintext
+    running = list(shifts)
+    out = []
+    for i, c in enumerate(codes):
+        p = (c - running[i]) % 26
+        out.append(p)
+        running.append(p)
+    return out
+
+
+def _playfair_schedule(word: str):
+    matrix = _build_playfair_matrix(word)
+    pos = {}
+    for r, row in enumerate(matrix):
+        for c, ch in enumerate(row):
+            pos[ord(ch) - 65] = (r, c)
+    pos.setdefault(9, pos.get(8))  # J shares the I cell
+    grid = [[ord(ch) - 65 for ch in row] for row in matrix]
+    return pos, grid
+
+
+def _decrypt_playfair(codes: list[int], schedule) -> list[int]:
+    pos, grid = schedule
+    out = []
+    for i in range(0, len(codes) - 1, 2):
+        loc, loc1 = pos.get(codes[i]), pos.get(codes[i + 1])
+        if loc is None or loc1 is None:
+            # The square cannot have produced this ciphertext
+            return None
+        if loc[0] == loc1[0]:
+            out += (grid[loc[0]][(loc[1] - 1) % 5], grid[loc1[0]][(loc1[1] - 1) % 5])
+        elif loc[1] == loc1[1]:
+            out += (grid[(loc[0] - 1) % 5][loc[1]], grid[(loc1[0] - 1) % 5][loc1[1]])
+        else:
+            out += (grid[loc[0]][loc1[1]], grid[loc1[0]][loc[1]])
+    return out
+
+
+def cipher_codes(cipher: str, ciphertext: str) -> list[int]:
+    """
+    Ciphertext as 0-25 letter codes. Columnar keeps every non-space
+    character in place (as -1) because punctuation takes part in the
+    transposition.
+    """
+    if cipher == 'columnar':
+        return [ord(c) - 65 if 'A' <= c <= 'Z' else -1
+                for c in normalize(ciphertext, 'strip_upper')]
+    return letter_codes(ciphertext)
+
+
+def compile_key(cipher: str, word: str, length: int):
+    """
+    Compile a wordlist entry into a key schedule for cipher, or return
+    None when the word cannot be a key. length is the full ciphertext
+    length, needed for transposition schedules.
+    """
+    word = word.strip().upper()
+    if cipher in ('vigenere', 'autokey'):
+        return _key_shifts(word) or None
+    if cipher == 'playfair':
+        return _playfair_schedule(word) if any('A' <= c <= 'Z' for c in word) else None
+    if cipher == 'columnar':
+        if len(word) < 2 or len(word) > length:
+            return None
+        order = tuple(sorted(range(len(word)), key=lambda x: word[x]))
+        return columnar_gather(order, length)
+    raise ValueError(f"Unsupported cipher for dictionary attack: {cipher}")
+
+
+def decrypt_prefix(cipher: str, codes: list[int], schedule, prefix: int) -> list[int]:
+    """
+    Decrypt the first prefix letters of the ciphertext codes.
+    Returns None when the ciphertext is impossible under this key.
+    """
+    if cipher == 'vigenere':
+        return _decrypt_vigenere(codes[:prefix], schedule)
+    if cipher == 'autokey':
+        return _decrypt_autokey(codes[:prefix], schedule)
+    if cipher == 'playfair':
+        return _decrypt_playfair(codes[:prefix + prefix % 2], schedule)
+    if cipher == 'columnar':
+        gathered = (codes[i] for i in schedule)
+        return [c for c in gathered if c >= 0][:prefix]
+    raise ValueError(f"Unsupported cipher for dictionary attack: {cipher}")
+
+
+def _scan_range(path: str, start: int, end: int, cipher: str, codes: list[int],
+                prefix: int, top: int, threshold: float | None):
+    """
+    Worker: score every word in path[start:end].
+    Returns (start, end, best candidates, words scored, hit threshold).
+    """
+    scorer = choose_scorer(prefix)
+    best = []
+    scored = 0
+    hit = False
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for raw in mm[start:end].splitlines():
+            word = raw.decode('ascii', 'ignore')
+            schedule = compile_key(cipher, word, len(codes))
+            if schedule is None:
+                continue
+            plain = decrypt_prefix(cipher, codes, schedule, prefix)
+            scored += 1
+            if plain is None:
+                continue
+            score = scorer.score_codes(plain)
+            item = (score, word.strip().upper())
+            if len(best) < top:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+            if threshold is not None and score >= threshold:
+                hit = True
+                break
+    return start, end, best, scored, hit
+
+
+def _split_ranges(path: str, start: int, chunk_bytes: int) -> list[tuple[int, int]]:
+    """Split the file from start into newline-aligned byte ranges."""
+    size = os.path.getsize(path)
+    if size == 0 or start >= size:
+        return []
+    ranges = []
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while pos < size:
+            cut = mm.find(b'\n', min(pos + chunk_bytes, size))
+            end = size if cut == -1 else cut + 1
+            ranges.append((pos, end))
+            pos = end
+    return ranges
+
+
+def _load_checkpoint(checkpoint: str | None, path: str, cipher: str):
+    if not checkpoint or not os.path.exists(checkpoint):
+        return 0, []
+    with open(checkpoint, 'r', encoding='utf-8') as fh:
+        state = json.load(fh)
+    if state.get('wordlist') != os.path.abspath(path) or state.get('cipher') != cipher:
+        raise ValueError("Checkpoint belongs to a different wordlist or cipher")
+    return state['offset'], [tuple(item) for item in state['best']]
+
+
+def _save_checkpoint(checkpoint: str, path: str, cipher: str, offset: int, best) -> None:
+    state = {'wordlist': os.path.abspath(path), 'cipher': cipher,
+             'offset': offset, 'best': sorted(best, reverse=True)}
+    tmp = checkpoint + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(state, fh)
+    os.replace(tmp, checkpoint)
+
+
+def dictionary_attack(ciphertext: str, wordlist: str, cipher: str, prefix: int = 60,
+                      top: int = 10, threshold: float | None = None,
+                      checkpoint: str | None = None, chunk_bytes: int = 1 << 20,
+                      workers: int | None = None, progress=None) -> list[Candidate]:
+    """
+    Try every word of a wordlist as the key and return the best candidates.
+
+    Args:
+        ciphertext: Ciphertext to attack (non-letters are ignored)
+        wordlist: Path to a newline-separated wordlist
+        cipher: One of 'vigenere', 'autokey', 'playfair', 'columnar'
+        prefix: Number of ciphertext letters decrypted and scored per key
+        top: Number of ranked candidates to return
+        threshold: Stop early once a key reaches this mean log10 n-gram
+            probability (roughly -2.5 for bigrams and -4.5 for quadgrams on
+            readable English with the bundled tables)
+        checkpoint: Optional JSON file recording progress; an existing
+            checkpoint is resumed from its offset
+        chunk_bytes: Approximate size of each worker's wordlist slice
+        workers: Worker processes (defaults to the CPU count)
+        progress: Optional callback receiving Progress snapshots
+
+    Candidate plaintexts decrypt the whole ciphertext with this module's
+    compile_key and decrypt_prefix, so they are uppercase letters only
+    (case, spaces and punctuation are dropped).
+    """
+    if cipher not in ATTACKS:
+        raise ValueError(f"Unsupported cipher for dictionary attack: {cipher}")
+    codes = cipher_codes(cipher, ciphertext)
+    if len(codes) < 4:
+        raise ValueError("Ciphertext too short to attack")
+    prefix = min(prefix, len(codes))
+    scorer = choose_scorer(prefix)
+    raw_threshold = None
+    if threshold is not None:
+        raw_threshold = threshold * max(prefix - scorer.n + 1, 1)
+
+    offset, best = _load_checkpoint(checkpoint, wordlist, cipher)
+    ranges = _split_ranges(wordlist, offset, chunk_bytes)
+    tracker = ProgressTracker(f'{cipher} wordlist', len(ranges), progress)
+
+    # Ranges finish out of order; the checkpoint only advances over a
+    # contiguous run of finished ranges so a resume never skips words
+    finished = {}
+    pending_offset = offset
+    workers = workers or default_workers()
+    stop = False
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        queue = iter(ranges)
+        running = set()
+        while True:
+            while not stop and len(running) < workers * 2:
+                item = next(queue, None)
+                if item is None:
+                    break
+                running.add(pool.submit(_scan_range, wordlist, item[0], item[1], cipher,
+                                        codes, prefix, top, raw_threshold))
+            if not running:
+                break
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                start, end, chunk_best, scored, hit = fut.result()
+                best = heapq.nlargest(top, best + chunk_best)
+                tracker.update(scored, best[0][0] if best else float('-inf'))
+                finished[start] = end
+                stop = stop or hit
+            while pending_offset in finished:
+                pending_offset = finished.pop(pending_offset)
+            if checkpoint:
+                _save_checkpoint(checkpoint, wordlist, cipher, pending_offset, best)
+            if stop:
+                # Ranges already being scanned finish; queued ones are dropped
+                for fut in running:
+                    fut.cancel()
+                break
+
+    return [Candidate(score, word, _full_decrypt(cipher, ciphertext, word))
+            for score, word in sorted(best, reverse=True)]
+
+
+def _full_decrypt(cipher: str, ciphertext: str, word: str) -> str:
+    codes = cipher_codes(cipher, ciphertext)
+    schedule = compile_key(cipher, word, len(codes))
+    return ''.join(chr(c + 65) for c in decrypt_prefix(cipher, codes, schedule, len(codes)))
@@ -0,0 +1,407 @@
+"""
+Distributed key search with checkpointed work units.
+A Coordinator splits an attack into work units (column-order shards,
+hill-climbing restart seeds or wordlist byte ranges) and hands them out
+over an authenticated local socket. Workers on this machine or on other
+nodes connect with run_worker, take one unit at a time and send back the
+scored keys. Every finished unit is checkpointed to a JSON file, so a run
+that dies resumes with only the unfinished units; units held by a worker
+that disconnects or stops answering are handed out again.
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import random
+import socket
+import threading
+import time
+from collections import deque
+from multiprocessing import AuthenticationError, Process
+from multiprocessing.connection import Client, Listener
+from typing import NamedTuple
+
+from . import adfgvx, dictionary
+from .fitness import Candidate
+from .parallel import ProgressTracker, default_workers
+from .transposition import order_to_key
+from ..adfgvx import create_polybius_square
+
+# Workers poll at this interval while the last units are still out
+_POLL_SECONDS = 0.5
+
+
+class WorkUnit(NamedTuple):
+    """One independently runnable piece of an attack."""
+    unit_id: str
+    task: str
+    args: tuple
+
+
+def _order_exhaustive_unit(*args):
+    best, evaluated = adfgvx._order_exhaustive_task(*args)
+    return [[score, list(order), None] for score, order in best], evaluated
+
+
+def _order_climb_unit(*args):
+    best, evaluated = adfgvx._order_climb_task(*args)
+    return [[score, list(order), None] for score, order in best], evaluated
+
+
+def _substitution_unit(*args):
+    cand, evaluated = adfgvx._substitution_climb_task(*args)
+    return [[cand.score, cand.key, cand.plaintext]], evaluated
+
+
+def _wordlist_unit(path, start, end, cipher, codes, prefix, top):
+    _, _, best, scored, _ = dictionary._scan_range(path, start, end, cipher, codes,
+                                                   prefix, top, None)
+    return [[score, word, None] for score, word in best], scored
+
+
+# Tasks a worker will run, by name; each returns ([[score, key, plaintext]], keys tried)
+TASKS = {
+    'adfgvx_order_exhaustive': _order_exhaustive_unit,
+    'adfgvx_order_climb': _order_climb_unit,
+    'adfgvx_substitution': _substitution_unit,
+    'wordlist': _wordlist_unit,
+}
+
+
+def _fingerprint(units) -> str:
+    data = json.dumps([[u.unit_id, u.task, list(u.args)] for u in units])
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class _UnitBoard:
+    """Thread-safe record of which units are pending, leased and done."""
+
+    def __init__(self, units, done, lease_seconds: float, on_complete):
+        self._lock = threading.Lock()
+        self._units = {u.unit_id: u for u in units}
+        self._pending = deque(uid for uid in self._units if uid not in done)
+        self._leases = {}
+        self._done = set(done)
+        self._lease_seconds = lease_seconds
+        self._on_complete = on_complete
+        # Times each unit was returned by a worker that went away holding it
+        self.failures = {}
+        self.finished = threading.Event()
+        if len(self._done) >= len(self._units):
+            self.finished.set()
+
+    def next_unit(self, worker: str):
+        """A WorkUnit for worker, 'wait' while other workers hold the rest, or None."""
+        with self._lock:
+            now = time.monotonic()
+            for uid, (_, deadline) in list(self._leases.items()):
+                if deadline < now:
+                    del self._leases[uid]
+                    self._pending.append(uid)
+            if self._pending:
+                uid = self._pending.popleft()
+                self._leases[uid] = (worker, now + self._lease_seconds)
+                return self._units[uid]
+            return 'wait' if self._leases else None
+
+    def complete(self, worker: str, unit_id: str, items, keys: int, seconds: float) -> None:
+        with self._lock:
+            # A unit handed out twice (after an expired lease) counts once
+            if unit_id in self._done or unit_id not in self._units:
+                return
+            self._leases.pop(unit_id, None)
+            if unit_id in self._pending:
+                self._pending.remove(unit_id)
+            self._done.add(unit_id)
+            self._on_complete(worker, unit_id, items, keys, seconds)
+            if len(self._done) == len(self._units):
+                self.finished.set()
+
+    def release(self, worker: str) -> None:
+        """Return the units leased to a worker that went away."""
+        with self._lock:
+            for uid, (owner, _) in list(self._leases.items()):
+                if owner == worker:
+                    del self._leases[uid]
+                    self._pending.appendleft(uid)
+                    self.failures[uid] = self.failures.get(uid, 0) + 1
+
+
+class Coordinator:
+    """
+    Serve a list of WorkUnits to workers and collect their results.
+
+    Args:
+        units: The work units of one job
+        checkpoint: Optional JSON file of finished units; an existing
+            checkpoint for the same units is resumed
+        address: (host, port) to listen on; port 0 picks a free port.
+            Use ('0.0.0.0', port) to accept workers from other nodes
+        authkey: Shared secret workers must present (random by default)
+        lease_seconds: How long a worker may hold a unit before it is
+            handed to another worker
+        progress: Optional callback receiving Progress snapshots
+    """
+
+    def __init__(self, units, checkpoint: str | None = None,
+                 address: tuple[str, int] = ('127.0.0.1', 0), authkey: bytes | None = None,
+                 lease_seconds: float = 600.0, progress=None):
+        self.units = list(units)
+        self.checkpoint = checkpoint
+        self.authkey = authkey or os.urandom(16)
+        self.results = {}
+        self.worker_stats = {}
+        self._job = _fingerprint(self.units)
+        self._load()
+        self._tracker = ProgressTracker('distributed', len(self.units), progress)
+        self._tracker.completed = len(self.results)
+        self._board = _UnitBoard(self.units, self.results, lease_seconds, self._record)
+        self._listener = Listener(address, authkey=self.authkey)
+        self.address = self._listener.address
+        self._closed = False
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _load(self) -> None:
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return
+        with open(self.checkpoint, 'r', encoding='utf-8') as fh:
+            state = json.load(fh)
+        if state.get('job') != self._job:
+            raise ValueError("Checkpoint belongs to a different job")
+        self.results = state['results']
+
+    def _save(self) -> None:
+        state = {'job': self._job, 'results': self.results}
+        tmp = self.checkpoint + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(state, fh)
+        os.replace(tmp, self.checkpoint)
+
+    def _record(self, worker, unit_id, items, keys, seconds) -> None:
+        self.results[unit_id] = items
+        stats = self.worker_stats.setdefault(worker, {'units': 0, 'keys': 0, 'seconds': 0.0})
+        stats['units'] += 1
+        stats['keys'] += keys
+        stats['seconds'] += seconds
+        self._tracker.update(keys, max((item[0] for item in items), default=float('-inf')))
+        if self.checkpoint:
+            self._save()
+
+    def _serve(self) -> None:
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                continue
+            if self._closed:
+                conn.close()
+                break
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn) -> None:
+        worker = None
+        with conn:
+            try:
+                while True:
+                    message = conn.recv()
+                    if message[0] == 'next':
+                        worker = message[1]
+                        conn.send(None if self._closed else self._board.next_unit(worker))
+                    elif message[0] == 'complete':
+                        self._board.complete(*message[1:])
+                        conn.send(True)
+            except (EOFError, OSError):
+                pass
+        if worker is not None and not self._closed:
+            self._board.release(worker)
+
+    def close(self) -> None:
+        """Stop accepting workers; connected workers see the run as finished."""
+        if self._closed:
+            return
+        self._closed = True
+        # Wake the accept call so the serving thread can exit
+        try:
+            socket.create_connection(self.address, timeout=1).close()
+        except OSError:
+            pass
+        self._listener.close()
+
+    def stats(self) -> dict:
+        """Per-worker units, keys and keys/s, plus the aggregate rate."""
+        workers = {name: dict(s, keys_per_second=s['keys'] / s['seconds'] if s['seconds'] else 0.0)
+                   for name, s in self.worker_stats.items()}
+        return {'workers': workers, 'keys_per_second': self._tracker.snapshot().keys_per_second}
+
+    def run(self, local_workers: int | None = None, timeout: float | None = None,
+            max_attempts: int = 3) -> dict:
+        """
+        Start local_workers worker processes (defaults to the CPU count;
+        0 to rely on remote workers only), wait until every unit is done
+        and return the results keyed by unit id. Local workers that crash
+        are restarted and their units reissued; a unit whose worker dies
+        or disconnects max_attempts times raises RuntimeError, as it would
+        otherwise be retried forever.
+        """
+        local_workers = default_workers() if local_workers is None else local_workers
+        procs = {}
+
+        def spawn(name):
+            proc = Process(target=run_worker, args=(self.address, self.authkey, name),
+                           daemon=True)
+            proc.start()
+            procs[name] = proc
+
+        if not self._board.finished.is_set():
+            for i in range(local_workers):
+                spawn(f'local-{i}')
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while not self._board.finished.wait(0.2):
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError("Distributed run did not finish in time")
+                failed = {uid: n for uid, n in self._board.failures.items() if n >= max_attempts}
+                if failed:
+                    raise RuntimeError(f"Work units failed {max_attempts} times: "
+                                       f"{', '.join(sorted(failed))}")
+                for name, proc in list(procs.items()):
+                    if not proc.is_alive() and proc.exitcode != 0:
+                        self._board.release(name)
+                        spawn(name)
+        finally:
+            self.close()
+            for proc in procs.values():
+                proc.join(timeout=5)
+                if proc.is_alive():
+                    proc.terminate()
+        return self.results
+
+
+def run_worker(address, authkey: bytes, name: str | None = None) -> int:
+    """
+    Take units from the coordinator at address until none are left.
+    Returns the number of units this worker finished.
+    """
+    name = name or f'{socket.gethostname()}-{os.getpid()}'
+    finished = 0
+    try:
+        with Client(tuple(address), authkey=authkey) as conn:
+            while True:
+                conn.send(('next', name))
+                unit = conn.recv()
+                if unit is None:
+                    break
+                if unit == 'wait':
+                    time.sleep(_POLL_SECONDS)
+                    continue
+                started = time.perf_counter()
+                items, keys = TASKS[unit.task](*unit.args)
+                conn.send(('complete', name, unit.unit_id, items, keys,
+                           time.perf_counter() - started))
+                conn.recv()
+                finished += 1
+    except (EOFError, ConnectionError):
+        # The coordinator closed after the last unit
+        pass
+    return finished
+
+
+def adfgvx_order_units(ciphertext: str, min_key_length: int = 2, max_key_length: int = 10,
+                       exhaustive_limit: int = 7, restarts: int = 20, iterations: int = 1500,
+                       top: int = 3, seed: int = 0) -> list[WorkUnit]:
+    """Stage one of the ADFGVX attack as work units."""
+    exhaustive, climbs = adfgvx.order_tasks(ciphertext, min_key_length, max_key_length,
+                                            exhaustive_limit, restarts, iterations, top, seed)
+    return ([WorkUnit(f'exhaustive-{a[1]}-{a[2]}', 'adfgvx_order_exhaustive', a)
+             for a in exhaustive]
+            + [WorkUnit(f'climb-{a[1]}-{i}', 'adfgvx_order_climb', a)
+               for i, a in enumerate(climbs)])
+
+
+def crack_adfgvx(ciphertext: str, checkpoint_dir: str | None = None,
+                 min_key_length: int = 2, max_key_length: int = 10, orders: int = 2,
+                 restarts: int = 8, iterations: int = 6000, seed: int = 0,
+                 local_workers: int | None = None,
+                 address: tuple[str, int] = ('127.0.0.1', 0), authkey: bytes | None = None,
+                 progress=None) -> list[Candidate]:
+    """
+    adfgvx.crack run through coordinators: one job for the column orders,
+    one for the substitution restarts of the best orders. With
+    checkpoint_dir set, each job is checkpointed there and a rerun with
+    the same arguments (including seed) resumes where it stopped.
+    """
+    paths = [None, None]
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        paths = [os.path.join(checkpoint_dir, name) for name in ('orders.json', 'squares.json')]
+    rng = random.Random(seed)
+
+    units = adfgvx_order_units(ciphertext, min_key_length, max_key_length,
+                               top=orders, seed=rng.getrandbits(32))
+    results = Coordinator(units, paths[0], address, authkey, progress=progress).run(local_workers)
+    ranked = {}
+    for items in results.values():
+        for score, order, _ in items:
+            ranked[tuple(order)] = score
+    best_orders = heapq.nlargest(orders, ranked, key=ranked.get)
+
+    units = [WorkUnit(f'order-{k}-restart-{r}', 'adfgvx_substitution',
+                      (adfgvx.order_cells(ciphertext, order), rng.getrandbits(32), iterations))
+             for k, order in enumerate(best_orders) for r in range(restarts)]
+    results = Coordinator(units, paths[1], address, authkey, progress=progress).run(local_workers)
+    candidates = []
+    for k, order in enumerate(best_orders):
+        items = [results[f'order-{k}-restart-{r}'][0] for r in range(restarts)]
+        score, square, plaintext = max(items)
+        candidates.append(Candidate(score, (create_polybius_square(square), order_to_key(order)),
+                                    plaintext))
+    candidates.sort(reverse=True)
+    return candidates
+
+
+def wordlist_units(ciphertext: str, wordlist: str, cipher: str, prefix: int = 60,
+                   top: int = 10, chunk_bytes: int = 1 << 20) -> list[WorkUnit]:
+    """
+    A wordlist key attack as one unit per byte range of the wordlist.
+    Workers on other nodes need the wordlist at the same path.
+    """
+    codes = dictionary.cipher_codes(cipher, ciphertext)
+    prefix = min(prefix, len(codes))
+    path = os.path.abspath(wordlist)
+    return [WorkUnit(f'bytes-{start}', 'wordlist', (path, start, end, cipher, codes, prefix, top))
+            for start, end in dictionary._split_ranges(path, 0, chunk_bytes)]
+
+
+def wordlist_attack(ciphertext: str, wordlist: str, cipher: str, prefix: int = 60,
+                    top: int = 10, chunk_bytes: int = 1 << 20, checkpoint: str | None = None,
+                    local_workers: int | None = None,
+                    address: tuple[str, int] = ('127.0.0.1', 0), authkey: bytes | None = None,
+                    progress=None) -> list[Candidate]:
+    """dictionary.dictionary_attack (for example on Playfair) run through a coordinator."""
+    if cipher not in dictionary.ATTACKS:
+        raise ValueError(f"Unsupported cipher for dictionary attack: {cipher}")
+    units = wordlist_units(ciphertext, wordlist, cipher, prefix, top, chunk_bytes)
+    results = Coordinator(units, checkpoint, address, authkey, progress=progress).run(local_workers)
+    best = heapq.nlargest(top, ((score, word) for items in results.values()
+                                for score, word, _ in items))
+    return [Candidate(score, word, dictionary._full_decrypt(cipher, ciphertext, word))
+            for score, word in best]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run a distributed key-search worker.")
+    parser.add_argument('address', help="Coordinator address as host:port")
+    parser.add_argument('--authkey', default=os.environ.get('CLASSIC_CIPHERS_AUTHKEY', ''),
+                        help="Shared secret as hex (default: $CLASSIC_CIPHERS_AUTHKEY)")
+    parser.add_argument('--name', help="Worker name shown in the coordinator stats")
+    args = parser.parse_args(argv)
+    host, _, port = args.address.rpartition(':')
+    done = run_worker((host, int(port)), bytes.fromhex(args.authkey), args.name)
+    print(f"Finished {done} work units")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Reference English statistics used by the cryptanalysis tools.
+Holds letter frequencies and a small built-in sample text from which
+n-gram tables are derived when no corpus table is available.
+"""
+
+# Relative frequency of each letter A-Z in typical English text (percent)
+LETTER_FREQUENCIES = [
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153,
+    0.772, 4.025, 2.406, 6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056,
+    2.758, 0.978, 2.360, 0.150, 1.974, 0.074,
+]
+
+# Plain English prose used to build fallback n-gram tables.
+# Only letters matter; punctuation and case are discarded when counting.
+REFERENCE_TEXT = """
+Four score and seven years ago our fathers brought forth on this continent
+a new nation, conceived in liberty, and dedicated to the proposition that all
+men are created equal. Now we are engaged in a great civil war, testing whether
+that nation, or any nation so conceived and so dedicated, can long endure. We
+are met on a great battlefield of that war. We have come to dedicate a portion
+of that field, as a final resting place for those who here gave their lives
+that that nation might live. It is altogether fitting and proper that we
+should do this. But, in a larger sense, we can not dedicate, we can not
+consecrate, we can not hallow this ground. The brave men, living and dead, who
+struggled here, have consecrated it, far above our poor power to add or
+detract. The world will little note, nor long remember what we say here, but
+it can never forget what they did here. It is for us the living, rather, to be
+dedicated here to the unfinished work which they who fought here have thus far
+so nobly advanced. It is rather for us to be here dedicated to the great task
+remaining before us, that from these honored dead we take increased devotion
+to that cause for which they gave the last full measure of devotion, that we
+here highly resolve that these dead shall not have died in vain, that this
+nation, under God, shall have a new birth of freedom, and that government of
+the people, by the people, for the people, shall not perish from the earth.
+
+The messenger arrived at the station shortly after midnight and handed the
+letter to the officer on duty. He read it twice by the light of a small lamp,
+then folded it carefully and placed it inside his coat. The orders were
+simple enough: the company would leave at dawn, march north along the river,
+and wait at the old bridge until the second regiment joined them. Nobody was
+to know where they were going, and nothing was to be written down that the
+enemy might find. He woke the captain, who listened without a word, nodded,
+and began to dress. Within the hour the whole camp was moving quietly in the
+dark, packing tents and loading wagons, and by the time the first grey light
+showed over the hills the road behind them was empty.
+
+There is something about an old house in winter that makes every sound seem
+louder than it should be. The boards of the floor creak under the weight of a
+single step, the windows rattle when the wind comes from the east, and the
+fire in the kitchen makes a steady noise like a small animal breathing. My
+grandmother lived in such a house for most of her life, and when we visited
+her as children we would lie awake at night listening to it, trying to decide
+which of the noises were real and which we had only imagined. In the morning
+she would laugh at us and say that a house that makes no sound is a house that
+nobody loves.
+
+Science is built up with facts, as a house is with stones, but a collection of
+facts is no more a science than a heap of stones is a house. The work of the
+scientist is to find the order that lies behind what he observes, to state it
+in a form that others can test, and to accept the result of the test even when
+it goes against his hopes. This is harder than it sounds. Every one of us would
+rather be right than learn something new, and the history of discovery is full
+of people who could not give up an idea long after the evidence had turned
+against it. The method is not a set of rules so much as a habit of mind, and
+like any habit it must be practised every day if it is to be kept.
+
+When the train finally pulled into the city it was raining, and the platform
+was crowded with people holding newspapers over their heads. She found a
+porter, gave him her two cases, and followed him through the station to the
+street, where a line of cabs stood waiting with their lights on. The driver
+asked her where she wanted to go and she gave him the address of the hotel
+that her brother had written on the back of an envelope. It was not far, he
+said, but the traffic was bad because of the weather, and it would take some
+time. She did not mind. She had been travelling for three days and for the
+first time since leaving home she felt that there was no need to hurry.
+
+The general meeting of the society will be held on the first Monday of next
+month in the large hall of the public library. All members are requested to
+attend, as the committee has several important matters to place before them,
+including the report of the treasurer, the election of officers for the coming
+year, and a proposal to change the rules concerning the admission of new
+members. Those who are unable to be present in person may send their votes in
+writing to the secretary, provided that they reach him not later than the
+evening before the meeting. Tea will be served in the reading room afterwards.
+
+It was the best of times and the worst of times, and most people who lived
+through it remembered both. Prices rose every month, and wages rose more slowly,
+but there was work for anyone who wanted it and the shops were full. In the
+evenings families would gather around the radio to hear the news from abroad,
+which was never good, and then turn it off and talk about other things, as if
+by refusing to listen they could keep the trouble far away. The children did
+not understand what the adults were worried about. For them the summer was long
+and warm, the river was cold and clear, and the only question that mattered was
+whether it would rain on the day of the fair.
+"""
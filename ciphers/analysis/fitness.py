@@ -0,0 +1,142 @@
+"""
+N-gram fitness scoring for cryptanalysis.
+Scores candidate plaintexts by summing log probabilities of their
+letter n-grams, so that text closer to English gets a higher score.
+"""
+
+import math
+import os
+from functools import lru_cache
+from typing import NamedTuple
+
+from .english import REFERENCE_TEXT
+from .._compat import require_numpy
+
+_NGRAMS_ENV = 'CLASSIC_CIPHERS_NGRAMS'
+# Scorers installed with install_english_scorer, by n
+_INSTALLED = {}
+
+
+class Candidate(NamedTuple):
+    """A scored key candidate produced by one of the attack routines."""
+    score: float
+    key: object
+    plaintext: str
+
+
+def letter_codes(text: str) -> list[int]:
+    """Convert text to a list of 0-25 letter codes, dropping non-letters."""
+    return [ord(c) - 65 for c in text.upper() if 'A' <= c <= 'Z']
+
+
+class NgramScorer:
+    """
+    Log-probability table for letter n-grams.
+
+    The table is a flat list indexed by the base-26 code of the n-gram,
+    so scoring is a rolling index update plus one list lookup per letter.
+    Tables over a larger alphabet (such as A-Z0-9) set base accordingly.
+    """
+
+    def __init__(self, n: int, log_probs: list[float], floor: float, base: int = 26):
+        if len(log_probs) != base ** n:
+            raise ValueError(f"Expected {base ** n} table entries for {n}-grams")
+        self.n = n
+        self.base = base
+        self.log_probs = log_probs
+        self.floor = floor
+        self._array = None
+
+    @classmethod
+    def from_counts(cls, n: int, counts: list[int]) -> 'NgramScorer':
+        """Build a scorer from raw n-gram counts, flooring unseen n-grams."""
+        total = sum(counts)
+        if not total:
+            raise ValueError("Cannot build n-gram table from empty counts")
+        floor = math.log10(0.01 / total)
+        log_probs = [math.log10(c / total) if c else floor for c in counts]
+        return cls(n, log_probs, floor)
+
+    @classmethod
+    def from_text(cls, n: int, text: str) -> 'NgramScorer':
+        """Count the n-grams of a sample text and build a scorer from them."""
+        codes = letter_codes(text)
+        counts = [0] * (26 ** n)
+        for idx in _ngram_indices(codes, n):
+            counts[idx] += 1
+        return cls.from_counts(n, counts)
+
+    def score_codes(self, codes) -> float:
+        """Score a sequence of 0-25 letter codes."""
+        table = self.log_probs
+        return sum(table[idx] for idx in _ngram_indices(codes, self.n, self.base))
+
+    def array(self):
+        """The log-probability table as a float64 NumPy array (built once)."""
+        if self._array is None:
+            np = require_numpy('Vectorized scoring')
+            self._array = np.asarray(self.log_probs, dtype=np.float64)
+        return self._array
+
+    def score_rows(self, codes):
+        """
+        Score every row of a 2-D array of letter codes at once.
+        Returns a 1-D array with one score per row.
+        """
+        np = require_numpy('Vectorized scoring')
+        codes = np.asarray(codes, dtype=np.int64)
+        width = codes.shape[1] - self.n + 1
+        if width <= 0:
+            return np.zeros(codes.shape[0])
+        idx = codes[:, :width].copy()
+        for i in range(1, self.n):
+            idx *= self.base
+            idx += codes[:, i:i + width]
+        return self.array()[idx].sum(axis=1)
+
+    def score(self, text: str) -> float:
+        """Score text; non-letters are ignored."""
+        return self.score_codes(letter_codes(text))
+
+
+def _ngram_indices(codes, n: int, base: int = 26):
+    """Yield the base-26 (or base) index of every n-gram in a code sequence."""
+    modulus = base ** (n - 1)
+    idx = 0
+    for i, c in enumerate(codes):
+        idx = (idx % modulus) * base + c
+        if i >= n - 1:
+            yield idx
+
+
+@lru_cache(maxsize=None)
+def english_scorer(n: int = 4) -> NgramScorer:
+    """
+    Return the shared English n-gram scorer for the given n (1-4).
+    Built once per process from the bundled reference text, unless
+    $CLASSIC_CIPHERS_NGRAMS names a directory holding a letters_{n}.npz
+    table built by corpus.py.
+    """
+    if not 1 <= n <= 4:
+        raise ValueError("English n-gram scorer supports n from 1 to 4")
+    if n in _INSTALLED:
+        return _INSTALLED[n]
+    tables = os.environ.get(_NGRAMS_ENV)
+    if tables and os.path.exists(os.path.join(tables, f'letters_{n}.npz')):
+        from .corpus import load_scorer
+        return load_scorer(os.path.join(tables, f'letters_{n}.npz'))
+    return NgramScorer.from_text(n, REFERENCE_TEXT)
+
+
+def install_english_scorer(n: int, scorer: NgramScorer) -> None:
+    """
+    Make english_scorer(n) return scorer in this process, e.g. one whose
+    table lives in shared memory (see pool.WarmPool).
+    """
+    _INSTALLED[n] = scorer
+    english_scorer.cache_clear()
+
+
+def choose_scorer(length: int) -> NgramScorer:
+    """Pick quadgrams for reasonably long texts and bigrams for short ones."""
+    return english_scorer(4 if length >= 40 else 2)
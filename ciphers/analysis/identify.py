@@ -0,0 +1,277 @@
+"""
+Cipher-type identification from ciphertext statistics.
+Computes a compact feature vector for a whole batch of messages in one
+vectorized pass and picks the most likely cipher of this package with
+structural rules plus a nearest-centroid model.
+"""
+
+import random
+from functools import lru_cache
+
+from .english import LETTER_FREQUENCIES, REFERENCE_TEXT
+from .._compat import numpy as np, require_numpy
+
+CIPHERS = ('caesar', 'vigenere', 'hill', 'playfair', 'atbash',
+           'rail_fence', 'adfgvx', 'columnar', 'autokey')
+
+FEATURES = (
+    'ioc',             # index of coincidence of the letters
+    'max_period_ioc',  # best mean column IoC over periods 2-10
+    'period_gain',     # max_period_ioc / ioc, high for periodic ciphers
+    'double_rate',     # consecutive identical letters per letter pair
+    'pair_double',     # identical letters inside even-aligned pairs
+    'pair_ioc_gain',   # IoC of even-aligned vs odd-aligned digraphs
+    'english_dist',    # squared distance of unigram freqs from English
+    'shift_dist',      # same, after the best Caesar shift
+    'atbash_dist',     # same, after reversing the alphabet
+    'lower_frac',      # share of lowercase letters
+    'space_frac',      # share of whitespace characters
+    'digit_frac',      # share of digits
+    'adfgvx_only',     # 1 if every character is one of ADFGVX
+    'even_length',     # 1 if the letter count is even
+    'has_j',           # 1 if the letter J appears
+    'has_z',           # 1 if the letter Z appears
+    'letters',         # number of letters
+)
+
+_MAX_PERIOD = 10
+_CHUNK = 4096
+
+
+def _english_vector():
+    e = np.array(LETTER_FREQUENCIES, dtype=np.float64)
+    return e / e.sum()
+
+
+def _column_ioc(msg_ids, codes, positions, n_msgs, period, lengths):
+    """Mean IoC over the period columns of every message."""
+    cols = positions % period
+    counts = np.bincount((msg_ids * period + cols) * 26 + codes,
+                         minlength=n_msgs * period * 26).reshape(n_msgs, period, 26)
+    col_len = counts.sum(axis=2)
+    coinc = (counts * (counts - 1)).sum(axis=2)
+    denom = col_len * (col_len - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ioc = np.where(denom > 0, coinc / np.maximum(denom, 1), 0.0)
+    # Ignore periods that leave columns with almost no letters
+    valid = lengths >= period * 4
+    return np.where(valid, ioc.mean(axis=1), 0.0)
+
+
+def _digraph_ioc(msg_ids, codes, positions, n_msgs, offset):
+    """IoC of non-overlapping digraphs starting at the given alignment."""
+    same_msg = msg_ids[:-1] == msg_ids[1:]
+    start = same_msg & ((positions[:-1] % 2) == offset)
+    pair = codes[:-1][start] * 26 + codes[1:][start]
+    counts = np.bincount(msg_ids[:-1][start] * 676 + pair,
+                         minlength=n_msgs * 676).reshape(n_msgs, 676)
+    n = counts.sum(axis=1)
+    coinc = (counts * (counts - 1)).sum(axis=1)
+    return np.where(n > 1, coinc / np.maximum(n * (n - 1), 1), 0.0)
+
+
+def _features_chunk(texts):
+    n_msgs = len(texts)
+    raw = [t.encode('ascii', 'replace') for t in texts]
+    lengths = np.fromiter((len(r) for r in raw), dtype=np.int64, count=n_msgs)
+    buf = np.frombuffer(b''.join(raw), dtype=np.uint8)
+    msg_of_char = np.repeat(np.arange(n_msgs), lengths)
+    total = np.maximum(lengths, 1)
+
+    upper = (buf >= 65) & (buf <= 90)
+    lower = (buf >= 97) & (buf <= 122)
+    digit = (buf >= 48) & (buf <= 57)
+    space = (buf == 32) | (buf == 10) | (buf == 9) | (buf == 13)
+    adfgvx = np.isin(buf, np.frombuffer(b'ADFGVX', dtype=np.uint8))
+
+    def per_msg(mask):
+        return np.bincount(msg_of_char[mask], minlength=n_msgs)
+
+    letter = upper | lower
+    msg_ids = msg_of_char[letter]
+    codes = ((buf[letter] | 0x20) - 97).astype(np.int64)
+    n_letters = np.bincount(msg_ids, minlength=n_msgs)
+    starts = np.concatenate(([0], np.cumsum(n_letters)[:-1]))
+    positions = np.arange(len(codes)) - starts[msg_ids]
+
+    counts = np.bincount(msg_ids * 26 + codes, minlength=n_msgs * 26).reshape(n_msgs, 26)
+    denom = np.maximum(n_letters * (n_letters - 1), 1)
+    ioc = (counts * (counts - 1)).sum(axis=1) / denom
+
+    period_ioc = np.stack([_column_ioc(msg_ids, codes, positions, n_msgs, p, n_letters)
+                           for p in range(2, _MAX_PERIOD + 1)], axis=1)
+    max_period_ioc = np.maximum(period_ioc.max(axis=1), ioc)
+
+    same_msg = msg_ids[:-1] == msg_ids[1:]
+    doubled = same_msg & (codes[:-1] == codes[1:])
+    double_rate = np.bincount(msg_ids[:-1][doubled], minlength=n_msgs) / np.maximum(n_letters - 1, 1)
+    in_pair = doubled & (positions[:-1] % 2 == 0)
+    pair_double = np.bincount(msg_ids[:-1][in_pair], minlength=n_msgs) / np.maximum(n_letters // 2, 1)
+
+    even_ioc = _digraph_ioc(msg_ids, codes, positions, n_msgs, 0)
+    odd_ioc = _digraph_ioc(msg_ids, codes, positions, n_msgs, 1)
+    pair_ioc_gain = (even_ioc + 1e-3) / (odd_ioc + 1e-3)
+
+    freqs = counts / np.maximum(n_letters, 1)[:, None]
+    english = _english_vector()
+    english_dist = ((freqs - english) ** 2).sum(axis=1)
+    # Distance to every Caesar shift of English in one matrix product
+    shifted = np.stack([np.roll(english, s) for s in range(26)])
+    shift_dist = ((freqs ** 2).sum(axis=1)[:, None] + (shifted ** 2).sum(axis=1)[None, :]
+                  - 2 * freqs @ shifted.T).min(axis=1)
+    atbash_dist = ((freqs - english[::-1]) ** 2).sum(axis=1)
+
+    return np.column_stack([
+        ioc, max_period_ioc, max_period_ioc / np.maximum(ioc, 1e-6),
+        double_rate, pair_double, pair_ioc_gain,
+        english_dist, shift_dist, atbash_dist,
+        per_msg(lower) / total, per_msg(space) / total, per_msg(digit) / total,
+        (per_msg(adfgvx) == lengths) & (lengths > 0),
+        (n_letters % 2) == 0,
+        counts[:, 9] > 0,
+        counts[:, 25] > 0,
+        n_letters,
+    ]).astype(np.float64)
+
+
+def extract_features(texts) -> 'np.ndarray':
+    """
+    Compute the feature matrix (one row per message, columns as in
+    FEATURES) for a list of ciphertexts. Messages are processed in
+    chunks so memory stays bounded for very large batches.
+    """
+    require_numpy('Cipher identification')
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, len(FEATURES)))
+    return np.concatenate([_features_chunk(texts[i:i + _CHUNK])
+                           for i in range(0, len(texts), _CHUNK)])
+
+
+class CipherClassifier:
+    """
+    Nearest-centroid classifier over standardized features, with hard
+    structural rules (ADFGVX alphabet, Playfair digraph constraints)
+    applied first.
+    """
+
+    def __init__(self, labels, centroids, scale):
+        self.labels = tuple(labels)
+        self.centroids = centroids
+        self.scale = scale
+
+    @classmethod
+    def fit(cls, texts, labels) -> 'CipherClassifier':
+        """Train centroids from labeled ciphertexts."""
+        require_numpy('Cipher identification')
+        feats = extract_features(texts)
+        labels = np.asarray(labels)
+        names = [c for c in CIPHERS if c in set(labels.tolist())]
+        scale = feats.std(axis=0)
+        scale[scale == 0] = 1.0
+        centroids = np.stack([feats[labels == name].mean(axis=0) for name in names]) / scale
+        return cls(names, centroids, scale)
+
+    def predict_features(self, feats) -> list[str]:
+        """Label rows of a feature matrix produced by extract_features."""
+        z = feats / self.scale
+        dist = ((z[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        idx = {name: i for i, name in enumerate(self.labels)}
+        col = {name: i for i, name in enumerate(FEATURES)}
+
+        # Structural rules: outputs that only one cipher can produce
+        adfgvx_only = feats[:, col['adfgvx_only']] > 0
+        # playfair's 5x5 square drops J, or Z when the key lacks an I,
+        # so its output never holds both and never repeats inside a pair
+        not_playfair = (((feats[:, col['has_j']] > 0) & (feats[:, col['has_z']] > 0))
+                        | (feats[:, col['pair_double']] > 0)
+                        | (feats[:, col['even_length']] == 0))
+        if 'adfgvx' in idx:
+            dist[:, idx['adfgvx']] = np.where(adfgvx_only, -1.0, np.inf)
+        if 'playfair' in idx:
+            # Any other cipher rarely avoids both J and doubled pairs for long
+            surely_playfair = (~not_playfair & (feats[:, col['letters']] >= 60)
+                               & (feats[:, col['lower_frac']] == 0))
+            dist[:, idx['playfair']] = np.where(
+                not_playfair, np.inf, np.where(surely_playfair, -1.0, dist[:, idx['playfair']]))
+        best = dist.argmin(axis=1)
+
+        # Caesar and Atbash look alike to the centroids; the reflected and
+        # best-shift unigram distances tell them apart directly
+        if 'caesar' in idx and 'atbash' in idx:
+            mono = (best == idx['caesar']) | (best == idx['atbash'])
+            prefer_atbash = feats[:, col['atbash_dist']] <= feats[:, col['shift_dist']]
+            best = np.where(mono, np.where(prefer_atbash, idx['atbash'], idx['caesar']), best)
+        return [self.labels[i] for i in best]
+
+    def predict(self, texts) -> list[str]:
+        """Return the most likely cipher name for each ciphertext."""
+        return self.predict_features(extract_features(texts))
+
+
+def _random_word(rng, low: int, high: int) -> str:
+    return ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(rng.randint(low, high)))
+
+
+def encrypt_sample(cipher: str, plaintext: str, rng: random.Random) -> str:
+    """
+    Encrypt plaintext with a random key using the package cipher module.
+    Raises ValueError when the drawn key is rejected (e.g. a singular Hill
+    matrix); callers simply draw again.
+    """
+    from .. import adfgvx, atbash, autokey, caesar, columnar, hill, playfair, rail_fence, vigenere
+    if cipher == 'caesar':
+        return caesar.encrypt(plaintext, rng.randint(1, 25))
+    if cipher == 'vigenere':
+        return vigenere.encrypt(plaintext, _random_word(rng, 3, 10))
+    if cipher == 'hill':
+        letters = ''.join(c for c in plaintext if c.isalpha())
+        return hill.encrypt(letters, _random_word(rng, 4, 4))
+    if cipher == 'playfair':
+        return playfair.encrypt(plaintext, _random_word(rng, 4, 10))
+    if cipher == 'atbash':
+        return atbash.encrypt(plaintext)
+    if cipher == 'rail_fence':
+        return rail_fence.encrypt(plaintext, rng.randint(2, 8))
+    if cipher == 'adfgvx':
+        return adfgvx.encrypt(plaintext, _random_word(rng, 4, 10), _random_word(rng, 3, 8))
+    if cipher == 'columnar':
+        return columnar.encrypt(plaintext, _random_word(rng, 3, 10))
+    if cipher == 'autokey':
+        return autokey.encrypt(plaintext, _random_word(rng, 3, 8))
+    raise ValueError(f"Unknown cipher: {cipher}")
+
+
+def generate_samples(count: int, min_length: int = 80, max_length: int = 400,
+                     seed: int | None = None, text: str = REFERENCE_TEXT):
+    """
+    Generate count labeled (ciphertext, cipher) samples by encrypting
+    random slices of an English text under random keys.
+    """
+    rng = random.Random(seed)
+    source = ' '.join(text.split())
+    samples = []
+    for i in range(count):
+        cipher = CIPHERS[i % len(CIPHERS)]
+        length = rng.randint(min_length, max_length)
+        start = rng.randrange(max(1, len(source) - length))
+        while True:
+            try:
+                ciphertext = encrypt_sample(cipher, source[start:start + length], rng)
+            except ValueError:
+                continue
+            break
+        samples.append((ciphertext, cipher))
+    return samples
+
+
+@lru_cache(maxsize=None)
+def default_classifier() -> CipherClassifier:
+    """Classifier trained once per process on generated samples."""
+    samples = generate_samples(1800, seed=2024)
+    return CipherClassifier.fit([s for s, _ in samples], [c for _, c in samples])
+
+
+def identify(texts) -> list[str]:
+    """Guess which cipher produced each ciphertext in a batch."""
+    return default_classifier().predict(texts)
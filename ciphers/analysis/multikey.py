@@ -0,0 +1,136 @@
+"""
+Multi-key batch evaluation.
+Decrypts one ciphertext under K candidate keys in a single vectorized
+call and returns either the K x N plaintext matrix (letter codes 0-25)
+or K fitness scores. Scores are accumulated over column blocks, so the
+full K x N matrix is never held in memory when only scores are wanted.
+
+Only the letters of the ciphertext take part (as the Vigenere key only
+advances on letters); Hill results keep any padding X.
+"""
+
+from .fitness import choose_scorer, letter_codes
+from .transposition import rail_fence_gather
+from .._compat import numpy as np, require_numpy
+from ..hill import MOD26_INVERSES
+
+# Upper bound on K * block width for one scoring step
+_BLOCK_CELLS = 1 << 22
+
+
+def _codes(ciphertext):
+    require_numpy('Multi-key evaluation')
+    if isinstance(ciphertext, str):
+        return np.array(letter_codes(ciphertext), dtype=np.int64)
+    return np.asarray(ciphertext, dtype=np.int64)
+
+
+def _evaluate(block, n_keys: int, length: int, score: bool, scorer, align: int = 1):
+    """
+    Build the result matrix from block(start, stop) -> (K, stop - start)
+    plaintext codes, or accumulate n-gram scores block by block.
+    """
+    if not score:
+        return block(0, length).astype(np.uint8)
+    scorer = scorer or choose_scorer(length)
+    overlap = scorer.n - 1
+    width = max(_BLOCK_CELLS // max(n_keys, 1), 64)
+    width -= width % align
+    total = np.zeros(n_keys)
+    start = 0
+    while start < length:
+        stop = min(start + width, length)
+        # Each block re-reads the last n-1 letters of the previous one so
+        # n-grams spanning the boundary are counted exactly once
+        need = max(start - overlap, 0)
+        lo = need - need % align
+        total += scorer.score_rows(block(lo, stop)[:, need - lo:])
+        start = stop
+    return total
+
+
+def caesar(ciphertext, shifts, score: bool = False, scorer=None):
+    """
+    Decrypt under every Caesar shift in shifts (length K).
+    Returns a (K, N) uint8 matrix of letter codes, or K scores.
+    """
+    codes = _codes(ciphertext)
+    shifts = np.asarray(shifts, dtype=np.int64)[:, None]
+    return _evaluate(lambda a, b: (codes[a:b][None, :] - shifts) % 26,
+                     len(shifts), len(codes), score, scorer)
+
+
+def vigenere(ciphertext, keys, score: bool = False, scorer=None):
+    """
+    Decrypt under K Vigenere keys of equal length.
+    keys is a list of key strings or a (K, L) array of shifts.
+    """
+    codes = _codes(ciphertext)
+    if len(keys) and isinstance(keys[0], str):
+        shifts = np.array([[ord(c) - 65 for c in k.upper() if 'A' <= c <= 'Z'] for k in keys],
+                          dtype=np.int64)
+    else:
+        shifts = np.asarray(keys, dtype=np.int64)
+    if shifts.ndim != 2 or shifts.shape[1] == 0:
+        raise ValueError("Vigenere keys must be non-empty and of equal length")
+    period = shifts.shape[1]
+
+    def block(a, b):
+        return (codes[a:b][None, :] - shifts[:, np.arange(a, b) % period]) % 26
+    return _evaluate(block, len(shifts), len(codes), score, scorer)
+
+
+def hill_inverses(keys):
+    """
+    Inverse key matrices mod 26 for K Hill keys.
+    keys is a list of 4-letter strings or a (K, 2, 2) array. Returns the
+    (K, 2, 2) inverses and a boolean mask of invertible keys (rows of
+    singular keys are zero).
+    """
+    require_numpy('Multi-key evaluation')
+    if len(keys) and isinstance(keys[0], str):
+        mats = np.array([[ord(c) - 65 for c in k.upper()] for k in keys],
+                        dtype=np.int64).reshape(-1, 2, 2)
+    else:
+        mats = np.asarray(keys, dtype=np.int64).reshape(-1, 2, 2) % 26
+    det = (mats[:, 0, 0] * mats[:, 1, 1] - mats[:, 0, 1] * mats[:, 1, 0]) % 26
+    det_inv = np.array(MOD26_INVERSES, dtype=np.int64)[det]
+    valid = det_inv >= 0
+    adj = np.stack([np.stack([mats[:, 1, 1], -mats[:, 0, 1]], axis=1),
+                    np.stack([-mats[:, 1, 0], mats[:, 0, 0]], axis=1)], axis=1)
+    inverse = (adj * np.where(valid, det_inv, 0)[:, None, None]) % 26
+    return inverse, valid
+
+
+def hill(ciphertext, keys, score: bool = False, scorer=None):
+    """
+    Decrypt under K Hill 2x2 keys with one (K,2,2) x (2,N/2) einsum mod 26.
+    Singular keys give all-zero rows (and score -inf).
+    """
+    codes = _codes(ciphertext)
+    if len(codes) % 2:
+        raise ValueError("Hill ciphertext must have an even number of letters")
+    inverse, valid = hill_inverses(keys)
+
+    def block(a, b):
+        pairs = codes[a:b].reshape(-1, 2).T  # (2, M)
+        plain = np.einsum('kij,jm->kim', inverse, pairs) % 26  # (K, 2, M)
+        return plain.transpose(0, 2, 1).reshape(len(inverse), b - a)
+    result = _evaluate(block, len(inverse), len(codes), score, scorer, align=2)
+    if score:
+        result[~valid] = -np.inf
+    return result
+
+
+def rail_fence(ciphertext, rails, score: bool = False, scorer=None):
+    """Decrypt under every rail count in rails (length K)."""
+    codes = _codes(ciphertext)
+    gathers = np.array([rail_fence_gather(int(r), len(codes)) if r >= 2
+                        else tuple(range(len(codes))) for r in rails], dtype=np.int64)
+    return _evaluate(lambda a, b: codes[gathers[:, a:b]],
+                     len(gathers), len(codes), score, scorer)
+
+
+def to_text(row) -> str:
+    """Convert one row of letter codes to an uppercase string."""
+    return bytes(np.asarray(row, dtype=np.uint8) + 65).decode('ascii')
@@ -0,0 +1,86 @@
+"""
+Process-pool helpers shared by the attack routines.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+
+class Progress(NamedTuple):
+    """Progress snapshot passed to attack progress callbacks."""
+    stage: str
+    completed: int
+    total: int
+    best_score: float
+    keys_per_second: float
+
+
+# Warm pool (see pool.WarmPool) that run_tasks sends work to while it is in use
+_current_pool = None
+
+
+def use_pool(pool):
+    """Make run_tasks use pool (None for a fresh pool per call); returns the previous one."""
+    global _current_pool
+    previous, _current_pool = _current_pool, pool
+    return previous
+
+
+def current_pool():
+    """The pool set with use_pool, or None."""
+    return _current_pool
+
+
+def default_workers() -> int:
+    """Number of worker processes to use when the caller does not say."""
+    return os.cpu_count() or 1
+
+
+def run_tasks(func, tasks, workers: int | None = None, chunksize: int = 1):
+    """
+    Apply func to each argument tuple in tasks and yield results in order.
+    Runs in-process when only one worker is requested so small searches
+    and debugging do not pay for starting a pool. Inside a `with
+    WarmPool():` block the tasks go to its long-lived workers instead.
+    """
+    tasks = list(tasks)
+    if _current_pool is not None and workers != 1 and len(tasks) > 1:
+        yield from _current_pool.map(func, tasks, chunksize)
+        return
+    workers = workers or default_workers()
+    if workers <= 1 or len(tasks) <= 1:
+        for args in tasks:
+            yield func(*args)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        yield from pool.map(func, *zip(*tasks), chunksize=chunksize)
+
+
+class ProgressTracker:
+    """Counts finished tasks and evaluated keys and reports them to a callback."""
+
+    def __init__(self, stage: str, total: int, callback=None):
+        self.stage = stage
+        self.total = total
+        self.callback = callback
+        self.completed = 0
+        self.keys = 0
+        self.best_score = float('-inf')
+        self.started = time.perf_counter()
+
+    def update(self, keys: int, best_score: float) -> Progress:
+        """Record one finished task that evaluated the given number of keys."""
+        self.completed += 1
+        self.keys += keys
+        self.best_score = max(self.best_score, best_score)
+        snapshot = self.snapshot()
+        if self.callback is not None:
+            self.callback(snapshot)
+        return snapshot
+
+    def snapshot(self) -> Progress:
+        elapsed = time.perf_counter() - self.started
+        rate = self.keys / elapsed if elapsed > 0 else 0.0
+        return Progress(self.stage, self.completed, self.total, self.best_score, rate)
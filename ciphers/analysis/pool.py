@@ -0,0 +1,286 @@
+"""
+Long-lived worker pool for repeated searches.
+run_tasks starts a fresh process pool for every attack, so each call pays
+for process start-up, for pickling its inputs to every task and for each
+worker rebuilding the English n-gram tables. A WarmPool starts its
+workers once. Large read-only data (n-gram tables, long ciphertexts,
+NumPy arrays) is copied into multiprocessing.shared_memory a single time
+and tasks only carry a SharedRef descriptor, which workers attach to once
+and keep until the parent releases the block. Blocks made for the
+arguments of one map() or submit() call are released when it finishes;
+share() a value to keep it in place across calls. Because the workers
+outlive their tasks, compiled key schedules (the lru_caches in the
+cipher modules, or anything stored with worker_cache) stay warm from
+one task to the next.
+
+    with WarmPool() as pool:
+        substitution.crack(text)       # run_tasks goes through the pool
+        pool.map(func, tasks)          # or use it directly
+"""
+
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+from . import parallel
+from .fitness import NgramScorer, english_scorer, install_english_scorer
+from .._compat import numpy as np
+
+# str, bytes and arrays at least this large are shared rather than pickled
+SHARE_THRESHOLD = 64 * 1024
+# Entries kept by worker_cache in each worker
+WORKER_CACHE_SIZE = 256
+
+
+class SharedRef(NamedTuple):
+    """Descriptor of a shared-memory block; cheap to pickle into tasks."""
+    name: str
+    kind: str           # 'bytes', 'str', 'doubles' or 'ndarray'
+    size: int           # bytes in use (the block may be rounded up)
+    shape: tuple = ()
+    dtype: str = ''
+
+
+# Worker-side state: attached blocks by name, blocks still viewed after
+# their release, and warm per-worker values
+_attached = {}
+_closing = []
+_warm = OrderedDict()
+
+
+def attach(ref: SharedRef):
+    """
+    Value of a shared block in this process, attached on first use.
+    Arrays and 'doubles' tables are zero-copy read-only views; str and
+    bytes are copied out once per process.
+    """
+    if ref.name in _attached:
+        return _attached[ref.name][1]
+    shm = shared_memory.SharedMemory(name=ref.name)
+    if ref.kind == 'ndarray':
+        value = np.ndarray(ref.shape, dtype=ref.dtype, buffer=shm.buf)
+        value.flags.writeable = False
+    elif ref.kind == 'doubles':
+        value = shm.buf[:ref.size].toreadonly().cast('d')
+    elif ref.kind == 'str':
+        value = bytes(shm.buf[:ref.size]).decode('utf-8')
+    else:
+        value = bytes(shm.buf[:ref.size])
+    _attached[ref.name] = (shm, value)
+    return value
+
+
+def worker_cache(key, factory):
+    """
+    Per-process cache for expensive task set-up such as key schedules or
+    parsed inputs: returns the value stored under key, calling factory()
+    the first time. Kept between tasks in a WarmPool's workers.
+    """
+    if key in _warm:
+        _warm.move_to_end(key)
+        return _warm[key]
+    value = _warm[key] = factory()
+    if len(_warm) > WORKER_CACHE_SIZE:
+        _warm.popitem(last=False)
+    return value
+
+
+def _resolve(arg):
+    return attach(arg) if isinstance(arg, SharedRef) else arg
+
+
+def _detach_released(live) -> None:
+    """Close attached blocks whose names are no longer in the parent's live set."""
+    for name in [name for name in _attached if name not in live]:
+        _closing.append(_attached.pop(name)[0])
+    for shm in list(_closing):
+        try:
+            shm.close()
+        except BufferError:
+            # A view is still held (e.g. in worker_cache); retry on a later task
+            continue
+        _closing.remove(shm)
+
+
+def _call(func, args, live=None):
+    if live is not None:
+        _detach_released(live)
+    return func(*map(_resolve, args))
+
+
+def _init_worker(scorers) -> None:
+    """Install the parent's English scorers, backed by shared memory."""
+    # A forked worker inherits the parent's current pool; tasks run here
+    parallel.use_pool(None)
+    for n, ref, floor in scorers:
+        table = attach(ref)
+        scorer = NgramScorer(n, table, floor)
+        if np is not None:
+            scorer._array = np.frombuffer(table, dtype=np.float64)
+        install_english_scorer(n, scorer)
+
+
+def _nbytes(obj) -> int:
+    if isinstance(obj, str):
+        return len(obj)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return memoryview(obj).nbytes
+    if np is not None and isinstance(obj, np.ndarray):
+        return obj.nbytes
+    return 0
+
+
+class WarmPool:
+    """
+    Process pool whose workers persist between searches.
+
+    Args:
+        workers: Worker processes (defaults to the CPU count)
+        share_scorers: English n-gram sizes whose tables are placed in
+            shared memory and installed in every worker
+    """
+
+    def __init__(self, workers: int | None = None, share_scorers=(2, 4)):
+        self.workers = workers or parallel.default_workers()
+        self._blocks = {}
+        self._by_digest = {}
+        # Blocks from share(), kept until release() or close()
+        self._kept = set()
+        # Calls still using each per-call block
+        self._users = {}
+        self._lock = threading.RLock()
+        scorers = [(n, self.share(array('d', english_scorer(n).log_probs)), english_scorer(n).floor)
+                   for n in share_scorers]
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                             initargs=(scorers,))
+        self._previous = None
+
+    def share(self, obj) -> SharedRef:
+        """
+        Copy a str, bytes-like object or NumPy array into shared memory and
+        return its descriptor. Identical content is only stored once.
+        array('d') and other typed buffers are attached as float views.
+        The block stays in place until release() or close().
+        """
+        ref = self._share(obj)
+        self._kept.add(ref.name)
+        return ref
+
+    def _share(self, obj) -> SharedRef:
+        if isinstance(obj, str):
+            kind, data, shape, dtype = 'str', obj.encode('utf-8'), (), ''
+        elif np is not None and isinstance(obj, np.ndarray):
+            obj = np.ascontiguousarray(obj)
+            kind, data, shape, dtype = 'ndarray', obj.data.cast('B'), obj.shape, obj.dtype.str
+        elif isinstance(obj, array) and obj.typecode == 'd':
+            kind, data, shape, dtype = 'doubles', memoryview(obj).cast('B'), (), ''
+        elif isinstance(obj, (bytes, bytearray, memoryview)):
+            kind, data, shape, dtype = 'bytes', memoryview(obj).cast('B'), (), ''
+        else:
+            raise TypeError(f"Cannot share {type(obj).__name__} objects")
+        digest = (kind, shape, dtype, hashlib.blake2b(data, digest_size=16).digest())
+        with self._lock:
+            if digest in self._by_digest:
+                return self._by_digest[digest]
+            shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+            shm.buf[:len(data)] = data
+            ref = SharedRef(shm.name, kind, len(data), shape, dtype)
+            self._blocks[ref.name] = shm
+            self._by_digest[digest] = ref
+            return ref
+
+    def release(self, ref: SharedRef) -> None:
+        """
+        Free a shared block once no task will use it again. Workers close
+        their attachment when they next receive a task.
+        """
+        with self._lock:
+            self._kept.discard(ref.name)
+            shm = self._blocks.pop(ref.name, None)
+            if shm is not None:
+                self._by_digest = {d: r for d, r in self._by_digest.items()
+                                   if r.name != ref.name}
+                shm.close()
+                shm.unlink()
+
+    def _prepare(self, args, shared: dict) -> tuple:
+        out = []
+        for arg in args:
+            if _nbytes(arg) >= SHARE_THRESHOLD:
+                if id(arg) not in shared:
+                    shared[id(arg)] = self._share(arg)
+                arg = shared[id(arg)]
+            out.append(arg)
+        return tuple(out)
+
+    def _prepare_call(self, arg_tuples) -> tuple[list, list, frozenset]:
+        """
+        Prepared argument tuples of one call, the per-call blocks it holds
+        and the names of the blocks live while it runs.
+        """
+        shared = {}
+        # Under the lock so no other call's _drop frees a block reused here
+        with self._lock:
+            prepared = [self._prepare(args, shared) for args in arg_tuples]
+            held = [ref for ref in set(shared.values()) if ref.name not in self._kept]
+            for ref in held:
+                self._users[ref.name] = self._users.get(ref.name, 0) + 1
+            return prepared, held, frozenset(self._blocks)
+
+    def _drop(self, held) -> None:
+        """End a call's use of its blocks, releasing those no other call holds."""
+        with self._lock:
+            for ref in held:
+                self._users[ref.name] -= 1
+                if not self._users[ref.name]:
+                    del self._users[ref.name]
+                    if ref.name not in self._kept:
+                        self.release(ref)
+
+    def submit(self, func, *args):
+        """Schedule func(*args) and return a Future; large arguments are shared."""
+        (prepared,), held, live = self._prepare_call([args])
+        future = self._executor.submit(_call, func, prepared, live)
+        future.add_done_callback(lambda _: self._drop(held))
+        return future
+
+    def map(self, func, tasks, chunksize: int = 1):
+        """
+        Apply func to each argument tuple in tasks and yield results in
+        order, like run_tasks. Large str, bytes and array arguments are
+        placed in shared memory once per call and arrive in the workers
+        as their attached values; those blocks are released when the
+        results have been consumed or the generator is closed.
+        """
+        # Keep the originals alive so id() stays unique while preparing
+        tasks = list(tasks)
+        prepared, held, live = self._prepare_call(tasks)
+        try:
+            yield from self._executor.map(_call, repeat(func), prepared, repeat(live),
+                                          chunksize=chunksize)
+        finally:
+            self._drop(held)
+
+    def close(self) -> None:
+        """Stop the workers and free every shared block."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for shm in self._blocks.values():
+            shm.close()
+            shm.unlink()
+        self._blocks.clear()
+        self._by_digest.clear()
+        self._kept.clear()
+        self._users.clear()
+
+    def __enter__(self) -> 'WarmPool':
+        self._previous = parallel.use_pool(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        parallel.use_pool(self._previous)
+        self.close()
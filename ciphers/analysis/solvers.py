@@ -0,0 +1,444 @@
+"""
+Anytime interface to the attack routines.
+A Solver runs the same tasks as the matching crack function one at a
+time (or a few at a time on a process pool) and reports the best key so
+far after each one, so a caller can show progress, stop when a time or
+task budget is spent, or cancel from another thread. Without a budget a
+solver does the same amount of work as the crack function; with one,
+hill-climbing restarts continue until the budget runs out. Task seeds
+come from one seeded generator and results are folded in the order the
+tasks were issued, so a seed and a task budget always give the same
+answer.
+
+    solver = solvers.solver('substitution', ciphertext, seconds=10, seed=1)
+    for snap in solver:                       # or: async for snap in solver
+        print(snap.score, snap.key, snap.keys_per_second)
+    best = solver.results()
+
+solve_all runs several solvers at once under asyncio.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import NamedTuple
+
+from . import adfgvx, autokey, dictionary, substitution, transposition
+from .fitness import Candidate, letter_codes
+from .parallel import ProgressTracker, current_pool, default_workers
+from .._compat import require_numpy
+from ..adfgvx import create_polybius_square
+
+# How often a pooled solver checks for cancellation while tasks run
+_POLL_SECONDS = 0.1
+
+
+class Snapshot(NamedTuple):
+    """Best-so-far state of a running solver."""
+    key: object
+    plaintext: str
+    score: float
+    keys_per_second: float
+    stage: str
+    completed: int
+    keys: int
+    elapsed: float
+    done: bool
+
+
+class Stage(NamedTuple):
+    """
+    One phase of a search: func is applied to each argument tuple of tasks
+    (which may be endless), and collect turns a result into
+    (candidates, keys evaluated).
+    """
+    name: str
+    func: object
+    tasks: object
+    collect: object
+
+
+class Solver:
+    """
+    Base class of the anytime solvers; subclasses define stages().
+
+    Args:
+        ciphertext: Ciphertext to attack
+        seconds: Wall-clock budget, checked between tasks
+        max_tasks: Iteration budget: at most this many tasks (restarts,
+            key lengths, column shards or wordlist slices) are run
+        seed: Seed for reproducible searches; a random one is chosen and
+            kept in .seed when omitted
+        workers: Worker processes (defaults to the CPU count; 1 runs
+            in-process)
+        top: Number of ranked candidates kept by results()
+    """
+    name = ''
+
+    def __init__(self, ciphertext: str, seconds: float | None = None,
+                 max_tasks: int | None = None, seed: int | None = None,
+                 workers: int | None = None, top: int = 5):
+        self.ciphertext = ciphertext
+        self.seconds = seconds
+        self.max_tasks = max_tasks
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.workers = workers or default_workers()
+        self.top = top
+        self._cancelled = threading.Event()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.rng = random.Random(self.seed)
+        self.stage = ''
+        self._tracker = ProgressTracker(self.name, 0)
+        self._best = {}
+        self._leader = None
+
+    @property
+    def budgeted(self) -> bool:
+        return self.seconds is not None or self.max_tasks is not None
+
+    def stages(self):
+        """Yield the Stages of the search; later stages may use earlier results."""
+        raise NotImplementedError
+
+    def rounds(self, count: int):
+        """Restart numbers: count of them, or endless while a budget is set."""
+        return itertools.count() if self.budgeted else range(count)
+
+    def identity(self, cand: Candidate):
+        """What makes two candidates the same answer for results()."""
+        return cand.key
+
+    def cancel(self) -> None:
+        """Ask the search to stop after the tasks now running; safe from any thread."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _out_of_time(self) -> bool:
+        return (self._cancelled.is_set() or self.seconds is not None
+                and time.perf_counter() - self._tracker.started >= self.seconds)
+
+    def _may_start(self, running: int) -> bool:
+        return not self._out_of_time() and (
+            self.max_tasks is None or self._tracker.completed + running < self.max_tasks)
+
+    def _collect(self, stage: Stage, result) -> None:
+        candidates, keys = stage.collect(result)
+        for cand in candidates:
+            ident = self.identity(cand)
+            held = self._best.get(ident)
+            if held is None or cand.score > held.score:
+                self._best[ident] = cand
+            if self._leader is None or cand.score > self._leader.score:
+                self._leader = cand
+        self._tracker.update(keys, self._leader.score if self._leader else float('-inf'))
+
+    def snapshot(self, done: bool = False) -> Snapshot:
+        progress = self._tracker.snapshot()
+        lead = self._leader or Candidate(float('-inf'), None, '')
+        return Snapshot(lead.key, lead.plaintext, lead.score, progress.keys_per_second,
+                        self.stage, progress.completed, self._tracker.keys,
+                        time.perf_counter() - self._tracker.started, done)
+
+    def results(self, top: int | None = None) -> list[Candidate]:
+        """Ranked distinct candidates found so far."""
+        return heapq.nlargest(top or self.top, self._best.values())
+
+    def snapshots(self):
+        """
+        Run the search, yielding a Snapshot after every finished task and a
+        final one with done=True. Closing the generator stops the search.
+        A cancel() from an earlier run is forgotten when a new one starts.
+        """
+        self._cancelled.clear()
+        self._reset()
+        executor, owned = None, False
+        if self.workers > 1:
+            executor = current_pool()
+            if executor is None:
+                executor, owned = ProcessPoolExecutor(self.workers), True
+        try:
+            for stage in self.stages():
+                self.stage = stage.name
+                if executor is None:
+                    for args in stage.tasks:
+                        if not self._may_start(0):
+                            break
+                        self._collect(stage, stage.func(*args))
+                        yield self.snapshot()
+                else:
+                    yield from self._run_pooled(executor, stage)
+                if not self._may_start(0):
+                    break
+        finally:
+            if owned:
+                executor.shutdown(wait=False, cancel_futures=True)
+        yield self.snapshot(done=True)
+
+    def _run_pooled(self, executor, stage: Stage):
+        tasks = iter(stage.tasks)
+        running = deque()
+        while True:
+            while len(running) < 2 * self.workers and self._may_start(len(running)):
+                args = next(tasks, None)
+                if args is None:
+                    break
+                running.append(executor.submit(stage.func, *args))
+            if not running:
+                return
+            # Results are folded in submission order so a seed always gives
+            # the same answer, however the workers are scheduled
+            while not wait([running[0]], timeout=_POLL_SECONDS).done:
+                if self._out_of_time():
+                    for fut in running:
+                        fut.cancel()
+                    return
+            self._collect(stage, running.popleft().result())
+            yield self.snapshot()
+
+    def __iter__(self):
+        return self.snapshots()
+
+    def run(self) -> list[Candidate]:
+        """Run to completion (or until the budget is spent) and return results()."""
+        for _ in self.snapshots():
+            pass
+        return self.results()
+
+    async def astream(self):
+        """
+        Async form of snapshots(): the search runs in its own thread, so
+        the event loop stays free. Leaving the loop early, or cancelling
+        the task iterating it, cancels the search.
+        """
+        loop = asyncio.get_running_loop()
+        thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'{self.name}-solver')
+        snapshots = self.snapshots()
+        finished = False
+        try:
+            while True:
+                snap = await loop.run_in_executor(thread, next, snapshots, None)
+                if snap is None:
+                    finished = True
+                    return
+                yield snap
+        finally:
+            if not finished:
+                self.cancel()
+            # The generator may still be running a task in the thread
+            thread.submit(snapshots.close)
+            thread.shutdown(wait=False)
+
+    def __aiter__(self):
+        return self.astream()
+
+    async def run_async(self) -> list[Candidate]:
+        """Async form of run()."""
+        async for _ in self.astream():
+            pass
+        return self.results()
+
+
+def _single(cand: Candidate):
+    return [cand], 1
+
+
+def _counted(result):
+    cand, evaluated = result
+    return [cand], evaluated
+
+
+class RailFenceSolver(Solver):
+    """Every rail count from 2 to max_rails (see transposition.crack_rail_fence)."""
+    name = 'rail_fence'
+
+    def __init__(self, ciphertext: str, max_rails: int | None = None, **options):
+        super().__init__(ciphertext, **options)
+        self.text = transposition._prepare(ciphertext)
+        if transposition._letter_count(self.text) < 3:
+            raise ValueError("Ciphertext too short to crack")
+        self.max_rails = min(max_rails or len(self.text) - 1, len(self.text) - 1)
+
+    def stages(self):
+        tasks = [(self.text, rails) for rails in range(2, self.max_rails + 1)]
+        yield Stage('rails', transposition._rail_fence_task, tasks, _single)
+
+
+class ColumnarSolver(Solver):
+    """Column orders, exhaustive for short keys (see transposition.crack_columnar)."""
+    name = 'columnar'
+
+    def __init__(self, ciphertext: str, min_key_length: int = 2, max_key_length: int = 12,
+                 exhaustive_limit: int = 7, restarts: int = 20, iterations: int = 2000,
+                 **options):
+        super().__init__(ciphertext, **options)
+        self.text = transposition._prepare(ciphertext)
+        if transposition._letter_count(self.text) < 4:
+            raise ValueError("Ciphertext too short to crack")
+        lengths = range(max(2, min_key_length), min(max_key_length, len(self.text)) + 1)
+        self.exhaustive = [n for n in lengths if n <= exhaustive_limit]
+        self.climbed = [n for n in lengths if n > exhaustive_limit]
+        self.restarts = restarts
+        self.iterations = iterations
+
+    def identity(self, cand: Candidate):
+        # Several orders give the same plaintext when columns are empty
+        return cand.plaintext
+
+    def stages(self):
+        tasks = [(self.text, n, first, self.top) for n in self.exhaustive for first in range(n)]
+        yield Stage('exhaustive', transposition._columnar_exhaustive_task, tasks,
+                    lambda best: (best, math.factorial(len(best[0].key) - 1) if best else 0))
+        if self.climbed:
+            tasks = ((self.text, n, self.rng.getrandbits(32), self.iterations)
+                     for _ in self.rounds(self.restarts) for n in self.climbed)
+            # A climb stops early when it stalls; iterations is its upper bound
+            yield Stage('climb', transposition._columnar_climb_task, tasks,
+                        lambda best: (best, self.iterations))
+
+
+def _adfgvx_square_task(ciphertext: str, order: tuple, seed: int,
+                        iterations: int) -> tuple[Candidate, int]:
+    cand, evaluated = adfgvx._substitution_climb_task(adfgvx.order_cells(ciphertext, order),
+                                                      seed, iterations)
+    key = (create_polybius_square(cand.key), transposition.order_to_key(order))
+    return Candidate(cand.score, key, cand.plaintext), evaluated
+
+
+class ADFGVXSolver(Solver):
+    """Column orders, then Polybius squares for the best ones (see adfgvx.crack)."""
+    name = 'adfgvx'
+
+    def __init__(self, ciphertext: str, min_key_length: int = 2, max_key_length: int = 10,
+                 orders: int = 2, restarts: int = 8, iterations: int = 6000, **options):
+        super().__init__(ciphertext, **options)
+        self.min_key_length = min_key_length
+        self.max_key_length = max_key_length
+        self.orders = orders
+        self.restarts = restarts
+        self.iterations = iterations
+        # Validates the ciphertext up front
+        adfgvx.order_tasks(ciphertext, min_key_length, max_key_length, seed=0)
+
+    def stages(self):
+        ranked = {}
+
+        def orders_found(result):
+            best, evaluated = result
+            for score, order in best:
+                ranked[order] = score
+            return [], evaluated
+
+        exhaustive, climbs = adfgvx.order_tasks(self.ciphertext, self.min_key_length,
+                                                self.max_key_length, top=self.orders,
+                                                seed=self.rng.getrandbits(32))
+        yield Stage('column order', adfgvx._order_exhaustive_task, exhaustive, orders_found)
+        yield Stage('column order', adfgvx._order_climb_task, climbs, orders_found)
+        orders = [o for _, o in heapq.nlargest(self.orders, ((s, o) for o, s in ranked.items()))]
+        tasks = ((self.ciphertext, order, self.rng.getrandbits(32), self.iterations)
+                 for _ in self.rounds(self.restarts) for order in orders)
+        yield Stage('substitution', _adfgvx_square_task, tasks, _counted)
+
+
+class AutokeySolver(Solver):
+    """Primers of each length, one position at a time (see autokey.crack)."""
+    name = 'autokey'
+
+    def __init__(self, ciphertext: str, min_length: int = 1, max_length: int = 12,
+                 restarts: int = 8, sweeps: int = 10, **options):
+        super().__init__(ciphertext, **options)
+        require_numpy('Autokey primer recovery')
+        self.text = ''.join(chr(c + 65) for c in letter_codes(ciphertext))
+        if len(self.text) < 4:
+            raise ValueError("Ciphertext too short to crack")
+        self.lengths = range(max(1, min_length), min(max_length, len(self.text) - 1) + 1)
+        self.restarts = restarts
+        self.sweeps = sweeps
+
+    def stages(self):
+        # The first restart of each length keeps the frequency start unperturbed
+        tasks = ((self.text, length, self.rng.getrandbits(32), self.sweeps, r > 0)
+                 for r in self.rounds(self.restarts) for length in self.lengths)
+        yield Stage('primer', autokey._primer_climb_task, tasks, _counted)
+
+
+class SubstitutionSolver(Solver):
+    """Letter-swap hill climbing (see substitution.crack)."""
+    name = 'substitution'
+
+    def __init__(self, ciphertext: str, restarts: int = 8, rounds: int = 20, **options):
+        super().__init__(ciphertext, **options)
+        require_numpy('Substitution solving')
+        self.text = ''.join(chr(c + 65) for c in letter_codes(ciphertext))
+        if len(self.text) < 4:
+            raise ValueError("Ciphertext too short to crack")
+        self.restarts = restarts
+        self.climb_rounds = rounds
+
+    def stages(self):
+        tasks = ((self.text, self.rng.getrandbits(32), self.climb_rounds, r > 0)
+                 for r in self.rounds(self.restarts))
+        yield Stage('substitution', substitution._climb_task, tasks, _counted)
+
+
+class DictionarySolver(Solver):
+    """Every word of a wordlist as the key (see dictionary.dictionary_attack)."""
+    name = 'dictionary'
+
+    def __init__(self, ciphertext: str, wordlist: str, cipher: str, prefix: int = 60,
+                 chunk_bytes: int = 1 << 18, **options):
+        super().__init__(ciphertext, **options)
+        if cipher not in dictionary.ATTACKS:
+            raise ValueError(f"Unsupported cipher for dictionary attack: {cipher}")
+        self.codes = dictionary.cipher_codes(cipher, ciphertext)
+        if len(self.codes) < 4:
+            raise ValueError("Ciphertext too short to attack")
+        self.wordlist = wordlist
+        self.cipher = cipher
+        self.prefix = min(prefix, len(self.codes))
+        self.chunk_bytes = chunk_bytes
+
+    def _found(self, result):
+        _, _, best, scored, _ = result
+        return [Candidate(score, word, dictionary._full_decrypt(self.cipher, self.ciphertext, word))
+                for score, word in best], scored
+
+    def stages(self):
+        tasks = [(self.wordlist, start, end, self.cipher, self.codes, self.prefix, self.top, None)
+                 for start, end in dictionary._split_ranges(self.wordlist, 0, self.chunk_bytes)]
+        yield Stage(f'{self.cipher} wordlist', dictionary._scan_range, tasks, self._found)
+
+
+SOLVERS = {cls.name: cls for cls in (RailFenceSolver, ColumnarSolver, ADFGVXSolver,
+                                     AutokeySolver, SubstitutionSolver, DictionarySolver)}
+
+
+def solver(name: str, ciphertext: str, *args, **options) -> Solver:
+    """Create the named solver, e.g. solver('columnar', text, seconds=5)."""
+    if name not in SOLVERS:
+        raise ValueError(f"Unknown solver: {name}")
+    return SOLVERS[name](ciphertext, *args, **options)
+
+
+async def solve_all(solvers, callback=None) -> list[list[Candidate]]:
+    """
+    Run several solvers concurrently and return each one's results().
+    callback, if given, receives (solver, snapshot) as snapshots arrive.
+    """
+    async def drive(s: Solver):
+        async for snap in s.astream():
+            if callback is not None:
+                callback(s, snap)
+        return s.results()
+
+    return list(await asyncio.gather(*(drive(s) for s in solvers)))
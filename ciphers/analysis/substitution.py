@@ -0,0 +1,214 @@
+"""
+Hill-climbing solver for the keyed substitution cipher.
+A candidate key maps each ciphertext letter to a plaintext letter, and
+a swap exchanges two of those assignments. Rather than decrypting the
+text again for every swap, the solver counts the ciphertext bigrams once
+into a 26x26 matrix C; with M the English bigram log-probabilities
+permuted by the key, the fitness is sum(C * M) and the change made by
+every one of the 325 possible swaps follows from a few 26x26 matrix
+products. Each climb step therefore rates all swaps at once. The best
+key is then polished with quadgram fitness, again updated incrementally
+from the ciphertext's distinct quadgrams and their counts.
+"""
+
+import heapq
+import random
+
+from .english import LETTER_FREQUENCIES
+from .fitness import Candidate, english_scorer, letter_codes
+from .parallel import ProgressTracker, run_tasks
+from .._compat import numpy as np, require_numpy
+
+# Letters that the frequency start assigns in order of ciphertext frequency
+_ENGLISH_ORDER = sorted(range(26), key=lambda i: -LETTER_FREQUENCIES[i])
+
+
+def bigram_counts(codes) -> 'np.ndarray':
+    """26x26 matrix of bigram counts of a letter code sequence."""
+    codes = np.asarray(codes, dtype=np.int64)
+    return np.bincount(codes[:-1] * 26 + codes[1:], minlength=676).reshape(26, 26).astype(np.float64)
+
+
+def swap_deltas(counts, permuted) -> 'np.ndarray':
+    """
+    Fitness change of every swap, as a symmetric 26x26 matrix.
+
+    Args:
+        counts: Ciphertext bigram counts C
+        permuted: Bigram log-probabilities of the current decryption,
+            permuted[a, b] = log P(key[a], key[b])
+
+    Entry [x, y] is the change in sum(C * M) when ciphertext letters x and
+    y exchange their plaintext letters (the diagonal is zero).
+    """
+    c, m = counts, permuted
+    g = c @ m.T
+    h = c.T @ m
+    gd, hd = np.diag(g), np.diag(h)
+    cd, md = np.diag(c), np.diag(m)
+    cxx, cyy, mxx, myy = cd[:, None], cd[None, :], md[:, None], md[None, :]
+    # Rows x and y, then columns x and y, summed over every letter ...
+    delta = g + g.T - gd[:, None] - gd[None, :] + h + h.T - hd[:, None] - hd[None, :]
+    # ... minus the four terms where row and column meet, which the 2x2
+    # block of (x, y) entries below accounts for exactly
+    delta -= (cxx - c.T) * (m.T - mxx) + (c - cyy) * (myy - m)
+    delta -= (cxx - c) * (m - mxx) + (c.T - cyy) * (myy - m.T)
+    delta += cxx * (myy - mxx) + c * (m.T - m) + c.T * (m - m.T) + cyy * (mxx - myy)
+    np.fill_diagonal(delta, 0.0)
+    return delta
+
+
+def _frequency_start(codes) -> 'np.ndarray':
+    """Key mapping the n-th most common ciphertext letter to the n-th in English."""
+    order = np.argsort(-np.bincount(codes, minlength=26), kind='stable')
+    key = np.empty(26, dtype=np.int64)
+    key[order] = _ENGLISH_ORDER
+    return key
+
+
+def _bigram_climb(counts, table, key, max_steps: int = 1000) -> tuple[float, int]:
+    """Steepest ascent on bigram fitness; updates key in place."""
+    permuted = table[key][:, key]
+    score = float((counts * permuted).sum())
+    swaps = 0
+    for _ in range(max_steps):
+        delta = swap_deltas(counts, permuted)
+        swaps += 325
+        flat = int(np.argmax(delta))
+        x, y = divmod(flat, 26)
+        if delta[x, y] <= 1e-9:
+            break
+        key[[x, y]] = key[[y, x]]
+        permuted[[x, y]] = permuted[[y, x]]
+        permuted[:, [x, y]] = permuted[:, [y, x]]
+        score += float(delta[x, y])
+    return score, swaps
+
+
+class _QuadgramState:
+    """Quadgram fitness of a key, kept from the distinct ciphertext quadgrams."""
+
+    def __init__(self, codes, table):
+        codes = np.asarray(codes, dtype=np.int64)
+        idx = ((codes[:-3] * 26 + codes[1:-2]) * 26 + codes[2:-1]) * 26 + codes[3:]
+        unique, weights = np.unique(idx, return_counts=True)
+        self.grams = np.stack([unique // 17576, unique // 676 % 26, unique // 26 % 26,
+                               unique % 26], axis=1)
+        self.weights = weights.astype(np.float64)
+        self.table = table
+        # Quadgrams containing each ciphertext letter
+        self.touching = [np.flatnonzero((self.grams == letter).any(axis=1))
+                         for letter in range(26)]
+
+    def score(self, key) -> float:
+        return float(self.weights @ self.table[self._index(key[self.grams])])
+
+    @staticmethod
+    def _index(plain):
+        return ((plain[..., 0] * 26 + plain[..., 1]) * 26 + plain[..., 2]) * 26 + plain[..., 3]
+
+    def swap_delta(self, key, x: int, y: int) -> float:
+        rows = np.union1d(self.touching[x], self.touching[y])
+        grams = self.grams[rows]
+        old = self.table[self._index(key[grams])]
+        swapped = key.copy()
+        swapped[[x, y]] = key[[y, x]]
+        new = self.table[self._index(swapped[grams])]
+        return float(self.weights[rows] @ (new - old))
+
+
+def _quadgram_polish(state: _QuadgramState, key, max_passes: int = 20) -> tuple[float, int]:
+    """First-improvement swaps on quadgram fitness; updates key in place."""
+    score = state.score(key)
+    swaps = 0
+    pairs = [(x, y) for x in range(26) for y in range(x + 1, 26)]
+    for _ in range(max_passes):
+        improved = False
+        for x, y in pairs:
+            delta = state.swap_delta(key, x, y)
+            swaps += 1
+            if delta > 1e-9:
+                key[[x, y]] = key[[y, x]]
+                score += delta
+                improved = True
+        if not improved:
+            break
+    return score, swaps
+
+
+def key_alphabet(key) -> str:
+    """substitution.encrypt key (cipher alphabet) of a ciphertext -> plaintext mapping."""
+    alphabet = [''] * 26
+    for cipher_letter, plain_letter in enumerate(key):
+        alphabet[int(plain_letter)] = chr(int(cipher_letter) + 65)
+    return ''.join(alphabet)
+
+
+def _climb_task(ciphertext: str, seed: int, rounds: int, perturb: bool) -> tuple[Candidate, int]:
+    """
+    One restart: bigram steepest ascent from the frequency start (or a
+    random key), kicked with a few random swaps for several rounds, then
+    quadgram polishing of the best key found.
+    """
+    rng = random.Random(seed)
+    codes = np.array(letter_codes(ciphertext), dtype=np.int64)
+    counts = bigram_counts(codes)
+    table = english_scorer(2).array().reshape(26, 26)
+    key = _frequency_start(codes)
+    if perturb:
+        key = np.array(rng.sample(range(26), 26), dtype=np.int64)
+    best_key, best_score = key.copy(), float('-inf')
+    swaps = 0
+    for r in range(rounds):
+        if r:
+            key = best_key.copy()
+            for _ in range(rng.randint(2, 4)):
+                x, y = rng.sample(range(26), 2)
+                key[[x, y]] = key[[y, x]]
+        score, evaluated = _bigram_climb(counts, table, key)
+        swaps += evaluated
+        if score > best_score:
+            best_key, best_score = key.copy(), score
+
+    quadgrams = english_scorer(4)
+    if len(codes) >= 4:
+        state = _QuadgramState(codes, quadgrams.array())
+        best_score, evaluated = _quadgram_polish(state, best_key)
+        swaps += evaluated
+    plain = ''.join(chr(int(c) + 65) for c in best_key[codes])
+    return Candidate(best_score, key_alphabet(best_key), plain), swaps
+
+
+def crack(ciphertext: str, restarts: int = 8, rounds: int = 20, top: int = 5,
+          seed: int | None = None, workers: int | None = None,
+          progress=None) -> list[Candidate]:
+    """
+    Recover a substitution key and return ranked candidates.
+
+    Each Candidate key is a cipher alphabet that substitution.decrypt
+    accepts; the plaintext covers the letters of the ciphertext. Texts of
+    a few hundred letters are usually solved completely; shorter ones
+    may leave rare letters wrong.
+
+    Args:
+        ciphertext: Substitution ciphertext (letters only are considered)
+        restarts: Independent climbs (the first starts from letter frequencies)
+        rounds: Perturb-and-climb rounds per restart
+        top: Number of ranked candidates to return
+        seed: Seed for reproducible searches
+        workers: Worker processes (defaults to the CPU count)
+        progress: Optional callback receiving Progress snapshots
+    """
+    require_numpy('Substitution solving')
+    text = ''.join(chr(c + 65) for c in letter_codes(ciphertext))
+    if len(text) < 4:
+        raise ValueError("Ciphertext too short to crack")
+    rng = random.Random(seed)
+    tasks = [(text, rng.getrandbits(32), rounds, r > 0) for r in range(restarts)]
+    tracker = ProgressTracker('substitution', len(tasks), progress)
+    unique = {}
+    for cand, evaluated in run_tasks(_climb_task, tasks, workers):
+        tracker.update(evaluated, cand.score)
+        if cand.key not in unique or cand.score > unique[cand.key].score:
+            unique[cand.key] = cand
+    return heapq.nlargest(top, unique.values())
@@ -0,0 +1,229 @@
+"""
+Key-space search for the transposition ciphers.
+Cracks Rail Fence by trying every rail count and Columnar Transposition
+by searching column orders, exhaustively for short keys and by hill
+climbing for longer ones. Candidates are scored with n-gram fitness.
+Punctuation and digits take part in the transposition, so the gathers
+run over the whole whitespace-stripped text and only letters are scored.
+"""
+
+import heapq
+import itertools
+import random
+from functools import lru_cache
+
+from .fitness import Candidate, choose_scorer
+from .parallel import run_tasks
+from ..normalize import normalize
+from ..rail_fence import _traverse_fence
+
+
+@lru_cache(maxsize=4096)
+def rail_fence_gather(rails: int, length: int) -> tuple[int, ...]:
+    """
+    Index array that decrypts a Rail Fence ciphertext of the given length:
+    plaintext[i] == ciphertext[gather[i]].
+    """
+    coords = _traverse_fence(rails, length)
+    # Encryption reads the fence rail by rail, left to right
+    read_order = sorted(range(length), key=lambda col: (coords[col][0], col))
+    gather = [0] * length
+    for pos, col in enumerate(read_order):
+        gather[col] = pos
+    return tuple(gather)
+
+
+@lru_cache(maxsize=65536)
+def columnar_gather(order: tuple[int, ...], length: int) -> tuple[int, ...]:
+    """
+    Index array that decrypts a Columnar ciphertext of the given length.
+    order is the sequence in which encryption reads the columns.
+    """
+    num_cols = len(order)
+    num_rows = (length + num_cols - 1) // num_cols
+    gather = [0] * length
+    pos = 0
+    for col in order:
+        for row in range(num_rows):
+            idx = row * num_cols + col
+            if idx < length:
+                gather[idx] = pos
+                pos += 1
+    return tuple(gather)
+
+
+def order_to_key(order) -> str:
+    """Turn a column read order into a keyword that columnar.encrypt accepts."""
+    key = [''] * len(order)
+    for rank, col in enumerate(order):
+        key[col] = chr(65 + rank)
+    return ''.join(key)
+
+
+def _apply(codes: list[int], gather) -> list[int]:
+    return [codes[i] for i in gather]
+
+
+def _prepare(ciphertext: str) -> str:
+    # Match the normalization of rail_fence/columnar encrypt
+    return normalize(ciphertext, 'strip_upper')
+
+
+def _text_codes(text: str) -> list[int]:
+    """Letter codes of a prepared text, with -1 for the non-letters kept in place."""
+    return [ord(c) - 65 if 'A' <= c <= 'Z' else -1 for c in text]
+
+
+def _letter_count(text: str) -> int:
+    return sum('A' <= c <= 'Z' for c in text)
+
+
+def _fitness(codes: list[int]):
+    """Scoring function for gathered codes that skips the non-letters."""
+    letters = sum(c >= 0 for c in codes)
+    scorer = choose_scorer(letters)
+    if letters == len(codes):
+        return scorer.score_codes
+    return lambda pt: scorer.score_codes([c for c in pt if c >= 0])
+
+
+def _gather_text(text: str, gather) -> str:
+    return ''.join(map(text.__getitem__, gather))
+
+
+def _rail_fence_task(ciphertext: str, rails: int) -> Candidate:
+    gather = rail_fence_gather(rails, len(ciphertext))
+    codes = _text_codes(ciphertext)
+    return Candidate(_fitness(codes)(_apply(codes, gather)), rails,
+                     _gather_text(ciphertext, gather))
+
+
+def crack_rail_fence(ciphertext: str, max_rails: int | None = None,
+                     top: int = 5, workers: int | None = None) -> list[Candidate]:
+    """
+    Try every rail count from 2 to max_rails and return the best candidates.
+
+    Args:
+        ciphertext: Rail Fence ciphertext (only letters are scored)
+        max_rails: Largest rail count to try (defaults to text length - 1)
+        top: Number of ranked candidates to return
+        workers: Worker processes (defaults to the CPU count)
+    """
+    text = _prepare(ciphertext)
+    if _letter_count(text) < 3:
+        raise ValueError("Ciphertext too short to crack")
+    max_rails = min(max_rails or len(text) - 1, len(text) - 1)
+    tasks = [(text, rails) for rails in range(2, max_rails + 1)]
+    results = run_tasks(_rail_fence_task, tasks, workers, chunksize=8)
+    return heapq.nlargest(top, results)
+
+
+def _columnar_exhaustive_task(ciphertext: str, num_cols: int, first: int,
+                              top: int) -> list[Candidate]:
+    """Score every column order of num_cols that starts with column first."""
+    codes = _text_codes(ciphertext)
+    fitness = _fitness(codes)
+    rest = [c for c in range(num_cols) if c != first]
+    best = []
+    for tail in itertools.permutations(rest):
+        order = (first,) + tail
+        score = fitness(_apply(codes, columnar_gather(order, len(codes))))
+        item = (score, order)
+        if len(best) < top:
+            heapq.heappush(best, item)
+        elif item > best[0]:
+            heapq.heapreplace(best, item)
+    return [Candidate(score, order_to_key(order),
+                      _gather_text(ciphertext, columnar_gather(order, len(codes))))
+            for score, order in best]
+
+
+def _columnar_climb_task(ciphertext: str, num_cols: int, seed: int,
+                         iterations: int) -> list[Candidate]:
+    """One hill-climbing restart over column orders of length num_cols."""
+    rng = random.Random(seed)
+    codes = _text_codes(ciphertext)
+    score_codes = _fitness(codes)
+
+    def fitness(order):
+        return score_codes(_apply(codes, columnar_gather(order, len(codes))))
+
+    order = list(range(num_cols))
+    rng.shuffle(order)
+    best_order = tuple(order)
+    best_score = fitness(best_order)
+    stale = 0
+    for _ in range(iterations):
+        i, j = sorted(rng.sample(range(num_cols), 2))
+        trial = list(best_order)
+        move = rng.random()
+        if move < 0.5:
+            trial[i], trial[j] = trial[j], trial[i]
+        elif move < 0.8:
+            trial[i:j + 1] = reversed(trial[i:j + 1])
+        else:
+            # rotate: shifting the whole order keeps adjacent columns together
+            shift = rng.randrange(1, num_cols)
+            trial = trial[shift:] + trial[:shift]
+        trial = tuple(trial)
+        score = fitness(trial)
+        if score > best_score:
+            best_order, best_score = trial, score
+            stale = 0
+        else:
+            stale += 1
+            if stale > iterations // 4:
+                break
+    pt = _gather_text(ciphertext, columnar_gather(best_order, len(codes)))
+    return [Candidate(best_score, order_to_key(best_order), pt)]
+
+
+def crack_columnar(ciphertext: str, min_key_length: int = 2, max_key_length: int = 12,
+                   exhaustive_limit: int = 7, restarts: int = 20,
+                   iterations: int = 2000, top: int = 5, seed: int | None = None,
+                   workers: int | None = None) -> list[Candidate]:
+    """
+    Search Columnar Transposition keys and return the best candidates.
+
+    Key lengths up to exhaustive_limit are searched over every column order;
+    longer keys use hill climbing with the given number of restarts.
+    Returned keys are keywords that columnar.encrypt maps to the ciphertext.
+
+    Args:
+        ciphertext: Columnar ciphertext (only letters are scored)
+        min_key_length: Shortest key length to try
+        max_key_length: Longest key length to try
+        exhaustive_limit: Longest key length searched exhaustively
+        restarts: Hill-climbing restarts per key length
+        iterations: Maximum moves per hill-climbing restart
+        top: Number of ranked candidates to return
+        seed: Seed for reproducible hill climbing
+        workers: Worker processes (defaults to the CPU count)
+    """
+    text = _prepare(ciphertext)
+    if _letter_count(text) < 4:
+        raise ValueError("Ciphertext too short to crack")
+    max_key_length = min(max_key_length, len(text))
+    rng = random.Random(seed)
+
+    exhaustive, climbs = [], []
+    for num_cols in range(max(2, min_key_length), max_key_length + 1):
+        if num_cols <= exhaustive_limit:
+            # Fixing the first column splits the permutations into even shards
+            exhaustive += [(text, num_cols, first, top) for first in range(num_cols)]
+        else:
+            climbs += [(text, num_cols, rng.getrandbits(32), iterations)
+                       for _ in range(restarts)]
+
+    candidates = []
+    for batch in run_tasks(_columnar_exhaustive_task, exhaustive, workers):
+        candidates.extend(batch)
+    for batch in run_tasks(_columnar_climb_task, climbs, workers):
+        candidates.extend(batch)
+
+    # Several orders can give the same plaintext when columns are empty
+    unique = {}
+    for cand in candidates:
+        if cand.plaintext not in unique or cand.score > unique[cand.plaintext].score:
+            unique[cand.plaintext] = cand
+    return heapq.nlargest(top, unique.values())
@@ -0,0 +1,244 @@
+"""
+Backend selection for single-message encryption and decryption.
+Each cipher has up to three implementations:
+
+    reference  the cipher module itself (pure Python, any text)
+    translate  one str.translate pass (fixed substitutions on ASCII text)
+    numpy      the ciphers.batch kernels run on a batch of one (ASCII text)
+
+NumPy wins on long messages but its array setup costs more than the
+whole job on short ones, so encrypt/decrypt pick a backend by message
+length. The crossover lengths are measured once per machine with
+`python -m ciphers.backends calibrate` and stored as JSON next to the
+other cached tables; without that file conservative defaults apply.
+Non-ASCII text always goes to the reference module, and backends that
+need NumPy are skipped when it is not installed. Calibration checks
+every backend's output against the reference before timing it.
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import time
+from functools import lru_cache
+
+from . import batch, substitution
+from ._compat import numpy as np
+from .hill_keys import default_table_path
+from .pipeline import MODULES
+
+BACKENDS = ('reference', 'translate', 'numpy')
+_CONFIG_NAME = 'backends.json'
+# The substitution module is itself a str.translate pass
+_TRANSLATE_CIPHERS = ('caesar', 'atbash')
+# Message lengths timed by calibrate()
+CALIBRATION_SIZES = (16, 64, 256, 1024, 4096, 16384, 65536, 262144)
+# Keys used when timing each cipher
+SAMPLE_KEYS = {
+    'caesar': (3,), 'vigenere': ('LEMON',), 'hill': ('FWXH',), 'playfair': ('PLAYFAIR EXAMPLE',),
+    'atbash': (), 'rail_fence': (3,), 'adfgvx': ('SECRET', 'ORDER'), 'columnar': ('ZEBRAS',),
+    'autokey': ('QUEEN',), 'substitution': (substitution.keyword_key('ZEBRAS'),),
+    'beaufort': ('FORTIFICATION',), 'variant_beaufort': ('LEMON',), 'gronsfeld': ('31415',),
+    'porta': ('PORTA',), 'polybius': ('ZEBRAS',), 'bifid': ('ZEBRAS', 5),
+    'trifid': ('ZEBRAS', 5), 'adfgx': ('SECRET', 'ORDER'),
+}
+# Used until calibrate() has written a config: translate where it exists,
+# NumPy only for messages long enough to repay its setup everywhere
+DEFAULT_THRESHOLDS = {
+    cipher: [[0, 'translate' if cipher in _TRANSLATE_CIPHERS else 'reference']]
+    + ([] if cipher in _TRANSLATE_CIPHERS else [[4096, 'numpy']])
+    for cipher in MODULES
+}
+
+
+def default_config_path() -> str:
+    """Calibration file next to the other cached tables (see $CLASSIC_CIPHERS_CACHE)."""
+    return os.path.join(os.path.dirname(default_table_path()), _CONFIG_NAME)
+
+
+def available(cipher: str) -> list[str]:
+    """Backends usable for a cipher on this machine."""
+    if cipher not in MODULES:
+        raise ValueError(f"Unknown cipher: {cipher}")
+    names = ['reference']
+    if cipher in _TRANSLATE_CIPHERS:
+        names.append('translate')
+    if np is not None and cipher in batch.CIPHERS:
+        names.append('numpy')
+    return names
+
+
+@lru_cache(maxsize=64)
+def _translate_tables(cipher: str, key: tuple) -> tuple[dict, dict]:
+    alphabet = substitution.caesar_key(key[0]) if cipher == 'caesar' else substitution.ATBASH_KEY
+    return substitution._tables(alphabet)
+
+
+def _run_translate(cipher: str, text: str, key: tuple, decrypt: bool) -> str:
+    if cipher == 'caesar' and not isinstance(key[0], int):
+        raise ValueError("Caesar key must be an integer")
+    # Atbash is its own inverse; its tables are the same both ways
+    return text.translate(_translate_tables(cipher, key)[decrypt])
+
+
+def _run_numpy(cipher: str, text: str, key: tuple, decrypt: bool) -> str:
+    data = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    offsets = np.array([0, len(data)], dtype=np.int64)
+    func = batch.decrypt if decrypt else batch.encrypt
+    out, out_offsets = func(cipher, data, offsets, *key)
+    return out[:int(out_offsets[-1])].tobytes().decode('ascii')
+
+
+def run(backend: str, cipher: str, text: str, key: tuple, decrypt: bool = False) -> str:
+    """Run one named backend; translate and numpy need ASCII text."""
+    if backend == 'reference':
+        module = MODULES[cipher]
+        return (module.decrypt if decrypt else module.encrypt)(text, *key)
+    if backend not in available(cipher):
+        raise ValueError(f"Backend {backend!r} is not available for {cipher}")
+    if backend == 'translate':
+        return _run_translate(cipher, text, key, decrypt)
+    return _run_numpy(cipher, text, key, decrypt)
+
+
+@lru_cache(maxsize=None)
+def load_thresholds(path: str | None = None) -> dict:
+    """
+    Crossover table {cipher: [[min_length, backend], ...]} from the
+    calibration file, falling back to DEFAULT_THRESHOLDS.
+    """
+    path = path or default_config_path()
+    thresholds = {cipher: list(rows) for cipher, rows in DEFAULT_THRESHOLDS.items()}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as fh:
+            thresholds.update(json.load(fh).get('thresholds', {}))
+    return thresholds
+
+
+def select(cipher: str, length: int, thresholds: dict | None = None) -> str:
+    """Backend for a message of the given length (unavailable ones are skipped)."""
+    usable = available(cipher)
+    chosen = 'reference'
+    for min_length, backend in (thresholds or load_thresholds()).get(cipher, ()):
+        if length >= min_length and backend in usable:
+            chosen = backend
+    return chosen
+
+
+def encrypt(cipher: str, text: str, *key, backend: str | None = None) -> str:
+    """Encrypt with the backend chosen for the message length (or the one named)."""
+    if not text.isascii():
+        backend = 'reference'
+    return run(backend or select(cipher, len(text)), cipher, text, key)
+
+
+def decrypt(cipher: str, text: str, *key, backend: str | None = None) -> str:
+    """Decrypt with the backend chosen for the message length (or the one named)."""
+    if not text.isascii():
+        backend = 'reference'
+    return run(backend or select(cipher, len(text)), cipher, text, key, decrypt=True)
+
+
+def _sample_text(length: int, rng: random.Random) -> str:
+    alphabet = string.ascii_letters + '     ,.'
+    return ''.join(rng.choice(alphabet) for _ in range(length))
+
+
+def check(cipher: str, text: str, *key, decrypt: bool = False) -> None:
+    """Raise AssertionError if any available backend disagrees with the reference."""
+    expected = run('reference', cipher, text, key, decrypt)
+    for backend in available(cipher)[1:]:
+        if run(backend, cipher, text, key, decrypt) != expected:
+            direction = 'decrypt' if decrypt else 'encrypt'
+            raise AssertionError(f"{backend} backend differs from the reference for "
+                                 f"{cipher} {direction} ({len(text)} characters)")
+
+
+def _best_time(func, repeats: int) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def calibrate(sizes=CALIBRATION_SIZES, budget: float = 0.05, path: str | None = None,
+              progress=None) -> dict:
+    """
+    Time every backend of every cipher at each message size and write the
+    crossover table to path (default_config_path() by default).
+
+    Args:
+        sizes: Message lengths to time, ascending
+        budget: Approximate seconds spent per backend and size
+        path: Where to write the JSON config
+        progress: Optional callback receiving (cipher, size, {backend: seconds})
+
+    Ciphers without a SAMPLE_KEYS entry are not timed and keep their
+    DEFAULT_THRESHOLDS.
+    """
+    rng = random.Random(0)
+    thresholds = {}
+    timings = {}
+    for cipher in MODULES:
+        if cipher not in SAMPLE_KEYS:
+            continue
+        key = SAMPLE_KEYS[cipher]
+        rows = []
+        for size in sizes:
+            text = _sample_text(size, rng)
+            ciphertext = run('reference', cipher, text, key)
+            check(cipher, text, *key)
+            check(cipher, ciphertext, *key, decrypt=True)
+            seconds = {}
+            for backend in available(cipher):
+                once = _best_time(lambda: run(backend, cipher, text, key), 1)
+                repeats = max(1, min(1000, int(budget / max(once, 1e-7))))
+                seconds[backend] = _best_time(lambda: run(backend, cipher, text, key), repeats)
+            timings.setdefault(cipher, {})[size] = seconds
+            if progress:
+                progress(cipher, size, seconds)
+            fastest = min(seconds, key=seconds.get)
+            if not rows or rows[-1][1] != fastest:
+                rows.append([0 if not rows else size, fastest])
+        thresholds[cipher] = rows
+
+    path = path or default_config_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    config = {'numpy': np is not None, 'sizes': list(sizes), 'thresholds': thresholds,
+              'timings': timings}
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(config, fh, indent=1)
+    os.replace(tmp, path)
+    load_thresholds.cache_clear()
+    return thresholds
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Calibrate or show cipher backend selection.")
+    parser.add_argument('command', choices=('calibrate', 'show'))
+    parser.add_argument('--config', help="Config file (default: in the cache directory)")
+    parser.add_argument('--budget', type=float, default=0.05,
+                        help="Seconds per backend and size while calibrating")
+    args = parser.parse_args(argv)
+
+    if args.command == 'calibrate':
+        def show(cipher, size, seconds):
+            times = '  '.join(f"{b} {t * 1e6:9.1f} us" for b, t in seconds.items())
+            print(f"{cipher:<12} {size:>7}  {times}")
+
+        calibrate(budget=args.budget, path=args.config, progress=show)
+        print(f"Wrote {args.config or default_config_path()}")
+    thresholds = load_thresholds(args.config)
+    for cipher in MODULES:
+        rows = ', '.join(f"{backend} from {size}" for size, backend in thresholds[cipher]
+                         if backend in available(cipher))
+        print(f"{cipher:<12} {rows}")
+
+
+if __name__ == '__main__':
+    main()
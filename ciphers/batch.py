@@ -0,0 +1,411 @@
+"""
+Columnar batch encryption and decryption.
+Messages are held Arrow-style as one contiguous byte buffer plus an
+offsets array (message i is data[offsets[i]:offsets[i + 1]]). Every
+message of a batch is processed with NumPy operations over the whole
+buffer, and the results are written into one output buffer with its own
+offsets, so no Python object is created per message.
+
+Buffers are ASCII; results match the per-message encrypt/decrypt
+functions of the cipher modules.
+"""
+
+from functools import lru_cache
+
+from . import playfair
+from ._compat import numpy as np, require_numpy
+from .adfgvx import create_polybius_square
+from .polyalphabetic import CIPHERS as POLYALPHABETIC, compile_key, flat_table
+from .analysis.transposition import columnar_gather, rail_fence_gather
+
+CIPHERS = ('caesar', 'vigenere', 'hill', 'playfair', 'atbash',
+           'rail_fence', 'adfgvx', 'columnar', 'autokey', 'beaufort',
+           'variant_beaufort', 'gronsfeld', 'porta')
+
+# Characters str.split() treats as whitespace within ASCII
+_WHITESPACE = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+_ADFGVX = b'ADFGVX'
+
+
+def from_strings(messages) -> tuple['np.ndarray', 'np.ndarray']:
+    """Pack a list of str into a (data, offsets) batch."""
+    require_numpy('Batch processing')
+    raw = [m.encode('ascii') for m in messages]
+    offsets = np.zeros(len(raw) + 1, dtype=np.int64)
+    np.cumsum([len(r) for r in raw], out=offsets[1:])
+    return np.frombuffer(b''.join(raw), dtype=np.uint8).copy(), offsets
+
+
+def to_strings(data, offsets) -> list[str]:
+    """Unpack a (data, offsets) batch into a list of str."""
+    raw = bytes(np.asarray(data, dtype=np.uint8)[:int(offsets[-1])])
+    return [raw[offsets[i]:offsets[i + 1]].decode('ascii') for i in range(len(offsets) - 1)]
+
+
+def max_output_size(cipher: str, data, offsets) -> int:
+    """Upper bound on the output buffer size needed for a batch."""
+    n_bytes = int(offsets[-1] - offsets[0])
+    n_msgs = len(offsets) - 1
+    if cipher in ('playfair', 'adfgvx'):
+        return 2 * n_bytes + 2 * n_msgs
+    if cipher == 'hill':
+        return n_bytes + n_msgs
+    return n_bytes
+
+
+def _lut(mapping) -> 'np.ndarray':
+    table = np.arange(256, dtype=np.uint8)
+    for src, dst in mapping.items():
+        table[src] = dst
+    return table
+
+
+@lru_cache(maxsize=None)
+def _upper_lut():
+    return _lut({c: c - 32 for c in range(97, 123)})
+
+
+@lru_cache(maxsize=64)
+def _shift_lut(shift: int):
+    shift %= 26
+    mapping = {c: (c - 65 + shift) % 26 + 65 for c in range(65, 91)}
+    mapping.update({c: (c - 97 + shift) % 26 + 97 for c in range(97, 123)})
+    return _lut(mapping)
+
+
+@lru_cache(maxsize=None)
+def _atbash_lut():
+    mapping = {c: 90 - (c - 65) for c in range(65, 91)}
+    mapping.update({c: 122 - (c - 97) for c in range(97, 123)})
+    return _lut(mapping)
+
+
+def _prepare(data, offsets):
+    require_numpy('Batch processing')
+    buf = np.asarray(data, dtype=np.uint8) if not isinstance(data, (bytes, bytearray, memoryview)) \
+        else np.frombuffer(data, dtype=np.uint8)
+    offs = np.asarray(offsets, dtype=np.int64)
+    if offs.ndim != 1 or len(offs) < 1:
+        raise ValueError("offsets must be a 1-D array of length n + 1")
+    base = int(offs[0])
+    return buf[base:int(offs[-1])], offs - base
+
+
+def _message_ids(offs):
+    return np.repeat(np.arange(len(offs) - 1), np.diff(offs))
+
+
+def _compact(buf, offs, keep):
+    """Drop bytes where keep is False and recompute offsets."""
+    kept = np.bincount(_message_ids(offs)[keep], minlength=len(offs) - 1)
+    new_offs = np.zeros(len(offs), dtype=np.int64)
+    np.cumsum(kept, out=new_offs[1:])
+    return buf[keep], new_offs
+
+
+def _strip_upper(buf, offs):
+    """Remove whitespace and uppercase, like ''.join(text.split()).upper()."""
+    keep = ~np.isin(buf, np.frombuffer(_WHITESPACE, dtype=np.uint8))
+    buf, offs = _compact(buf, offs, keep)
+    return _upper_lut()[buf], offs
+
+
+def _letter_positions(is_letter, offs):
+    """Index of each byte among the letters of its own message."""
+    ids = _message_ids(offs)
+    running = np.cumsum(is_letter) - is_letter
+    start = np.concatenate(([0], np.cumsum(is_letter)))[offs[:-1]]
+    return running - start[ids]
+
+
+def _permute(buf, offs, gather_for_length, inverse: bool):
+    """
+    Apply a per-length permutation to every message. Messages of equal
+    length are handled together with one 2-D fancy-indexing operation.
+    """
+    out = np.empty_like(buf)
+    lengths = np.diff(offs)
+    starts = offs[:-1]
+    for length in np.unique(lengths):
+        if length == 0:
+            continue
+        idx = starts[lengths == length][:, None]
+        gather = np.asarray(gather_for_length(int(length)), dtype=np.int64)[None, :]
+        if inverse:
+            out[idx + gather] = buf[idx + np.arange(length)]
+        else:
+            out[idx + np.arange(length)] = buf[idx + gather]
+    return out
+
+
+def _columnar_gather_for_key(key: str):
+    order = tuple(sorted(range(len(key)), key=lambda x: key[x]))
+    return lambda length: columnar_gather(order, length)
+
+
+def _caesar(buf, offs, key: int, decrypt: bool):
+    return _shift_lut(-key if decrypt else key)[buf], offs
+
+
+def _atbash(buf, offs, decrypt: bool):
+    return _atbash_lut()[buf], offs
+
+
+@lru_cache(maxsize=None)
+def _tableau_lut(tableau: str, decrypt: bool):
+    """(26, 256) LUT: row k maps every byte under key letter k."""
+    return np.frombuffer(flat_table(tableau, decrypt), dtype=np.uint8).reshape(26, 256)
+
+
+def _letter_mask(buf):
+    return ((buf >= 65) & (buf <= 90)) | ((buf >= 97) & (buf <= 122))
+
+
+def _periodic(cipher: str):
+    """Kernel of a periodic polyalphabetic cipher (see ciphers.polyalphabetic)."""
+    def kernel(buf, offs, key, decrypt: bool):
+        codes = np.frombuffer(compile_key(cipher, key), dtype=np.uint8)
+        rows = codes[_letter_positions(_letter_mask(buf), offs) % len(codes)]
+        # Non-letters map to themselves in every row
+        return _tableau_lut(POLYALPHABETIC[cipher][0], decrypt)[rows, buf], offs
+    return kernel
+
+
+def _autokey(buf, offs, key: str, decrypt: bool):
+    if not key:
+        return buf.copy(), offs
+    primer = np.frombuffer(compile_key('autokey', key), dtype=np.uint8).astype(np.int64)
+    buf, offs = _strip_upper(buf, offs)
+    letter = (buf >= 65) & (buf <= 90)
+    codes = buf[letter].astype(np.int64) - 65
+    lpos = _letter_positions(letter, offs)[letter]
+    k = len(primer)
+    out = buf.copy()
+    if not decrypt:
+        # Key stream: primer letters, then the message's own letters
+        shift = np.empty_like(codes)
+        early = lpos < k
+        shift[early] = primer[lpos[early]]
+        shift[~early] = codes[np.flatnonzero(~early) - k]
+        out[letter] = (codes + shift) % 26 + 65
+        return out, offs
+
+    # Decryption feeds recovered letters back in, so it walks the letter
+    # positions in order, handling all messages at once; the key of a
+    # message's j-th letter is its (j - k)-th plaintext letter
+    plain = np.empty_like(codes)
+    order = np.argsort(lpos, kind='stable')
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(lpos))))
+    for j in range(len(bounds) - 1):
+        sel = order[bounds[j]:bounds[j + 1]]
+        shift = primer[j] if j < k else plain[sel - k]
+        plain[sel] = (codes[sel] - shift) % 26
+    out[letter] = plain + 65
+    return out, offs
+
+
+def _rail_fence(buf, offs, rails: int, decrypt: bool):
+    if rails < 2:
+        return buf.copy(), offs
+    if not decrypt:
+        buf, offs = _strip_upper(buf, offs)
+    return _permute(buf, offs, lambda n: rail_fence_gather(rails, n), inverse=not decrypt), offs
+
+
+def _columnar(buf, offs, key: str, decrypt: bool):
+    if not key:
+        return buf.copy(), offs
+    if not decrypt:
+        buf, offs = _strip_upper(buf, offs)
+    return _permute(buf, offs, _columnar_gather_for_key(key), inverse=not decrypt), offs
+
+
+def _hill(buf, offs, key: str, decrypt: bool):
+    from .hill import _find_multiplicative_inverse, _make_key_matrix_from_string
+    k = _make_key_matrix_from_string(key)
+    det = (k[0][0] * k[1][1] - k[0][1] * k[1][0]) % 26
+    inv = _find_multiplicative_inverse(det)
+    if inv == -1:
+        raise ValueError("Hill key matrix is not invertible modulo 26")
+    if decrypt:
+        a, b, c, d = k[0][0], k[0][1], k[1][0], k[1][1]
+        k = [[d * inv % 26, (-b) * inv % 26], [(-c) * inv % 26, a * inv % 26]]
+    buf, offs = _compact(buf, offs, buf != 32)
+    lengths = np.diff(offs)
+    if decrypt:
+        if np.any(lengths % 2):
+            raise ValueError("Hill ciphertext must have an even length")
+    else:
+        # Pad odd-length messages with X
+        pad = lengths % 2 == 1
+        new_offs = np.zeros(len(offs), dtype=np.int64)
+        np.cumsum(lengths + pad, out=new_offs[1:])
+        padded = np.full(int(new_offs[-1]), ord('X'), dtype=np.uint8)
+        ids = _message_ids(offs)
+        padded[np.arange(len(buf)) - offs[ids] + new_offs[ids]] = buf
+        buf, offs = padded, new_offs
+    vals = _upper_lut()[buf].astype(np.int64) - 65
+    x, y = vals[0::2], vals[1::2]
+    out = np.empty(len(buf), dtype=np.uint8)
+    out[0::2] = (k[0][0] * x + k[0][1] * y) % 26 + 65
+    out[1::2] = (k[1][0] * x + k[1][1] * y) % 26 + 65
+    if decrypt:
+        # Drop one trailing padding X per message, as hill.decrypt does
+        ends = offs[1:] - 1
+        has_text = np.diff(offs) > 0
+        drop = np.zeros(len(out), dtype=bool)
+        trailing = ends[has_text]
+        drop[trailing[out[trailing] == ord('X')]] = True
+        return _compact(out, offs, ~drop)
+    return out, offs
+
+
+@lru_cache(maxsize=64)
+def _playfair_tables(key: str):
+    """Digraph lookup tables (26*26 -> pair) built with playfair's own rules."""
+    matrix = playfair._build_playfair_matrix(key)
+    tables = {}
+    for direction in (1, -1):
+        table = np.full((676, 2), 255, dtype=np.uint8)
+        for a in range(26):
+            for b in range(26):
+                loc = playfair._locindex(matrix, chr(a + 65))
+                loc1 = playfair._locindex(matrix, chr(b + 65))
+                if loc is None or loc1 is None:
+                    continue
+                if loc[0] == loc1[0]:
+                    pair = (matrix[loc[0]][(loc[1] + direction) % 5],
+                            matrix[loc1[0]][(loc1[1] + direction) % 5])
+                elif loc[1] == loc1[1]:
+                    pair = (matrix[(loc[0] + direction) % 5][loc[1]],
+                            matrix[(loc1[0] + direction) % 5][loc1[1]])
+                else:
+                    pair = (matrix[loc[0]][loc1[1]], matrix[loc1[0]][loc[1]])
+                table[a * 26 + b] = (ord(pair[0]), ord(pair[1]))
+        tables[direction] = table
+    return tables
+
+
+def _playfair_digraphs(letters: bytes) -> bytes:
+    """Split a message into Playfair digraphs, inserting X as encrypt does."""
+    out = bytearray()
+    i = 0
+    n = len(letters)
+    while i < n:
+        a = letters[i]
+        b = letters[i + 1] if i + 1 < n else 88
+        if a == b:
+            out += bytes((a, 88))
+            i += 1
+        else:
+            out += bytes((a, b))
+            i += 2
+    return bytes(out)
+
+
+def _playfair(buf, offs, key: str, decrypt: bool):
+    if not key or not any(ch.isalpha() for ch in key):
+        raise ValueError('Playfair key must contain letters')
+    buf = _upper_lut()[buf]
+    buf, offs = _compact(buf, offs, (buf >= 65) & (buf <= 90))
+    if decrypt:
+        # An odd trailing letter is paired with X
+        lengths = np.diff(offs)
+        odd = lengths % 2 == 1
+        new_offs = np.zeros(len(offs), dtype=np.int64)
+        np.cumsum(lengths + odd, out=new_offs[1:])
+        padded = np.full(int(new_offs[-1]), ord('X'), dtype=np.uint8)
+        ids = _message_ids(offs)
+        padded[np.arange(len(buf)) - offs[ids] + new_offs[ids]] = buf
+        buf, offs = padded, new_offs
+    else:
+        buf = np.where(buf == ord('J'), ord('I'), buf).astype(np.uint8)
+        # Digraph splitting is inherently sequential within a message
+        raw = buf.tobytes()
+        parts = [_playfair_digraphs(raw[offs[i]:offs[i + 1]]) for i in range(len(offs) - 1)]
+        offs = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in parts], out=offs[1:])
+        buf = np.frombuffer(b''.join(parts), dtype=np.uint8)
+    table = _playfair_tables(key)[-1 if decrypt else 1]
+    codes = buf.astype(np.int64) - 65
+    pairs = table[codes[0::2] * 26 + codes[1::2]]
+    if np.any(pairs == 255):
+        raise ValueError('Only letters A-Z allowed in Playfair message')
+    return pairs.reshape(-1), offs
+
+
+def _adfgvx(buf, offs, polybius_key: str, columnar_key: str, decrypt: bool):
+    if not columnar_key:
+        return buf.copy(), offs
+    square = create_polybius_square(polybius_key)
+    gather = _columnar_gather_for_key(columnar_key)
+    symbols = np.frombuffer(_ADFGVX, dtype=np.uint8)
+    if decrypt:
+        inter = _permute(buf, offs, gather, inverse=False)
+        index = np.full(256, -1, dtype=np.int64)
+        index[symbols] = np.arange(6)
+        # Pair up symbols; a dangling last symbol is ignored
+        lengths = np.diff(offs)
+        pos = _letter_positions(np.ones(len(inter), dtype=bool), offs)
+        first = (pos % 2 == 0) & (pos + 1 < lengths[_message_ids(offs)])
+        starts = np.flatnonzero(first)
+        row, col = index[inter[starts]], index[inter[starts + 1]]
+        if np.any(row < 0) or np.any(col < 0):
+            raise ValueError("ADFGVX ciphertext may only contain the letters ADFGVX")
+        cells = row * 6 + col
+        chars = np.frombuffer(square.encode('ascii'), dtype=np.uint8)
+        out, new_offs = _compact(inter, offs, first)
+        return chars[cells], new_offs
+    index = np.full(256, -1, dtype=np.int64)
+    index[np.frombuffer(square.encode('ascii'), dtype=np.uint8)] = np.arange(len(square))
+    cells = index[_upper_lut()[buf]]
+    buf, offs = _compact(cells, offs, cells >= 0)
+    inter = np.empty(2 * len(buf), dtype=np.uint8)
+    inter[0::2] = symbols[buf // 6]
+    inter[1::2] = symbols[buf % 6]
+    return _permute(inter, offs * 2, gather, inverse=True), offs * 2
+
+
+_HANDLERS = {
+    'caesar': _caesar, 'hill': _hill, 'playfair': _playfair,
+    'atbash': _atbash, 'rail_fence': _rail_fence, 'adfgvx': _adfgvx,
+    'columnar': _columnar, 'autokey': _autokey,
+    **{cipher: _periodic(cipher) for cipher in ('vigenere', 'beaufort', 'variant_beaufort',
+                                                'gronsfeld', 'porta')},
+}
+
+
+def _run(cipher, data, offsets, key, out, decrypt):
+    if cipher not in _HANDLERS:
+        raise ValueError(f"Unknown cipher: {cipher}")
+    buf, offs = _prepare(data, offsets)
+    result, result_offs = _HANDLERS[cipher](buf, offs, *key, decrypt=decrypt)
+    if out is None:
+        return np.ascontiguousarray(result, dtype=np.uint8), result_offs
+    if len(out) < len(result):
+        raise ValueError(f"Output buffer too small: need {len(result)} bytes")
+    out[:len(result)] = result
+    return out, result_offs
+
+
+def encrypt(cipher: str, data, offsets, *key, out=None):
+    """
+    Encrypt every message of a batch.
+
+    Args:
+        cipher: Cipher module name (e.g. 'vigenere', 'rail_fence')
+        data: Contiguous message bytes (bytes or uint8 array)
+        offsets: Integer array of n + 1 message boundaries into data
+        key: Key arguments as taken by the module's encrypt()
+        out: Optional preallocated uint8 buffer (see max_output_size)
+
+    Returns:
+        (output buffer, output offsets); when out is given the results
+        fill out[:offsets[-1]].
+    """
+    return _run(cipher, data, offsets, key, out, decrypt=False)
+
+
+def decrypt(cipher: str, data, offsets, *key, out=None):
+    """Decrypt every message of a batch; arguments as for encrypt()."""
+    return _run(cipher, data, offsets, key, out, decrypt=True)
@@ -0,0 +1,21 @@
+"""
+Beaufort cipher implementation.
+Each letter is replaced by the key letter minus the plaintext letter
+(c = k - p), so the cipher is its own inverse.
+Preserves case and non-letter characters.
+"""
+
+from .polyalphabetic import key_codes, periodic
+
+
+def encrypt(plaintext: str, key: str) -> str:
+    """
+    Encrypt text using Beaufort cipher with a repeating key word.
+    Non-letters in the key are ignored.
+    """
+    return periodic(plaintext, key_codes(key, 'Beaufort'), 'beaufort')
+
+
+def decrypt(ciphertext: str, key: str) -> str:
+    """Decrypt Beaufort ciphertext (the same operation as encrypt)."""
+    return encrypt(ciphertext, key)
@@ -0,0 +1,33 @@
+"""
+Bifid cipher implementation.
+Letters are fractionated into their row and column in a keyed 5x5
+Polybius square; within each block of period letters the row numbers are
+written out, then the column numbers, and the result is read back in
+pairs. I and J share a cell; non-letters are dropped.
+"""
+
+from .fractionation import compile_grid, delastelle
+
+
+def encrypt(plaintext: str, key: str = '', period: int = 5) -> str:
+    """
+    Encrypt text using Bifid cipher.
+
+    Args:
+        plaintext: Text to encrypt
+        key: Optional keyword that arranges the square
+        period: Letters per block (0 for the whole message)
+    """
+    return delastelle(plaintext, compile_grid('5x5', key), period)
+
+
+def decrypt(ciphertext: str, key: str = '', period: int = 5) -> str:
+    """
+    Decrypt text using Bifid cipher.
+
+    Args:
+        ciphertext: Text to decrypt
+        key: Keyword used for encryption
+        period: Period used for encryption
+    """
+    return delastelle(ciphertext, compile_grid('5x5', key), period, decrypt=True)
@@ -0,0 +1,213 @@
+"""
+Content-addressed cache of cipher results.
+Templated messages are often encrypted again and again under the same
+keys. A ResultCache keys each result by the cipher, direction, the key
+reduced to the form that decides the output (a Caesar shift mod 26, the
+Vigenere key letters, the Playfair or Polybius square) and a BLAKE2b
+digest of the input, so a repeated request is a dictionary lookup.
+Results are evicted least recently used once a byte budget is reached.
+An optional SQLite tier keeps results across restarts.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple
+
+from .adfgvx import create_polybius_square
+from .hill_keys import default_table_path
+from .pipeline import MODULES
+from .playfair import _build_playfair_matrix
+
+_DB_NAME = 'results.sqlite'
+# Bytes of a cached string beyond its characters (object header and the
+# key tuple), so tiny results are not counted as free
+_ENTRY_OVERHEAD = 200
+
+
+class CacheStats(NamedTuple):
+    """Counters of a ResultCache; bytes and entries are the memory tier."""
+    hits: int
+    misses: int
+    disk_hits: int
+    evictions: int
+    bytes: int
+    entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def default_db_path() -> str:
+    """SQLite file next to the other cached tables (see $CLASSIC_CIPHERS_CACHE)."""
+    return os.path.join(os.path.dirname(default_table_path()), _DB_NAME)
+
+
+@lru_cache(maxsize=4096)
+def normalized_key(cipher: str, key: tuple):
+    """
+    The part of a key that decides the output, or None when the key is
+    invalid (such calls bypass the cache so the module raises its error).
+    """
+    if cipher == 'caesar':
+        shift, = key
+        return (shift % 26,) if isinstance(shift, int) else None
+    if cipher == 'vigenere':
+        letters = ''.join(k for k in key[0] if k.isalpha()).lower()
+        return (letters,) if letters else None
+    if cipher == 'atbash':
+        return ()
+    if cipher == 'hill':
+        return (key[0].strip().upper(),)
+    if cipher == 'playfair':
+        if not key[0] or not any(ch.isalpha() for ch in key[0]):
+            return None
+        return (''.join(''.join(row) for row in _build_playfair_matrix(key[0])),)
+    if cipher == 'adfgvx':
+        polybius_key, columnar_key = (tuple(key) + ('', ''))[:2]
+        return (create_polybius_square(polybius_key), columnar_key)
+    return key
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class ResultCache:
+    """
+    LRU cache in front of the cipher modules' encrypt and decrypt.
+
+    Args:
+        max_bytes: Memory budget for cached results
+        disk: True for the default SQLite file, a path, or None for
+            memory only
+        max_disk_bytes: Size the SQLite tier is trimmed back to
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20, disk=None, max_disk_bytes: int = 1 << 30):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = self._misses = self._disk_hits = self._evictions = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if disk:
+            path = default_db_path() if disk is True else disk
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('CREATE TABLE IF NOT EXISTS results '
+                             '(id BLOB PRIMARY KEY, value BLOB, used REAL)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+            self._db.commit()
+            self._disk_bytes = self._db.execute(
+                'SELECT COALESCE(SUM(LENGTH(value)), 0) FROM results').fetchone()[0]
+
+    def encrypt(self, cipher: str, text: str, *key) -> str:
+        """MODULES[cipher].encrypt(text, *key), computed once per distinct request."""
+        return self._lookup(cipher, False, text, key)
+
+    def decrypt(self, cipher: str, text: str, *key) -> str:
+        """MODULES[cipher].decrypt(text, *key), computed once per distinct request."""
+        return self._lookup(cipher, True, text, key)
+
+    def _lookup(self, cipher: str, decrypt: bool, text: str, key: tuple) -> str:
+        module = MODULES[cipher]
+        func = module.decrypt if decrypt else module.encrypt
+        try:
+            nkey = normalized_key(cipher, key)
+        except (AttributeError, IndexError, TypeError, ValueError):
+            nkey = None
+        if nkey is None:
+            return func(text, *key)
+        entry = (cipher, decrypt, nkey, _digest(text))
+        with self._lock:
+            result = self._entries.get(entry)
+            if result is not None:
+                self._entries.move_to_end(entry)
+                self._hits += 1
+                return result
+            self._misses += 1
+        result = self._disk_get(entry) if self._db else None
+        if result is None:
+            result = func(text, *key)
+            if self._db:
+                self._disk_put(entry, result)
+        self._store(entry, result)
+        return result
+
+    def _store(self, entry: tuple, result: str) -> None:
+        size = sys.getsizeof(result) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if entry in self._entries:
+                return
+            self._entries[entry] = result
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self._bytes -= sys.getsizeof(old) + _ENTRY_OVERHEAD
+                self._evictions += 1
+
+    @staticmethod
+    def _disk_id(entry: tuple) -> bytes:
+        cipher, decrypt, nkey, digest = entry
+        head = json.dumps([cipher, decrypt, list(nkey)]).encode('utf-8')
+        return hashlib.blake2b(head, digest_size=16).digest() + digest
+
+    def _disk_get(self, entry: tuple):
+        row_id = self._disk_id(entry)
+        with self._lock:
+            row = self._db.execute('SELECT value FROM results WHERE id = ?', (row_id,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute('UPDATE results SET used = ? WHERE id = ?', (time.time(), row_id))
+            self._db.commit()
+            self._disk_hits += 1
+        return row[0].decode('utf-8', 'surrogatepass')
+
+    def _disk_put(self, entry: tuple, result: str) -> None:
+        value = result.encode('utf-8', 'surrogatepass')
+        if len(value) > self.max_disk_bytes:
+            return
+        with self._lock:
+            cur = self._db.execute('INSERT OR IGNORE INTO results VALUES (?, ?, ?)',
+                                   (self._disk_id(entry), value, time.time()))
+            self._disk_bytes += len(value) * cur.rowcount
+            # Drop the least recently used rows in batches once over budget
+            while self._disk_bytes > self.max_disk_bytes:
+                rows = self._db.execute('SELECT id, LENGTH(value) FROM results '
+                                        'ORDER BY used LIMIT 64').fetchall()
+                self._db.executemany('DELETE FROM results WHERE id = ?',
+                                     [(row_id,) for row_id, _ in rows])
+                self._disk_bytes -= sum(size for _, size in rows)
+            self._db.commit()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._disk_hits, self._evictions,
+                              self._bytes, len(self._entries))
+
+    def clear(self, disk: bool = False) -> None:
+        """Empty the memory tier (and the SQLite tier with disk=True)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if disk and self._db:
+                self._db.execute('DELETE FROM results')
+                self._db.commit()
+                self._disk_bytes = 0
+
+    def close(self) -> None:
+        if self._db:
+            self._db.close()
+            self._db = None
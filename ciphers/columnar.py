@@ -3,6 +3,9 @@ Columnar Transposition cipher implementation.
 A transposition cipher that rearranges text into columns based on a key.
 """
 
+from .normalize import normalize
+
+
 def encrypt(plaintext: str, key: str) -> str:
     """
     Encrypt text using Columnar Transposition cipher.
@@ -15,7 +18,7 @@ def encrypt(plaintext: str, key: str) -> str:
         return plaintext
         
     # Remove spaces and convert to uppercase for consistent encryption
-    plaintext = ''.join(plaintext.split()).upper()
+    plaintext = normalize(plaintext, 'strip_upper')
     
     # Calculate dimensions
     num_cols = len(key)
@@ -57,26 +60,23 @@ def decrypt(ciphertext: str, key: str) -> str:
     num_cols = len(key)
     num_rows = (len(ciphertext) + num_cols - 1) // num_cols
     
-    # Calculate column lengths (some columns might be shorter)
+    # Calculate column lengths: the rightmost columns are one shorter
+    # when the last row is incomplete
     col_lengths = [num_rows] * num_cols
     short_cols = num_cols * num_rows - len(ciphertext)
-    for i in sorted(range(num_cols), key=lambda x: key[x])[num_cols-short_cols:]:
+    for i in range(num_cols - short_cols, num_cols):
         col_lengths[i] -= 1
         
-    # Create inverse column order mapping
+    # Columns were read off in key order
     col_order = sorted(range(num_cols), key=lambda x: key[x])
-    inverse_order = [0] * num_cols
-    for i, col in enumerate(col_order):
-        inverse_order[col] = i
         
     # Read columns back into grid
     grid = [[''] * num_cols for _ in range(num_rows)]
     pos = 0
-    for col in range(num_cols):
-        orig_col = inverse_order[col]
-        for row in range(col_lengths[orig_col]):
+    for col in col_order:
+        for row in range(col_lengths[col]):
             if pos < len(ciphertext):
-                grid[row][orig_col] = ciphertext[pos]
+                grid[row][col] = ciphertext[pos]
                 pos += 1
                 
     # Read off rows to get plaintext
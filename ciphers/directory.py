@@ -0,0 +1,255 @@
+"""
+Directory batch encryption and decryption.
+Walks a source tree and writes the result for every matching file to the
+same relative path under a destination tree. Files are read and written
+by a thread pool while a process pool runs the cipher, so disk I/O
+overlaps the cipher work. Outputs are written atomically, and a manifest
+in the destination records the content hash and key of every processed
+file so reruns skip files that have not changed.
+
+Run: python -m ciphers.directory SRC DST CIPHER KEY... [--decrypt]
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import NamedTuple
+
+from .pipeline import MODULES
+
+MANIFEST_NAME = '.classic_ciphers_manifest.json'
+# Ciphers whose key arguments are integers on the command line
+_INT_KEYS = ('caesar', 'rail_fence')
+# Finished files between manifest saves
+_SAVE_EVERY = 100
+
+
+class FileResult(NamedTuple):
+    """
+    Timings for one file; skipped files were unchanged since the last run.
+    error holds the message of a failed read, cipher or write; failed files
+    are left out of the manifest so the next run retries them.
+    """
+    path: str
+    size: int
+    read_seconds: float
+    cipher_seconds: float
+    write_seconds: float
+    skipped: bool
+    error: str = ''
+
+
+class TreeReport(NamedTuple):
+    """Summary of one process_tree run."""
+    files: list[FileResult]
+    seconds: float
+    bytes_processed: int
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes_processed / 1e6 / self.seconds if self.seconds > 0 else 0.0
+
+
+def key_fingerprint(cipher: str, key, decrypt: bool) -> str:
+    """Stable hash of the cipher, key and direction stored in the manifest."""
+    data = json.dumps([cipher, [str(k) for k in key], decrypt])
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _walk(src: str, dst: str, pattern: str) -> list[str]:
+    """Relative paths of the files to process, skipping the destination tree."""
+    dst = os.path.abspath(dst)
+    paths = []
+    for root, dirs, files in os.walk(src):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != dst)
+        for name in sorted(files):
+            if fnmatch.fnmatch(name, pattern) and name != MANIFEST_NAME:
+                paths.append(os.path.relpath(os.path.join(root, name), src))
+    return paths
+
+
+def _read(path: str):
+    started = time.perf_counter()
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    return data, hashlib.sha256(data).hexdigest(), time.perf_counter() - started
+
+
+def _transform(cipher: str, key: tuple, decrypt: bool, data: bytes):
+    """Worker: run the cipher over one file's contents."""
+    started = time.perf_counter()
+    module = MODULES[cipher]
+    func = module.decrypt if decrypt else module.encrypt
+    text = func(data.decode('utf-8', 'surrogateescape'), *key)
+    return text.encode('utf-8', 'surrogateescape'), time.perf_counter() - started
+
+
+def _write_atomic(path: str, data: bytes) -> float:
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+    return time.perf_counter() - started
+
+
+def _load_manifest(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as fh:
+        return json.load(fh).get('files', {})
+
+
+def _save_manifest(path: str, entries: dict) -> None:
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump({'files': entries}, fh, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def process_tree(src: str, dst: str, cipher: str, *key, decrypt: bool = False,
+                 pattern: str = '*.txt', io_threads: int = 8, workers: int | None = None,
+                 max_in_flight: int = 64, progress=None) -> TreeReport:
+    """
+    Encrypt (or decrypt) every file under src matching pattern into dst.
+
+    Args:
+        src: Source directory
+        dst: Destination directory; created if missing
+        cipher: Cipher module name, e.g. 'vigenere'
+        *key: Key arguments passed to the cipher's encrypt/decrypt
+        decrypt: Decrypt instead of encrypt
+        pattern: Shell pattern that file names must match
+        io_threads: Threads reading and writing files
+        workers: Cipher processes (defaults to the CPU count; 1 runs the
+            cipher in a thread of this process)
+        max_in_flight: Files held in memory at once
+        progress: Optional callback receiving each FileResult
+    """
+    if cipher not in MODULES:
+        raise ValueError(f"Unknown cipher: {cipher}")
+    if os.path.abspath(src) == os.path.abspath(dst):
+        raise ValueError("Destination must differ from the source directory")
+    manifest_path = os.path.join(dst, MANIFEST_NAME)
+    os.makedirs(dst, exist_ok=True)
+    manifest = _load_manifest(manifest_path)
+    fingerprint = key_fingerprint(cipher, key, decrypt)
+    paths = iter(_walk(src, dst, pattern))
+    results = []
+    processed = 0
+    unsaved = 0
+    started = time.perf_counter()
+
+    workers = workers or os.cpu_count() or 1
+    pool_type = ThreadPoolExecutor if workers <= 1 else ProcessPoolExecutor
+    try:
+        with ThreadPoolExecutor(io_threads) as io, pool_type(workers) as pool:
+            # future -> (stage, relative path, timings so far)
+            running = {}
+            exhausted = False
+            while True:
+                while not exhausted and len(running) < max_in_flight:
+                    rel = next(paths, None)
+                    if rel is None:
+                        exhausted = True
+                        break
+                    running[io.submit(_read, os.path.join(src, rel))] = ('read', rel, ())
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    stage, rel, timings = running.pop(fut)
+                    out_path = os.path.join(dst, rel)
+                    try:
+                        value = fut.result()
+                    except Exception as exc:
+                        # One bad file must not end the run; report it and move on
+                        size, _, read_seconds, cipher_seconds = \
+                            timings + (0, '', 0.0, 0.0)[len(timings):]
+                        result = FileResult(rel, size, read_seconds, cipher_seconds, 0.0, False,
+                                            f"{stage}: {type(exc).__name__}: {exc}")
+                        results.append(result)
+                        if progress:
+                            progress(result)
+                        continue
+                    if stage == 'read':
+                        data, digest, read_seconds = value
+                        unchanged = manifest.get(rel) == {'sha256': digest, 'key': fingerprint}
+                        if unchanged and os.path.exists(out_path):
+                            result = FileResult(rel, len(data), read_seconds, 0.0, 0.0, True)
+                            results.append(result)
+                            if progress:
+                                progress(result)
+                            continue
+                        cipher_fut = pool.submit(_transform, cipher, key, decrypt, data)
+                        running[cipher_fut] = ('cipher', rel, (len(data), digest, read_seconds))
+                    elif stage == 'cipher':
+                        output, cipher_seconds = value
+                        running[io.submit(_write_atomic, out_path, output)] = \
+                            ('write', rel, timings + (cipher_seconds,))
+                    else:
+                        size, digest, read_seconds, cipher_seconds = timings
+                        result = FileResult(rel, size, read_seconds, cipher_seconds, value, False)
+                        results.append(result)
+                        processed += size
+                        manifest[rel] = {'sha256': digest, 'key': fingerprint}
+                        if progress:
+                            progress(result)
+                        unsaved += 1
+                # Save the manifest now and then so an interrupted run keeps its progress
+                if unsaved >= _SAVE_EVERY:
+                    _save_manifest(manifest_path, manifest)
+                    unsaved = 0
+    finally:
+        _save_manifest(manifest_path, manifest)
+    results.sort()
+    return TreeReport(results, time.perf_counter() - started, processed)
+
+
+def _parse_key(cipher: str, values: list[str]) -> tuple:
+    return tuple(int(v) for v in values) if cipher in _INT_KEYS else tuple(values)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Encrypt or decrypt a directory tree.")
+    parser.add_argument('src', help="Source directory")
+    parser.add_argument('dst', help="Destination directory (mirrors src)")
+    parser.add_argument('cipher', choices=sorted(MODULES), help="Cipher to apply")
+    parser.add_argument('key', nargs='*', help="Key arguments for the cipher")
+    parser.add_argument('--decrypt', action='store_true', help="Decrypt instead of encrypt")
+    parser.add_argument('--pattern', default='*.txt', help="File name pattern (default *.txt)")
+    parser.add_argument('--workers', type=int, help="Cipher processes")
+    parser.add_argument('--io-threads', type=int, default=8, help="Read/write threads")
+    parser.add_argument('--quiet', action='store_true', help="Only print the summary")
+    args = parser.parse_args(argv)
+
+    def show(result: FileResult):
+        if args.quiet:
+            return
+        if result.error:
+            print(f"FAIL  {result.path}  {result.error}")
+        elif result.skipped:
+            print(f"skip  {result.path}")
+        else:
+            print(f"done  {result.path}  {result.size} B  read {result.read_seconds * 1e3:.1f} ms"
+                  f"  cipher {result.cipher_seconds * 1e3:.1f} ms"
+                  f"  write {result.write_seconds * 1e3:.1f} ms")
+
+    report = process_tree(args.src, args.dst, args.cipher, *_parse_key(args.cipher, args.key),
+                          decrypt=args.decrypt, pattern=args.pattern, io_threads=args.io_threads,
+                          workers=args.workers, progress=show)
+    skipped = sum(r.skipped for r in report.files)
+    failed = sum(bool(r.error) for r in report.files)
+    print(f"{len(report.files) - skipped - failed} files processed, {skipped} unchanged, "
+          f"{failed} failed, "
+          f"{report.bytes_processed / 1e6:.2f} MB in {report.seconds:.2f}s "
+          f"({report.mb_per_second:.2f} MB/s)")
+
+
+if __name__ == '__main__':
+    main()
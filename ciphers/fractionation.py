@@ -0,0 +1,245 @@
+"""
+Fractionation engine shared by the Polybius square family of ciphers.
+A keyed square or cube is compiled once into byte tables (character ->
+cell number, cell -> each of its coordinates, cell -> character), so
+splitting a text into coordinates is one bytes.translate per coordinate.
+The ciphers differ only in how the coordinates are rearranged before
+they are read back:
+
+    polybius  coordinates written out as the digits 1-5
+    bifid     per block of period letters, all row numbers then all
+              column numbers, read back in pairs (5x5 square)
+    trifid    the same with three coordinates (3x3x3 cube)
+    adfgx     coordinates written as the letters ADFGX (5x5 square) or
+    adfgvx    ADFGVX (6x6 square), then a columnar transposition
+
+Coordinates are held as planes: one bytes object per coordinate, with
+the coordinate of every cell in text order. Block rearrangement is a
+reshape and transpose of the planes and recombination is array
+arithmetic when NumPy is installed, and slicing and map() otherwise.
+"""
+
+import string
+from functools import lru_cache
+from operator import add
+
+from ._compat import numpy as np
+from .normalize import normalize
+
+# Grid shapes: (side, coordinates per cell, characters, normalize profile)
+GRIDS = {
+    '5x5': (5, 2, 'ABCDEFGHIKLMNOPQRSTUVWXYZ', 'playfair'),
+    '6x6': (6, 2, string.ascii_uppercase + string.digits, 'adfgvx'),
+    '3x3x3': (3, 3, string.ascii_uppercase + '+', None),
+}
+
+
+class Grid:
+    """
+    A keyed Polybius square or cube: the keyword's distinct characters,
+    then the rest of the grid's characters in order. Cell n holds
+    alphabet[n]; its coordinates are the base-side digits of n (row,
+    column in a square; layer, row, column in a cube), most significant
+    first. Letters of either case map to their cell, and J to I in a
+    5x5 square.
+
+    Args:
+        shape: One of GRIDS
+        keyword: Keyword that arranges the grid
+    """
+
+    def __init__(self, shape: str, keyword: str = ''):
+        if shape not in GRIDS:
+            raise ValueError(f"Unknown grid shape: {shape}")
+        self.shape = shape
+        self.side, self.dims, chars, self.profile = GRIDS[shape]
+        keyword = keyword.upper()
+        if shape == '5x5':
+            keyword = keyword.replace('J', 'I')
+        self.alphabet = ''.join(dict.fromkeys(c for c in keyword + chars if c in chars))
+        cell_of = {}
+        for n, ch in enumerate(self.alphabet):
+            cell_of[ord(ch)] = cell_of[ord(ch.lower())] = n
+        if shape == '5x5':
+            cell_of[ord('J')] = cell_of[ord('j')] = cell_of[ord('I')]
+        table = bytearray(range(256))
+        for b, n in cell_of.items():
+            table[b] = n
+        # (table, delete) arguments of bytes.translate: text -> cells
+        self._cells = (bytes(table), bytes(b for b in range(256) if b not in cell_of))
+        cells = bytes(range(len(chars)))
+        self._chars = bytes.maketrans(cells, self.alphabet.encode('ascii'))
+        self._planes = tuple(
+            bytes.maketrans(cells, bytes(n // self.side ** (self.dims - 1 - d) % self.side
+                                         for n in cells))
+            for d in range(self.dims))
+        self._scaled = tuple(n * self.side for n in range(len(chars)))
+
+    def cells(self, text: str) -> bytes:
+        """Cell numbers of the characters of text in the grid; others are dropped."""
+        if text.isascii():
+            data = text.encode('ascii')
+        else:
+            data = (normalize(text, self.profile) if self.profile else text.upper()).encode(
+                'ascii', 'ignore')
+        return data.translate(*self._cells)
+
+    def text(self, cells: bytes) -> str:
+        """Characters of a sequence of cell numbers."""
+        return cells.translate(self._chars).decode('ascii')
+
+    def planes(self, cells: bytes) -> tuple[bytes, ...]:
+        """Coordinate planes of a sequence of cells."""
+        return tuple(cells.translate(table) for table in self._planes)
+
+    def recombine(self, planes) -> bytes:
+        """Cell numbers from coordinate planes of equal length."""
+        if np is not None:
+            cells = np.frombuffer(planes[0], dtype=np.uint8).copy()
+            for plane in planes[1:]:
+                cells *= self.side
+                cells += np.frombuffer(plane, dtype=np.uint8)
+            return cells.tobytes()
+        cells = planes[0]
+        for plane in planes[1:]:
+            cells = bytes(map(add, map(self._scaled.__getitem__, cells), plane))
+        return cells
+
+
+@lru_cache(maxsize=256)
+def compile_grid(shape: str, keyword: str = '') -> Grid:
+    """The Grid of a shape and keyword, built once per process."""
+    return Grid(shape, keyword)
+
+
+def interleave(planes) -> bytes:
+    """Coordinates cell by cell: c0[0] c1[0] ... c0[1] c1[1] ..."""
+    dims = len(planes)
+    out = bytearray(len(planes[0]) * dims)
+    for d, plane in enumerate(planes):
+        out[d::dims] = plane
+    return bytes(out)
+
+
+def deinterleave(seq: bytes, dims: int) -> tuple[bytes, ...]:
+    """Planes of an interleaved coordinate sequence; an incomplete last cell is dropped."""
+    end = len(seq) - len(seq) % dims
+    return tuple(seq[d:end:dims] for d in range(dims))
+
+
+def _block_layout(n: int, period: int) -> tuple[int, int]:
+    """(period, cells in whole blocks); period 0 means one block for all n cells."""
+    period = max(1, min(period, n) if period > 0 else n)
+    return period, n - n % period
+
+
+def spread(planes, period: int = 0) -> bytes:
+    """
+    Bifid/Trifid write-out: for each block of period cells, the block of
+    every plane in turn. A shorter last block is laid out the same way.
+    """
+    dims = len(planes)
+    period, full = _block_layout(len(planes[0]), period)
+    if np is not None:
+        head = np.frombuffer(b''.join(p[:full] for p in planes), dtype=np.uint8)
+        head = head.reshape(dims, -1, period).transpose(1, 0, 2).tobytes()
+    else:
+        head = b''.join(p[i:i + period] for i in range(0, full, period) for p in planes)
+    return head + b''.join(p[full:] for p in planes)
+
+
+def unspread(seq: bytes, dims: int, period: int = 0) -> tuple[bytes, ...]:
+    """Inverse of spread: planes of dims coordinates from the written-out sequence."""
+    n = len(seq) // dims
+    period, full = _block_layout(n, period)
+    tail = n - full
+    rest = seq[full * dims:n * dims]
+    if np is not None:
+        head = np.frombuffer(seq, dtype=np.uint8, count=full * dims)
+        head = head.reshape(-1, dims, period).transpose(1, 0, 2).reshape(dims, -1)
+        heads = [row.tobytes() for row in head]
+    else:
+        step = dims * period
+        heads = [b''.join(seq[i + d * period:i + (d + 1) * period]
+                          for i in range(0, full * dims, step)) for d in range(dims)]
+    return tuple(heads[d] + rest[d * tail:(d + 1) * tail] for d in range(dims))
+
+
+def column_order(key: str) -> list[int]:
+    """Columns in the order a columnar transposition reads them (stable by key character)."""
+    return sorted(range(len(key)), key=lambda x: key[x])
+
+
+def columnar_bytes(data: bytes, key: str, decrypt: bool = False) -> bytes:
+    """
+    Columnar transposition of bytes, as ciphers.columnar does for text:
+    column c of the grid is data[c::len(key)], so each column is one slice.
+    """
+    cols = len(key)
+    if not decrypt:
+        return b''.join(data[c::cols] for c in column_order(key))
+    out = bytearray(len(data))
+    pos = 0
+    for c in column_order(key):
+        length = len(range(c, len(data), cols))
+        out[c::cols] = data[pos:pos + length]
+        pos += length
+    return bytes(out)
+
+
+def polybius(text: str, grid: Grid, decrypt: bool = False) -> str:
+    """
+    Replace each character by its coordinates as digits 1 to side, or read
+    digit pairs back into characters. Whitespace in ciphertext is ignored.
+    """
+    digits = string.digits[1:grid.side + 1].encode('ascii')
+    coords = bytes(range(grid.side))
+    if not decrypt:
+        return interleave(grid.planes(grid.cells(text))).translate(
+            bytes.maketrans(coords, digits)).decode('ascii')
+    data = ''.join(text.split()).encode('ascii', 'replace')
+    if data.translate(None, digits):
+        raise ValueError(f"Polybius ciphertext may only contain the digits 1-{grid.side}")
+    seq = data.translate(bytes.maketrans(digits, coords))
+    return grid.text(grid.recombine(deinterleave(seq, grid.dims)))
+
+
+def delastelle(text: str, grid: Grid, period: int = 0, decrypt: bool = False) -> str:
+    """
+    Bifid (square) or Trifid (cube) fractionation of the grid characters
+    of text.
+
+    Args:
+        text: Text to transform; characters not in the grid are dropped
+        grid: Compiled square or cube
+        period: Letters per block; 0 treats the whole text as one block
+        decrypt: Decrypt instead of encrypt
+    """
+    planes = grid.planes(grid.cells(text))
+    if decrypt:
+        planes = unspread(interleave(planes), grid.dims, period)
+    else:
+        planes = deinterleave(spread(planes, period), grid.dims)
+    return grid.text(grid.recombine(planes))
+
+
+def fractionated_columnar(text: str, grid: Grid, symbols: str, columnar_key: str,
+                          decrypt: bool = False) -> str:
+    """
+    ADFGX/ADFGVX: write each character's coordinates as two of symbols,
+    then transpose the result by columnar_key. Decryption expects only
+    symbols and ignores a dangling last symbol.
+    """
+    if not columnar_key:
+        return text
+    marks = symbols.encode('ascii')
+    coords = bytes(range(len(marks)))
+    if not decrypt:
+        seq = interleave(grid.planes(grid.cells(text))).translate(bytes.maketrans(coords, marks))
+        return columnar_bytes(seq, columnar_key).decode('ascii')
+    data = text.encode('ascii', 'replace')
+    if data.translate(None, marks):
+        raise ValueError(f"{symbols} ciphertext may only contain the letters {symbols}")
+    seq = columnar_bytes(data, columnar_key, decrypt=True).translate(
+        bytes.maketrans(marks, coords))
+    return grid.text(grid.recombine(deinterleave(seq, grid.dims)))
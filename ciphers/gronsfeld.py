@@ -0,0 +1,24 @@
+"""
+Gronsfeld cipher implementation.
+Vigenere with a numeric key: each digit is the shift of one letter,
+repeating (key 31415 shifts by 3, 1, 4, 1, 5, 3, ...).
+Preserves case and non-letter characters.
+"""
+
+from .polyalphabetic import digit_codes, periodic
+
+
+def encrypt(plaintext: str, key) -> str:
+    """
+    Encrypt text using Gronsfeld cipher.
+
+    Args:
+        plaintext: Text to encrypt
+        key: Digits (str or int); other characters are ignored
+    """
+    return periodic(plaintext, digit_codes(key, 'Gronsfeld'))
+
+
+def decrypt(ciphertext: str, key) -> str:
+    """Decrypt Gronsfeld ciphertext with the key used to encrypt it."""
+    return periodic(ciphertext, digit_codes(key, 'Gronsfeld'), decrypt=True)
@@ -3,13 +3,16 @@ Hill cipher implementation (2x2 matrix).
 Uses a 2x2 matrix of letters as key for encryption/decryption.
 """
 
+from .normalize import normalize
+
+# Multiplicative inverse of every residue mod 26 (-1 where none exists)
+MOD26_INVERSES = tuple(next((i for i in range(26) if d * i % 26 == 1), -1)
+                       for d in range(26))
+
+
 def _find_multiplicative_inverse(determinant: int) -> int:
     """Find multiplicative inverse mod 26 of the given determinant."""
-    determinant %= 26
-    for i in range(26):
-        if (determinant * i) % 26 == 1:
-            return i
-    return -1
+    return MOD26_INVERSES[determinant % 26]
 
 
 def _make_key_matrix_from_string(key: str):
@@ -33,7 +36,7 @@ def encrypt(plaintext: str, key: str) -> str:
         raise ValueError("Hill key matrix is not invertible modulo 26")
     
     # remove spaces per original script
-    p = ''.join(ch for ch in plaintext if ch != ' ')
+    p = normalize(plaintext, 'no_spaces')
     # pad with X if odd
     if len(p) % 2 != 0:
         p += 'X'
@@ -67,7 +70,7 @@ def decrypt(ciphertext: str, key: str) -> str:
     adj = [[d * inv % 26, (-b) * inv % 26], 
            [(-c) * inv % 26, a * inv % 26]]
     
-    p = ''.join(ch for ch in ciphertext if ch != ' ')
+    p = normalize(ciphertext, 'no_spaces')
     out = []
     for i in range(0, len(p), 2):
         x = ord(p[i].upper()) - 65
@@ -0,0 +1,172 @@
+"""
+Precomputed Hill key tables.
+Every 2x2 key matrix mod 26 is numbered a*26^3 + b*26^2 + c*26 + d for
+the key letters abcd. The table holds the inverse matrix of each key
+(or 255s for the singular ones) and is stored once as a NumPy .npy file
+that is memory-mapped on later loads, so key validation, random valid
+keys and exhaustive Hill search need no determinant arithmetic.
+"""
+
+import os
+import random
+import tempfile
+from functools import lru_cache
+
+from ._compat import numpy as np, require_numpy
+from .hill import MOD26_INVERSES
+
+KEY_COUNT = 26 ** 4
+INVERTIBLE_COUNT = 157248
+SINGULAR = 255
+
+_CACHE_ENV = 'CLASSIC_CIPHERS_CACHE'
+_TABLE_NAME = 'hill2x2_inverses.npy'
+
+
+def default_table_path() -> str:
+    """Location of the persisted table (override with $CLASSIC_CIPHERS_CACHE)."""
+    base = os.environ.get(_CACHE_ENV) or os.path.join(
+        os.path.expanduser('~'), '.cache', 'classic_ciphers')
+    return os.path.join(base, _TABLE_NAME)
+
+
+def build_table() -> 'np.ndarray':
+    """Compute the (26**4, 4) uint8 inverse table for all 2x2 keys."""
+    require_numpy('Hill key tables')
+    idx = np.arange(KEY_COUNT)
+    a, b, c, d = idx // 17576, idx // 676 % 26, idx // 26 % 26, idx % 26
+    det_inv = np.array(MOD26_INVERSES, dtype=np.int64)[(a * d - b * c) % 26]
+    table = np.stack([d * det_inv, -b * det_inv, -c * det_inv, a * det_inv], axis=1) % 26
+    table = table.astype(np.uint8)
+    table[det_inv < 0] = SINGULAR
+    return table
+
+
+def save_table(path: str | None = None) -> str:
+    """Build the table and write it atomically to path."""
+    path = path or default_table_path()
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    # A unique name, so processes building the table at once do not collide
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp.npy')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            np.save(fh, build_table())
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return path
+
+
+@lru_cache(maxsize=None)
+def load_table(path: str | None = None) -> 'np.ndarray':
+    """
+    Memory-map the inverse table, building and saving it on first use.
+    Falls back to an in-memory table when the cache is not writable.
+    """
+    require_numpy('Hill key tables')
+    path = path or default_table_path()
+    if not os.path.exists(path):
+        try:
+            save_table(path)
+        except OSError:
+            return build_table()
+    return np.load(path, mmap_mode='r')
+
+
+def key_index(key) -> int:
+    """Table index of a 4-letter key or a [[a, b], [c, d]] matrix."""
+    if isinstance(key, str):
+        key = key.strip()
+        if len(key) != 4 or not key.isalpha():
+            raise ValueError("Hill key must be 4 letters (2x2 matrix)")
+        nums = [ord(c.upper()) - 65 for c in key]
+    else:
+        nums = [int(v) % 26 for row in key for v in row]
+    a, b, c, d = nums
+    return ((a * 26 + b) * 26 + c) * 26 + d
+
+
+def is_invertible(key) -> bool:
+    """True when the key matrix is invertible modulo 26."""
+    return bool(load_table()[key_index(key), 0] != SINGULAR)
+
+
+def inverse(key) -> list[list[int]]:
+    """Inverse matrix mod 26 of a key; raises ValueError for singular keys."""
+    row = load_table()[key_index(key)]
+    if row[0] == SINGULAR:
+        raise ValueError("Hill key matrix is not invertible modulo 26")
+    return [[int(row[0]), int(row[1])], [int(row[2]), int(row[3])]]
+
+
+@lru_cache(maxsize=None)
+def valid_key_indices() -> 'np.ndarray':
+    """Indices of all 157,248 invertible keys, in increasing order."""
+    return np.flatnonzero(load_table()[:, 0] != SINGULAR)
+
+
+def valid_keys() -> 'np.ndarray':
+    """All invertible keys as a (157248, 4) array of letter codes."""
+    idx = valid_key_indices()
+    return np.stack([idx // 17576, idx // 676 % 26, idx // 26 % 26, idx % 26], axis=1)
+
+
+def key_string(codes) -> str:
+    """Four letter codes (or a table index) as a key string."""
+    if np.ndim(codes) == 0:
+        i = int(codes)
+        codes = (i // 17576, i // 676 % 26, i // 26 % 26, i % 26)
+    return ''.join(chr(int(c) + 65) for c in codes)
+
+
+def random_key(rng: random.Random | None = None) -> str:
+    """A uniformly random invertible 2x2 key as a 4-letter string."""
+    rng = rng or random
+    idx = valid_key_indices()
+    return key_string(idx[rng.randrange(len(idx))])
+
+
+def random_keys(count: int, seed: int | None = None) -> 'np.ndarray':
+    """count uniformly random invertible keys as a (count, 4) code array."""
+    gen = np.random.default_rng(seed)
+    idx = valid_key_indices()[gen.integers(0, INVERTIBLE_COUNT, size=count)]
+    return np.stack([idx // 17576, idx // 676 % 26, idx // 26 % 26, idx % 26], axis=1)
+
+
+def _det3(m):
+    return (m[:, 0, 0] * (m[:, 1, 1] * m[:, 2, 2] - m[:, 1, 2] * m[:, 2, 1])
+            - m[:, 0, 1] * (m[:, 1, 0] * m[:, 2, 2] - m[:, 1, 2] * m[:, 2, 0])
+            + m[:, 0, 2] * (m[:, 1, 0] * m[:, 2, 1] - m[:, 1, 1] * m[:, 2, 0]))
+
+
+def random_keys_3x3(count: int, seed: int | None = None):
+    """
+    Sample count invertible 3x3 key matrices mod 26 by vectorized
+    rejection sampling. Returns (keys, inverses), both (count, 3, 3).
+    About 30% of random 3x3 matrices are invertible.
+    """
+    require_numpy('Hill key tables')
+    gen = np.random.default_rng(seed)
+    mod_inv = np.array(MOD26_INVERSES, dtype=np.int64)
+    keys, invs = [], []
+    found = 0
+    while found < count:
+        m = gen.integers(0, 26, size=(max(2 * (count - found) * 2, 16), 3, 3))
+        det_inv = mod_inv[_det3(m) % 26]
+        m = m[det_inv >= 0]
+        det_inv = det_inv[det_inv >= 0]
+        # Adjugate: transpose of the cofactor matrix
+        adj = np.empty_like(m)
+        for i in range(3):
+            for j in range(3):
+                rows = [r for r in range(3) if r != j]
+                cols = [c for c in range(3) if c != i]
+                minor = (m[:, rows[0], cols[0]] * m[:, rows[1], cols[1]]
+                         - m[:, rows[0], cols[1]] * m[:, rows[1], cols[0]])
+                adj[:, i, j] = (-1) ** (i + j) * minor
+        keys.append(m)
+        invs.append(adj * det_inv[:, None, None] % 26)
+        found += len(m)
+    return np.concatenate(keys)[:count], np.concatenate(invs)[:count]
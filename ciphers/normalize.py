@@ -0,0 +1,83 @@
+"""
+Shared text normalization for the cipher modules.
+Each profile is compiled into a str.translate table, so normalizing is
+one pass over the text instead of split/join, upper and a filter each
+making their own copy. Tables hold the ASCII range up front and fill in
+any other character the first time it is seen, using the same str
+methods the modules used before, so results are unchanged for all input.
+
+Profiles:
+    strip_upper  drop whitespace, uppercase (Columnar, Rail Fence, Autokey)
+    no_spaces    drop ' ' only (Hill)
+    alpha_upper  uppercase, keep letters (Playfair decryption)
+    playfair     uppercase, keep letters, J -> I (Playfair encryption)
+    adfgvx       uppercase, keep A-Z and 0-9 (ADFGVX)
+"""
+
+import string
+
+_ADFGVX_CHARS = frozenset(string.ascii_uppercase + string.digits)
+
+
+def _strip_upper(ch: str) -> str:
+    return '' if ch.isspace() else ch.upper()
+
+
+def _no_spaces(ch: str) -> str:
+    return '' if ch == ' ' else ch
+
+
+def _alpha_upper(ch: str) -> str:
+    return ''.join(c for c in ch.upper() if c.isalpha())
+
+
+def _playfair(ch: str) -> str:
+    return _alpha_upper(ch).replace('J', 'I')
+
+
+def _adfgvx(ch: str) -> str:
+    return ''.join(c for c in ch.upper() if c in _ADFGVX_CHARS)
+
+
+class _Profile(dict):
+    """str.translate table that computes a character's mapping on first use."""
+
+    def __init__(self, rule):
+        super().__init__()
+        self.rule = rule
+        table = bytearray(range(256))
+        delete = bytearray()
+        for code in range(128):
+            value = self[code] = rule(chr(code))
+            if value:
+                table[code] = ord(value)
+            else:
+                delete.append(code)
+        # (table, delete) arguments for bytes.translate on ASCII data
+        self.bytes_tables = (bytes(table), bytes(delete))
+
+    def __missing__(self, code: int) -> str:
+        value = self[code] = self.rule(chr(code))
+        return value
+
+
+PROFILES = {
+    'strip_upper': _Profile(_strip_upper),
+    'no_spaces': _Profile(_no_spaces),
+    'alpha_upper': _Profile(_alpha_upper),
+    'playfair': _Profile(_playfair),
+    'adfgvx': _Profile(_adfgvx),
+}
+
+
+def normalize(text: str, profile: str) -> str:
+    """Apply a named normalization profile to text in one pass."""
+    return text.translate(PROFILES[profile])
+
+
+def normalize_bytes(data: bytes, profile: str) -> bytes:
+    """
+    Apply a profile to ASCII bytes with one bytes.translate call.
+    Bytes outside ASCII are left as they are.
+    """
+    return data.translate(*PROFILES[profile].bytes_tables)
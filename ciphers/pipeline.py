@@ -0,0 +1,349 @@
+"""
+Cipher pipelines with fusion of chained stages.
+A Pipeline applies several ciphers in sequence. Where the algebra allows
+it the stages are fused instead of producing a full intermediate string
+per stage:
+
+- consecutive Caesar/Atbash/keyed substitution stages and periodic
+  polyalphabetic stages (Vigenere, Beaufort, Variant Beaufort, Gronsfeld,
+  Porta) collapse into one periodic substitution table (period = lcm of
+  the key periods);
+- consecutive Columnar/Rail Fence stages compose into one permutation;
+- a fused run then costs one bytes.translate per substitution row (see
+  polyalphabetic.periodic_tables) and one gather per permutation. With
+  NumPy, a run that contains a permutation works on one uint8 array
+  instead: each substitution is a table lookup and each permutation an
+  index, so a substitution and the gather next to it run without an
+  intermediate string. Gathers are built with NumPy slices as well.
+
+Other ciphers (Hill, Playfair, the Polybius square family, Autokey) run
+as separate stages through their modules. Results are identical to
+calling each module's encrypt (or, in reverse order, decrypt) in turn;
+text containing non-ASCII characters, which the modules handle each in
+their own way, is passed through the modules of a fused run unchanged.
+"""
+
+import math
+from functools import lru_cache
+
+from . import (adfgvx, adfgx, atbash, autokey, beaufort, bifid, caesar, columnar, gronsfeld,
+               hill, playfair, polybius, porta, rail_fence, substitution, trifid,
+               variant_beaufort, vigenere)
+from .analysis.transposition import columnar_gather, rail_fence_gather
+from ._compat import numpy as np
+from .normalize import normalize
+from .polyalphabetic import (CIPHERS as POLYALPHABETIC, compile_key, periodic_tables,
+                             tableau_rows)
+
+MODULES = {
+    'caesar': caesar, 'vigenere': vigenere, 'hill': hill, 'playfair': playfair,
+    'atbash': atbash, 'rail_fence': rail_fence, 'adfgvx': adfgvx,
+    'columnar': columnar, 'autokey': autokey, 'substitution': substitution,
+    'beaufort': beaufort, 'variant_beaufort': variant_beaufort, 'gronsfeld': gronsfeld,
+    'porta': porta, 'polybius': polybius, 'bifid': bifid, 'trifid': trifid, 'adfgx': adfgx,
+}
+
+_SUBSTITUTIONS = ('caesar', 'atbash', 'substitution', 'vigenere', 'beaufort',
+                  'variant_beaufort', 'gronsfeld', 'porta')
+_TRANSPOSITIONS = ('columnar', 'rail_fence')
+if np is not None:
+    _IS_LETTER = np.zeros(256, dtype=np.intp)
+    _IS_LETTER[65:91] = _IS_LETTER[97:123] = 1
+
+
+@lru_cache(maxsize=4096)
+def _inverse(gather: tuple[int, ...]) -> tuple[int, ...]:
+    inv = [0] * len(gather)
+    for i, g in enumerate(gather):
+        inv[g] = i
+    return tuple(inv)
+
+
+def _np_inverse(gather):
+    inv = np.empty_like(gather)
+    inv[gather] = np.arange(len(gather), dtype=gather.dtype)
+    return inv
+
+
+def _np_rail_fence_read(rails: int, n: int):
+    """Positions in the order Rail Fence encryption reads them."""
+    period = 2 * (rails - 1)
+    parts = []
+    for r in range(rails):
+        down = np.arange(r, n, period, dtype=np.intp)
+        if 0 < r < rails - 1:
+            up = np.arange(period - r, n, period, dtype=np.intp)
+            rail = np.empty(len(down) + len(up), dtype=np.intp)
+            rail[0::2], rail[1::2] = down, up
+            down = rail
+        parts.append(down)
+    return np.concatenate(parts)
+
+
+def _np_columnar_read(order: tuple[int, ...], n: int):
+    """Positions in the order Columnar encryption reads them."""
+    return np.concatenate([np.arange(c, n, len(order), dtype=np.intp) for c in order])
+
+
+class _Substitution:
+    """Periodic substitution: letter number r maps x -> rows[r % period][x]."""
+
+    def __init__(self, rows):
+        self.rows = [tuple(row) for row in rows]
+
+    @property
+    def period(self) -> int:
+        return len(self.rows)
+
+    def then(self, other: '_Substitution') -> '_Substitution':
+        """Substitution equal to applying self, then other."""
+        period = math.lcm(self.period, other.period)
+        return _Substitution([[other.rows[r % other.period][self.rows[r % self.period][x]]
+                               for x in range(26)] for r in range(period)])
+
+    def inverse(self) -> '_Substitution':
+        rows = []
+        for row in self.rows:
+            inv = [0] * 26
+            for x, y in enumerate(row):
+                inv[y] = x
+            rows.append(inv)
+        return _Substitution(rows)
+
+    def tables(self) -> list[bytes]:
+        """Per-row bytes.translate tables over both cases, as the modules preserve case."""
+        letters = bytes(range(65, 91)) + bytes(range(97, 123))
+        tables = []
+        for row in self.rows:
+            upper = bytes(65 + y for y in row)
+            tables.append(bytes.maketrans(letters, upper + upper.lower()))
+        return tables
+
+
+class _Permutation:
+    """Transposition given as a gather function of the text length."""
+
+    def __init__(self, gathers):
+        # gathers: functions length -> tuple with out[i] = in[g[i]], applied in order
+        self.gathers = list(gathers)
+        self._cache = {}
+
+    def then(self, other: '_Permutation') -> '_Permutation':
+        return _Permutation(self.gathers + other.gathers)
+
+    def gather(self, length: int):
+        """One gather array for all composed transpositions."""
+        if length not in self._cache:
+            if np is not None:
+                result = np.arange(length, dtype=np.intp)
+                for g in self.gathers:
+                    result = result[g(length)]
+            else:
+                result = tuple(range(length))
+                for g in self.gathers:
+                    step = g(length)
+                    result = tuple(result[j] for j in step)
+            self._cache[length] = result
+        return self._cache[length]
+
+    def take(self, data: bytes) -> bytes:
+        """The bytes of data in permuted order."""
+        # Only used without NumPy (see _FusedRun.arrays)
+        return bytes(map(data.__getitem__, self.gather(len(data))))
+
+
+def _substitution_for(name: str, key, decrypt: bool) -> _Substitution:
+    if name == 'caesar':
+        shift = -key if decrypt else key
+        sub = _Substitution([[(x + shift) % 26 for x in range(26)]])
+    elif name == 'atbash':
+        sub = _Substitution([[25 - x for x in range(26)]])
+    elif name == 'substitution':
+        # Validates the key like the module does
+        substitution.encrypt('', key)
+        sub = _Substitution([[ord(c) - 65 for c in key.upper()]])
+        if decrypt:
+            sub = sub.inverse()
+    else:
+        # One tableau row per key letter
+        rows = tableau_rows(POLYALPHABETIC[name][0], decrypt)
+        sub = _Substitution([rows[k] for k in compile_key(name, key)])
+    return sub
+
+
+def _gather_for(name: str, key, decrypt: bool):
+    """Gather function for one transposition stage in the given direction."""
+    if name == 'rail_fence':
+        if key < 2:
+            return None
+        if np is not None:
+            read = lambda n: _np_rail_fence_read(key, n)
+        base = lambda n: rail_fence_gather(key, n)
+    else:
+        if not key:
+            return None
+        order = tuple(sorted(range(len(key)), key=lambda x: key[x]))
+        if np is not None:
+            read = lambda n: _np_columnar_read(order, n)
+        base = lambda n: columnar_gather(order, n)
+    if np is not None:
+        # Encryption gathers in reading order; decryption scatters back
+        return (lambda n: _np_inverse(read(n))) if decrypt else read
+    if decrypt:
+        return base
+    return lambda n: _inverse(base(n))
+
+
+def _fuse(ops):
+    """
+    Merge neighbouring operations of a run. Substitutions with period 1
+    commute with transpositions, so they are moved across a permutation
+    when that lets them merge with another substitution.
+    """
+    ops = list(ops)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(ops) - 1):
+            a, b = ops[i], ops[i + 1]
+            if isinstance(a, _Substitution) and isinstance(b, _Substitution):
+                ops[i:i + 2] = [a.then(b)]
+            elif isinstance(a, _Permutation) and isinstance(b, _Permutation):
+                ops[i:i + 2] = [a.then(b)]
+            elif (isinstance(a, _Permutation) and isinstance(b, _Substitution)
+                  and b.period == 1 and i > 0 and isinstance(ops[i - 1], _Substitution)):
+                ops[i:i + 2] = [b, a]
+            elif (isinstance(a, _Substitution) and a.period == 1 and isinstance(b, _Permutation)
+                  and i + 2 < len(ops) and isinstance(ops[i + 2], _Substitution)):
+                ops[i:i + 2] = [b, a]
+            else:
+                continue
+            changed = True
+            break
+    return ops
+
+
+class _FusedRun:
+    """A maximal run of fusable stages, merged by _fuse and applied in bulk."""
+
+    def __init__(self, ops, strip: bool, reference):
+        self.ops = _fuse(ops)
+        self.strip = strip
+        # The run's stages as module calls, for non-ASCII text
+        self.reference = reference
+        self.tables = [op.tables() if isinstance(op, _Substitution) else None
+                       for op in self.ops]
+        # With NumPy, a run with a permutation stays one uint8 array throughout
+        self.arrays = np is not None and any(isinstance(op, _Permutation) for op in self.ops)
+        if self.arrays:
+            self.luts = [np.frombuffer(b''.join(tables), dtype=np.uint8).reshape(-1, 256)
+                         if tables is not None else None for tables in self.tables]
+
+    def apply(self, text: str) -> str:
+        if not text.isascii():
+            for step in self.reference:
+                text = step(text)
+            return text
+        if self.strip:
+            # Transpositions strip whitespace and uppercase their input;
+            # substitutions keep case and ignore non-letters, so doing it
+            # first gives the same result
+            text = normalize(text, 'strip_upper')
+        if self.arrays:
+            return self._apply_array(text)
+        # Each substitution numbers letters by their order at its own
+        # stage, so the stages run in turn, each in bulk
+        for op, tables in zip(self.ops, self.tables):
+            if tables is not None:
+                text = periodic_tables(text, tables)
+            else:
+                text = op.take(text.encode('ascii')).decode('ascii')
+        return text
+
+    def _apply_array(self, text: str) -> str:
+        data = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+        for op, lut in zip(self.ops, self.luts):
+            if lut is None:
+                data = data[op.gather(len(data))]
+            elif len(lut) == 1:
+                data = lut[0][data]
+            else:
+                # Row of each byte: the number of letters before it, mod period
+                rows = np.cumsum(_IS_LETTER[data]) - 1
+                rows %= len(lut)
+                data = lut[rows, data]
+        return data.tobytes().decode('ascii')
+
+
+class Pipeline:
+    """
+    A chain of cipher stages.
+
+    Stages are (cipher name, key...) tuples using the module names, e.g.
+    Pipeline([('caesar', 3), ('vigenere', 'KEY'), ('columnar', 'ZEBRAS')]).
+    encrypt applies the stages in order; decrypt undoes them in reverse.
+    """
+
+    def __init__(self, stages):
+        self.stages = [tuple(stage) for stage in stages]
+        for stage in self.stages:
+            if not stage or stage[0] not in MODULES:
+                raise ValueError(f"Unknown pipeline stage: {stage!r}")
+        self._encrypt_plan = self._compile(decrypt=False)
+        self._decrypt_plan = self._compile(decrypt=True)
+
+    def _compile(self, decrypt: bool):
+        stages = list(reversed(self.stages)) if decrypt else self.stages
+        plan, ops, reference = [], [], []
+        has_perm = False
+
+        def flush():
+            nonlocal ops, reference, has_perm
+            if ops:
+                plan.append(_FusedRun(ops, has_perm and not decrypt, reference))
+            ops, reference, has_perm = [], [], False
+
+        for name, *key in stages:
+            func = MODULES[name].decrypt if decrypt else MODULES[name].encrypt
+            step = lambda text, func=func, key=tuple(key): func(text, *key)
+            if name in _SUBSTITUTIONS or name in _TRANSPOSITIONS:
+                reference.append(step)
+            if name in _SUBSTITUTIONS:
+                ops.append(_substitution_for(name, key[0] if key else None, decrypt))
+            elif name in _TRANSPOSITIONS:
+                gather = _gather_for(name, key[0], decrypt)
+                # A no-op transposition (empty key, < 2 rails) returns its input
+                if gather is not None:
+                    ops.append(_Permutation([gather]))
+                    has_perm = True
+            else:
+                flush()
+                plan.append(step)
+        flush()
+        return plan
+
+    @staticmethod
+    def _run(plan, text: str) -> str:
+        for step in plan:
+            text = step.apply(text) if isinstance(step, _FusedRun) else step(text)
+        return text
+
+    def encrypt(self, plaintext: str) -> str:
+        """Apply every stage in order."""
+        return self._run(self._encrypt_plan, plaintext)
+
+    def decrypt(self, ciphertext: str) -> str:
+        """Undo every stage, last stage first."""
+        return self._run(self._decrypt_plan, ciphertext)
+
+    def reference_encrypt(self, plaintext: str) -> str:
+        """Unfused encryption through the module functions, for checking."""
+        for name, *key in self.stages:
+            plaintext = MODULES[name].encrypt(plaintext, *key)
+        return plaintext
+
+    def reference_decrypt(self, ciphertext: str) -> str:
+        """Unfused decryption through the module functions, for checking."""
+        for name, *key in reversed(self.stages):
+            ciphertext = MODULES[name].decrypt(ciphertext, *key)
+        return ciphertext
@@ -3,6 +3,9 @@ Playfair cipher implementation.
 Uses a 5x5 key matrix (I/J sharing a cell) for digraph substitution.
 """
 
+from .normalize import normalize
+
+
 def _build_playfair_matrix(key: str):
     """Build 5x5 Playfair key matrix from given key."""
     key = key.replace(' ', '').upper()
@@ -51,10 +54,8 @@ def encrypt(plaintext: str, key: str) -> str:
         raise ValueError('Playfair key must contain letters')
     
     matrix = _build_playfair_matrix(key)
-    msg = ''.join(ch for ch in plaintext.upper() if ch.isalpha())
-    
-    # replace J -> I
-    msg = msg.replace('J', 'I')
+    # keep letters, uppercase and replace J -> I in one pass
+    msg = normalize(plaintext, 'playfair')
     
     # insert X between double letters in pair
     i = 0
@@ -101,7 +102,7 @@ def decrypt(ciphertext: str, key: str) -> str:
         raise ValueError('Playfair key must contain letters')
     
     matrix = _build_playfair_matrix(key)
-    msg = ''.join(ch for ch in ciphertext.upper() if ch.isalpha())
+    msg = normalize(ciphertext, 'alpha_upper')
     
     out = []
     i = 0
@@ -0,0 +1,360 @@
+"""
+Polyalphabetic engine shared by the Vigenere family of ciphers.
+Letter i of the text is enciphered with row k[i] of a 26x26 tableau;
+the ciphers differ only in the tableau and in where the key letters
+k[i] come from:
+
+    tableau  vigenere (c = p + k), beaufort (c = k - p),
+             variant (c = p - k), porta (13 reciprocal alphabets)
+    key      periodic (a repeated key word, or digits for Gronsfeld),
+             autokey (a primer, then the plaintext itself),
+             running (letters read from a memory-mapped book file)
+
+Every tableau row is compiled once into a bytes.translate table for
+both cases. A periodic key is applied with one translate call per key
+letter over every period-th letter of the text; other key streams index
+a flat (row, byte) table, with NumPy when it is installed. Only ASCII
+letters are enciphered; case and every other character are preserved.
+"""
+
+import mmap
+import os
+import re
+from functools import lru_cache
+from operator import add
+
+from ._compat import numpy as np
+
+TABLEAUX = ('vigenere', 'beaufort', 'variant', 'porta')
+
+# Cipher modules built on the engine: (tableau, keying, name used in errors)
+CIPHERS = {
+    'vigenere': ('vigenere', 'periodic', 'Vigenere'),
+    'autokey': ('vigenere', 'autokey', 'Autokey'),
+    'beaufort': ('beaufort', 'periodic', 'Beaufort'),
+    'variant_beaufort': ('variant', 'periodic', 'Variant Beaufort'),
+    'gronsfeld': ('vigenere', 'periodic', 'Gronsfeld'),
+    'porta': ('porta', 'periodic', 'Porta'),
+    'running_key': ('vigenere', 'running', 'running key'),
+}
+
+_LETTERS = bytes(range(65, 91)) + bytes(range(97, 123))
+_NON_LETTERS = bytes(c for c in range(256) if c not in _LETTERS)
+# Letter byte -> 0-25
+_CODES = bytes.maketrans(_LETTERS, bytes(range(26)) * 2)
+_NON_LETTER_RUNS = re.compile(rb'([^A-Za-z]+)')
+_ROW_OFFSETS = tuple(k * 256 for k in range(26))
+# Book bytes read at a time by RunningKey
+_BOOK_CHUNK = 1 << 16
+
+
+def _cell(tableau: str, k: int, p: int) -> int:
+    if tableau == 'vigenere':
+        return (p + k) % 26
+    if tableau == 'beaufort':
+        return (k - p) % 26
+    if tableau == 'variant':
+        return (p - k) % 26
+    # Porta: key letters pair up (AB, CD, ...) and each pair swaps the
+    # two halves of the alphabet with a different offset
+    i = k // 2
+    return 13 + (p + i) % 13 if p < 13 else (p - 13 - i) % 13
+
+
+@lru_cache(maxsize=None)
+def tableau_rows(tableau: str, decrypt: bool = False) -> tuple[bytes, ...]:
+    """The 26 rows of a tableau (or of its inverse) as 0-25 codes."""
+    if tableau not in TABLEAUX:
+        raise ValueError(f"Unknown tableau: {tableau}")
+    rows = []
+    for k in range(26):
+        row = bytearray(26)
+        for p in range(26):
+            c = _cell(tableau, k, p)
+            row[c if decrypt else p] = p if decrypt else c
+        rows.append(bytes(row))
+    return tuple(rows)
+
+
+@lru_cache(maxsize=None)
+def row_tables(tableau: str, decrypt: bool = False) -> tuple[bytes, ...]:
+    """Per-row bytes.translate tables over both cases."""
+    tables = []
+    for row in tableau_rows(tableau, decrypt):
+        upper = bytes(65 + c for c in row)
+        tables.append(bytes.maketrans(_LETTERS, upper + upper.lower()))
+    return tuple(tables)
+
+
+@lru_cache(maxsize=None)
+def flat_table(tableau: str, decrypt: bool = False) -> bytes:
+    """All row tables back to back: byte b under key k is at k * 256 + b."""
+    return b''.join(row_tables(tableau, decrypt))
+
+
+@lru_cache(maxsize=None)
+def _flat_array(tableau: str, decrypt: bool):
+    return np.frombuffer(flat_table(tableau, decrypt), dtype=np.uint8)
+
+
+def key_codes(key: str, name: str) -> bytes:
+    """0-25 codes of the ASCII letters of a key word; name is used in the error."""
+    codes = key.encode('ascii', 'ignore').translate(None, _NON_LETTERS).translate(_CODES)
+    if not codes:
+        raise ValueError(f"Key must contain letters for {name}")
+    return codes
+
+
+def digit_codes(key, name: str) -> bytes:
+    """Shifts 0-9 of the digits of a key (Gronsfeld)."""
+    codes = bytes(int(c) for c in str(key) if c in '0123456789')
+    if not codes:
+        raise ValueError(f"Key must contain digits for {name}")
+    return codes
+
+
+def compile_key(cipher: str, key):
+    """
+    The engine key of one of CIPHERS: 0-25 codes (periodic and autokey)
+    or a RunningKey opened on the book path (running key).
+    """
+    keying, name = CIPHERS[cipher][1:]
+    if keying == 'running':
+        return RunningKey(key)
+    if cipher == 'gronsfeld':
+        return digit_codes(key, name)
+    return key_codes(key, name)
+
+
+def letters_of(text: str) -> bytes:
+    """The ASCII letters of text, as bytes."""
+    return text.encode('utf-8', 'surrogatepass').translate(None, _NON_LETTERS)
+
+
+def _apply(text: str, transform) -> str:
+    """Run transform over the letters of text and put the results back in place."""
+    data = text.encode('utf-8', 'surrogatepass')
+    letters = data.translate(None, _NON_LETTERS)
+    if not letters:
+        return text
+    out = transform(letters)
+    if len(letters) != len(data):
+        if np is not None:
+            buf = np.frombuffer(data, dtype=np.uint8).copy()
+            buf[_letter_mask()[buf]] = np.frombuffer(out, dtype=np.uint8)
+            out = buf.tobytes()
+        else:
+            parts = _NON_LETTER_RUNS.split(data)
+            pos = 0
+            for i in range(0, len(parts), 2):
+                n = len(parts[i])
+                parts[i] = out[pos:pos + n]
+                pos += n
+            out = b''.join(parts)
+    return out.decode('utf-8', 'surrogatepass')
+
+
+@lru_cache(maxsize=None)
+def _letter_mask():
+    mask = np.zeros(256, dtype=bool)
+    mask[np.frombuffer(_LETTERS, dtype=np.uint8)] = True
+    return mask
+
+
+def _periodic_letters(letters: bytes, codes: bytes, tables, offset: int) -> bytes:
+    out = bytearray(letters)
+    period = len(codes)
+    for j in range(min(period, len(letters))):
+        out[j::period] = letters[j::period].translate(tables[codes[(offset + j) % period]])
+    return bytes(out)
+
+
+def _keyed_letters(letters: bytes, keys: bytes, tableau: str, decrypt: bool) -> bytes:
+    """Encipher letter i with row keys[i]."""
+    if np is not None:
+        index = np.frombuffer(keys, dtype=np.uint8).astype(np.intp) * 256
+        index += np.frombuffer(letters, dtype=np.uint8)
+        return _flat_array(tableau, decrypt)[index].tobytes()
+    flat = flat_table(tableau, decrypt)
+    return bytes(map(flat.__getitem__, map(add, map(_ROW_OFFSETS.__getitem__, keys), letters)))
+
+
+def _autokey_decrypt_letters(letters: bytes, ring: bytes, tableau: str) -> bytes:
+    """
+    Undo an autokey: the key of letter i is ring[i] for the first len(ring)
+    letters, then plaintext letter i - len(ring).
+    """
+    m = len(ring)
+    n = len(letters)
+    if np is not None and tableau == 'vigenere':
+        # Along each chain i, i + m, i + 2m, ... p[t] = c[t] - p[t - 1]
+        # (mod 26), so (-1)^t p[t] is a running sum of (-1)^t c[t]
+        rows = -(-n // m)
+        codes = np.zeros(rows * m, dtype=np.int64)
+        codes[:n] = np.frombuffer(letters.translate(_CODES), dtype=np.uint8)
+        codes = codes.reshape(rows, m)
+        sign = np.where(np.arange(rows) % 2, -1, 1)[:, None]
+        sums = np.cumsum(sign * codes, axis=0) - np.frombuffer(ring, dtype=np.uint8)[None, :]
+        plain = (sign * sums % 26).reshape(-1)[:n].astype(np.uint8)
+        lower = np.frombuffer(letters, dtype=np.uint8) >= 97
+        return (plain + np.where(lower, 97, 65).astype(np.uint8)).tobytes()
+    inverse = flat_table(tableau, True)
+    out = bytearray(n)
+    keys = bytearray(ring)
+    for i, b in enumerate(letters):
+        plain = inverse[_ROW_OFFSETS[keys[i]] + b]
+        out[i] = plain
+        keys.append(_CODES[plain])
+    return bytes(out)
+
+
+def periodic(text: str, codes: bytes, tableau: str = 'vigenere', decrypt: bool = False,
+             offset: int = 0) -> str:
+    """
+    Encipher text with a repeating key.
+
+    Args:
+        text: Text to transform; non-letters are kept and do not use a key letter
+        codes: Key as 0-25 row numbers (see key_codes and digit_codes)
+        tableau: One of TABLEAUX
+        decrypt: Use the inverse tableau
+        offset: Key letter used for the first letter of text
+    """
+    tables = row_tables(tableau, decrypt)
+    return _apply(text, lambda letters: _periodic_letters(letters, codes, tables, offset))
+
+
+def periodic_tables(text: str, tables) -> str:
+    """
+    Encipher letter i of text with tables[i % len(tables)]: translate
+    tables over both cases, such as row_tables() rows or rows composed
+    from several tableaux (see ciphers.pipeline).
+    """
+    if len(tables) == 1 and text.isascii():
+        # Non-letters map to themselves, so no letters need picking out
+        return text.encode('ascii').translate(tables[0]).decode('ascii')
+    rows = range(len(tables))
+    return _apply(text, lambda letters: _periodic_letters(letters, rows, tables, 0))
+
+
+def keyed(text: str, keys: bytes, tableau: str = 'vigenere', decrypt: bool = False) -> str:
+    """Encipher letter i of text with row keys[i]; keys must cover every letter."""
+    def transform(letters):
+        if len(keys) < len(letters):
+            raise ValueError("Key stream is shorter than the text")
+        return _keyed_letters(letters, keys[:len(letters)], tableau, decrypt)
+    return _apply(text, transform)
+
+
+def autokey(text: str, primer: bytes, tableau: str = 'vigenere', decrypt: bool = False) -> str:
+    """Encipher text with the primer, then its own plaintext letters, as the key."""
+    return PolyStream(tableau, 'autokey', primer, decrypt).update(text)
+
+
+class RunningKey:
+    """
+    Key letters read in order from a book file, which is memory-mapped so
+    that only the part in use is paged in. offset is the byte position of
+    the next key letter to read.
+    """
+
+    def __init__(self, path: str, offset: int = 0):
+        self.path = path
+        self.offset = offset
+        self._fh = open(path, 'rb')
+        size = os.fstat(self._fh.fileno()).st_size
+        self._book = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def take(self, n: int) -> bytes:
+        """The next n key letters as 0-25 codes."""
+        parts = []
+        needed = n
+        while needed > 0:
+            if self.offset >= len(self._book):
+                raise ValueError("Running key book is shorter than the text")
+            raw = self._book[self.offset:self.offset + max(needed, _BOOK_CHUNK)]
+            letters = raw.translate(None, _NON_LETTERS)
+            if len(letters) > needed:
+                # Stop right after the last letter used
+                letters = letters[:needed]
+                raw = raw[:_end_of_letter(raw, needed)]
+            self.offset += len(raw)
+            parts.append(letters)
+            needed -= len(letters)
+        return b''.join(parts).translate(_CODES)
+
+    def close(self) -> None:
+        if isinstance(self._book, mmap.mmap):
+            self._book.close()
+        self._fh.close()
+
+    def __enter__(self) -> 'RunningKey':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _end_of_letter(raw: bytes, count: int) -> int:
+    """Index just past the count-th letter of raw."""
+    seen = 0
+    for match in re.finditer(rb'[A-Za-z]+', raw):
+        run = match.end() - match.start()
+        if seen + run >= count:
+            return match.start() + count - seen
+        seen += run
+    return len(raw)
+
+
+class PolyStream:
+    """
+    Chunked encryption or decryption that carries the key position from one
+    update() to the next, so a text split anywhere gives the same output as
+    one call.
+
+    Args:
+        tableau: One of TABLEAUX
+        keying: 'periodic' (key: 0-25 codes), 'autokey' (key: primer codes)
+            or 'running' (key: a RunningKey)
+        key: As above
+        decrypt: Decrypt instead of encrypt
+
+    position counts the letters done (periodic keys); ring holds the next
+    key letters of an autokey, as codes.
+    """
+
+    def __init__(self, tableau: str, keying: str, key, decrypt: bool = False):
+        if keying not in ('periodic', 'autokey', 'running'):
+            raise ValueError(f"Unknown keying: {keying}")
+        self.tableau = tableau
+        self.keying = keying
+        self.key = key
+        self.decrypt = decrypt
+        self.position = 0
+        self.ring = bytes(key) if keying == 'autokey' else b''
+        if keying == 'autokey' and not self.ring:
+            raise ValueError("Autokey primer must contain letters")
+
+    def update(self, text: str) -> str:
+        """Transform the next chunk of text."""
+        return _apply(text, self._letters)
+
+    def _letters(self, letters: bytes) -> bytes:
+        if self.keying == 'periodic':
+            out = _periodic_letters(letters, self.key, row_tables(self.tableau, self.decrypt),
+                                    self.position)
+            self.position = (self.position + len(letters)) % len(self.key)
+            return out
+        if self.keying == 'running':
+            return _keyed_letters(letters, self.key.take(len(letters)), self.tableau,
+                                  self.decrypt)
+        if self.decrypt:
+            out = _autokey_decrypt_letters(letters, self.ring, self.tableau)
+            plain = out.translate(_CODES)
+        else:
+            plain = letters.translate(_CODES)
+            out = _keyed_letters(letters, (self.ring + plain)[:len(letters)], self.tableau,
+                                 False)
+        # The next key letters: the rest of the ring, then the newest plaintext
+        self.ring = (self.ring + plain)[-len(self.ring):]
+        return out
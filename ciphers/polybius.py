@@ -0,0 +1,29 @@
+"""
+Polybius square cipher implementation.
+Each letter is replaced by its row and column (digits 1-5) in a keyed
+5x5 square; I and J share a cell. Non-letters are dropped.
+"""
+
+from .fractionation import compile_grid, polybius
+
+
+def encrypt(plaintext: str, key: str = '') -> str:
+    """
+    Encrypt text using the Polybius square.
+
+    Args:
+        plaintext: Text to encrypt
+        key: Optional keyword that arranges the square
+    """
+    return polybius(plaintext, compile_grid('5x5', key))
+
+
+def decrypt(ciphertext: str, key: str = '') -> str:
+    """
+    Decrypt Polybius digit pairs; whitespace between them is ignored.
+
+    Args:
+        ciphertext: Digits 1-5 to decrypt
+        key: Keyword used for encryption
+    """
+    return polybius(ciphertext, compile_grid('5x5', key), decrypt=True)
@@ -0,0 +1,25 @@
+"""
+Porta cipher implementation.
+Key letters pair up (AB, CD, ..., YZ) to select one of 13 reciprocal
+alphabets, each swapping the first half of the alphabet with the
+second, so the cipher is its own inverse.
+Preserves case and non-letter characters.
+"""
+
+from .polyalphabetic import key_codes, periodic
+
+
+def encrypt(plaintext: str, key: str) -> str:
+    """
+    Encrypt text using Porta cipher with a repeating key word.
+    Non-letters in the key are ignored.
+
+    >>> encrypt('DEFENDTHEEASTWALLOFTHECASTLE', 'FORTIFICATION')
+    'SYNNJSCVRNRLAHUTUKUCVRYRLANY'
+    """
+    return periodic(plaintext, key_codes(key, 'Porta'), 'porta')
+
+
+def decrypt(ciphertext: str, key: str) -> str:
+    """Decrypt Porta ciphertext (the same operation as encrypt)."""
+    return encrypt(ciphertext, key)
@@ -4,6 +4,9 @@ A transposition cipher that writes text in a zigzag pattern across 'rails'
 and reads off the resulting cipher text by rows.
 """
 
+from .normalize import normalize
+
+
 def _create_fence(height: int, length: int) -> list[list[None | str]]:
     """Create an empty rail fence with given height and length."""
     return [[None] * length for _ in range(height)]
@@ -35,7 +38,7 @@ def encrypt(plaintext: str, rails: int) -> str:
         return plaintext
         
     # Remove any spaces and convert to uppercase for consistent encryption
-    plaintext = ''.join(plaintext.split()).upper()
+    plaintext = normalize(plaintext, 'strip_upper')
     
     # Create the fence
     fence = _create_fence(rails, len(plaintext))
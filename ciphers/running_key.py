@@ -0,0 +1,31 @@
+"""
+Running key cipher implementation.
+Vigenere with a key as long as the message: the letters of a book file,
+read from a byte offset onwards. The book is memory-mapped, so only the
+pages holding the key are read.
+Preserves case and non-letter characters.
+"""
+
+from .polyalphabetic import RunningKey, keyed, letters_of
+
+
+def _keys(text: str, book: str, offset: int) -> bytes:
+    with RunningKey(book, offset) as source:
+        return source.take(len(letters_of(text)))
+
+
+def encrypt(plaintext: str, book: str, offset: int = 0) -> str:
+    """
+    Encrypt text using the letters of a book file as the key.
+
+    Args:
+        plaintext: Text to encrypt
+        book: Path of the key text (non-letters in it are skipped)
+        offset: Byte position in the book where the key starts
+    """
+    return keyed(plaintext, _keys(plaintext, book, offset))
+
+
+def decrypt(ciphertext: str, book: str, offset: int = 0) -> str:
+    """Decrypt text with the book and offset used to encrypt it."""
+    return keyed(ciphertext, _keys(ciphertext, book, offset), decrypt=True)
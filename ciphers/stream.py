@@ -0,0 +1,410 @@
+"""
+Resumable streaming encryption for the polyalphabetic ciphers (Vigenere,
+Autokey, Beaufort, Variant Beaufort, Gronsfeld, Porta, running key) and
+Hill (and the stateless Caesar and Atbash, so file jobs can treat them
+alike). A CipherStream takes text in chunks and keeps the little state
+these ciphers carry between characters: the key index (for a running
+key, the byte offset in the book), the Autokey ring of upcoming key
+letters, a pending Hill half-digraph (and, when decrypting, a held-back
+trailing X), or a Playfair letter still waiting for its partner. The
+state is a JSON-serializable dict, so a file job can checkpoint it next
+to the number of bytes consumed and resume after a crash. Concatenated
+output always equals one call of the module's encrypt or decrypt on the
+whole text.
+
+Transpositions (Rail Fence, Columnar, ADFGVX) cannot emit anything
+before the whole text is known. transpose_file reads a memory-mapped
+file into one flat buffer (a byte per character for ASCII text, four
+otherwise) and writes each rail or column as a strided slice of it, so
+a job holds about two bytes per input byte instead of the per-character
+lists of the cipher modules.
+"""
+
+import codecs
+import hashlib
+import json
+import mmap
+import os
+from array import array
+
+from . import atbash, caesar, hill, playfair
+from .fractionation import column_order, compile_grid, deinterleave, interleave
+from .normalize import normalize, normalize_bytes
+from .polyalphabetic import CIPHERS, PolyStream, compile_key
+
+STREAM_CIPHERS = ('hill', 'caesar', 'atbash', 'playfair') + tuple(CIPHERS)
+TRANSPOSE_CIPHERS = ('rail_fence', 'columnar', 'adfgvx')
+
+
+def _key_fingerprint(cipher: str, key: str, decrypt: bool) -> str:
+    data = json.dumps([cipher, key, decrypt])
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class CipherStream:
+    """
+    Incremental encrypt or decrypt of one message.
+
+    Feed text with update() and call finalize() once at the end. state()
+    returns the position as a dict (the key itself is only stored as a
+    hash); pass it back as state= to continue where it stopped.
+    """
+
+    def __init__(self, cipher: str, key, decrypt: bool = False, state: dict | None = None):
+        if cipher not in STREAM_CIPHERS:
+            raise ValueError(f"Streaming supports {', '.join(STREAM_CIPHERS)}, not {cipher}")
+        self.cipher = cipher
+        self.key = key
+        self.decrypt = decrypt
+        self.key_index = 0
+        self.ring = []
+        self.pending = ''
+        self.held = ''
+        self.finished = False
+        self._poly = None
+        if cipher in CIPHERS and (key or cipher != 'autokey'):
+            # A running key's key is the book path; key_index is the offset in it
+            tableau, keying, _ = CIPHERS[cipher]
+            self._poly = PolyStream(tableau, keying, compile_key(cipher, key), decrypt)
+            self.ring = [chr(c + 65) for c in self._poly.ring]
+        elif cipher == 'hill':
+            hill._make_key_matrix_from_string(key)
+        elif cipher == 'playfair':
+            playfair.encrypt('', key)
+        elif cipher == 'caesar' and not isinstance(key, int):
+            raise ValueError("Caesar key must be an integer")
+        if state is not None:
+            self._restore(state)
+
+    def state(self) -> dict:
+        """The stream position as a JSON-serializable dict."""
+        return {'cipher': self.cipher, 'decrypt': self.decrypt,
+                'key': _key_fingerprint(self.cipher, self.key, self.decrypt),
+                'key_index': self.key_index, 'ring': ''.join(self.ring),
+                'pending': self.pending, 'held': self.held, 'finished': self.finished}
+
+    def _restore(self, state: dict) -> None:
+        if (state['cipher'], state['decrypt']) != (self.cipher, self.decrypt) or \
+                state['key'] != _key_fingerprint(self.cipher, self.key, self.decrypt):
+            raise ValueError("Stream state belongs to a different cipher or key")
+        self.key_index = state['key_index']
+        self.ring = list(state['ring'])
+        self.pending = state['pending']
+        self.held = state['held']
+        self.finished = state['finished']
+        if self._poly is not None:
+            if self._poly.keying == 'running':
+                self._poly.key.offset = self.key_index
+            else:
+                self._poly.position = self.key_index
+            self._poly.ring = bytes(ord(c) - 65 for c in self.ring)
+
+    def update(self, text: str) -> str:
+        """Process the next chunk and return the output that is final so far."""
+        if self.finished:
+            raise ValueError("Stream already finalized")
+        if self.cipher in CIPHERS:
+            return self._polyalphabetic(text)
+        if self.cipher == 'caesar':
+            return (caesar.decrypt if self.decrypt else caesar.encrypt)(text, self.key)
+        if self.cipher == 'atbash':
+            return atbash.encrypt(text)
+        if self.cipher == 'playfair':
+            return self._playfair(text)
+        return self._hill(text)
+
+    def finalize(self) -> str:
+        """Flush the end of the message (Hill or Playfair padding, or a pending X)."""
+        if self.finished:
+            return ''
+        self.finished = True
+        if self._poly is not None and self._poly.keying == 'running':
+            self._poly.key.close()
+        if self.cipher == 'playfair':
+            # The module pads a last single letter with X
+            if not self.pending:
+                return ''
+            return (playfair.decrypt if self.decrypt else playfair.encrypt)(self.pending, self.key)
+        if self.cipher != 'hill':
+            return ''
+        if self.decrypt:
+            if self.pending:
+                raise ValueError("Hill ciphertext has an odd number of characters")
+            # The module drops one trailing X from the whole result
+            return ''
+        if self.pending:
+            return hill.encrypt(self.pending, self.key)
+        return ''
+
+    def _polyalphabetic(self, text: str) -> str:
+        if self._poly is None:
+            # Autokey with an empty key leaves the text unchanged
+            return text
+        if self.cipher == 'autokey':
+            text = normalize(text, 'strip_upper')
+        out = self._poly.update(text)
+        poly = self._poly
+        self.key_index = poly.key.offset if poly.keying == 'running' else poly.position
+        self.ring = [chr(c + 65) for c in poly.ring]
+        return out
+
+    def _playfair(self, text: str) -> str:
+        text = self.pending + normalize(text, 'alpha_upper' if self.decrypt else 'playfair')
+        if self.decrypt:
+            cut = len(text) - len(text) % 2
+        else:
+            # Pair letters as the module does (a doubled letter takes an X
+            # and moves on by one) and keep back a last undecided letter
+            cut = 0
+            while cut < len(text) - 1:
+                cut += 1 if text[cut] == text[cut + 1] else 2
+        self.pending = text[cut:]
+        if not cut:
+            return ''
+        return (playfair.decrypt if self.decrypt else playfair.encrypt)(text[:cut], self.key)
+
+    def _hill(self, text: str) -> str:
+        text = self.pending + ''.join(ch for ch in text if ch != ' ')
+        cut = len(text) - len(text) % 2
+        self.pending = text[cut:]
+        if not cut:
+            return ''
+        if not self.decrypt:
+            return hill.encrypt(text[:cut], self.key)
+        out = hill.decrypt(text[:cut], self.key)
+        # hill.decrypt strips a trailing X; keep it back until more output follows
+        out = self.held + out + ('X' if len(out) < cut else '')
+        self.held = 'X' if out.endswith('X') else ''
+        return out[:len(out) - len(self.held)]
+
+
+def process_file(src: str, dst: str, cipher: str, key, decrypt: bool = False,
+                 checkpoint: str | None = None, checkpoint_bytes: int = 64 << 20,
+                 chunk_bytes: int = 1 << 20, progress=None) -> int:
+    """
+    Encrypt (or decrypt) a UTF-8 file into dst in chunks.
+
+    The source is memory-mapped and only chunk_bytes of it are decoded at
+    a time. With checkpoint set, the stream state, the input bytes
+    consumed and the output bytes written are saved there every
+    checkpoint_bytes of input (after flushing dst to disk). If the
+    checkpoint exists when the call starts, the job resumes from it; it is
+    removed once the file is done. progress, if given, is called with
+    (bytes consumed, file size) after every chunk. Returns the number of
+    input bytes processed.
+    """
+    stream = CipherStream(cipher, key, decrypt)
+    consumed = written = 0
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint, 'r', encoding='utf-8') as fh:
+            saved = json.load(fh)
+        if saved['src'] != os.path.abspath(src):
+            raise ValueError("Checkpoint belongs to a different input file")
+        stream = CipherStream(cipher, key, decrypt, state=saved['state'])
+        consumed, written = saved['bytes_consumed'], saved['bytes_written']
+
+    decoder = codecs.getincrementaldecoder('utf-8')('surrogateescape')
+    mode = 'r+b' if written else 'wb'
+    size = os.path.getsize(src)
+    with open(src, 'rb') as fin, open(dst, mode) as fout:
+        # Empty files cannot be mapped
+        source = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        try:
+            fout.truncate(written)
+            fout.seek(written)
+            since_checkpoint = 0
+            while True:
+                raw = source[consumed:consumed + chunk_bytes]
+                text = decoder.decode(raw, final=not raw)
+                out = stream.update(text) if text else ''
+                if not raw:
+                    out += stream.finalize()
+                data = out.encode('utf-8', 'surrogateescape')
+                fout.write(data)
+                written += len(data)
+                # Bytes of a split UTF-8 sequence stay in the decoder until the next chunk
+                consumed += len(raw)
+                since_checkpoint += len(raw)
+                if progress:
+                    progress(consumed, size)
+                if not raw:
+                    break
+                if checkpoint and since_checkpoint >= checkpoint_bytes:
+                    fout.flush()
+                    os.fsync(fout.fileno())
+                    _save_checkpoint(checkpoint, src, stream,
+                                     consumed - len(decoder.getstate()[0]), written)
+                    since_checkpoint = 0
+        finally:
+            if size:
+                source.close()
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return consumed
+
+
+def _save_checkpoint(path: str, src: str, stream: CipherStream, consumed: int,
+                     written: int) -> None:
+    state = {'src': os.path.abspath(src), 'state': stream.state(),
+             'bytes_consumed': consumed, 'bytes_written': written}
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(state, fh)
+    os.replace(tmp, path)
+
+
+def _read_chars(source, size: int, chunk_bytes: int, profile: str | None, progress):
+    """
+    The characters of a mapped UTF-8 file, normalized with profile: a
+    bytearray when the file is ASCII, otherwise an array of code points.
+    """
+    ascii_only = all(source[i:i + chunk_bytes].isascii() for i in range(0, size, chunk_bytes))
+    chars = bytearray() if ascii_only else array('I')
+    decoder = codecs.getincrementaldecoder('utf-8')('surrogateescape')
+    for start in range(0, size, chunk_bytes):
+        raw = source[start:start + chunk_bytes]
+        if ascii_only:
+            chars += normalize_bytes(raw, profile) if profile else raw
+        else:
+            text = decoder.decode(raw, final=start + chunk_bytes >= size)
+            if profile:
+                text = normalize(text, profile)
+            chars.frombytes(text.encode('utf-32-le', 'surrogatepass'))
+        if progress:
+            progress(min(start + chunk_bytes, size), size)
+    return chars
+
+
+def _write_chars(fout, chars, chunk: int = 1 << 20) -> None:
+    if isinstance(chars, bytearray):
+        fout.write(chars)
+        return
+    for i in range(0, len(chars), chunk):
+        text = chars[i:i + chunk].tobytes().decode('utf-32-le', 'surrogatepass')
+        fout.write(text.encode('utf-8', 'surrogateescape'))
+
+
+def _blank(chars, n: int):
+    """A buffer of n characters of the same kind as chars (which is not empty)."""
+    return chars[:1] * n
+
+
+def _rail_fence_encrypt(chars, rails: int, write) -> None:
+    # Rail r holds positions r, p - r, p + r, 2p - r, ... for the period p
+    period, n = 2 * (rails - 1), len(chars)
+    for r in range(min(rails, n)):
+        if r == 0 or r == rails - 1:
+            write(chars[r::period])
+            continue
+        down, up = chars[r::period], chars[period - r::period]
+        part = _blank(chars, len(down) + len(up))
+        part[0::2], part[1::2] = down, up
+        write(part)
+
+
+def _rail_fence_decrypt(chars, rails: int):
+    period, n = 2 * (rails - 1), len(chars)
+    out = _blank(chars, n)
+    pos = 0
+    for r in range(min(rails, n)):
+        down = len(range(r, n, period))
+        if r == 0 or r == rails - 1:
+            out[r::period] = chars[pos:pos + down]
+            pos += down
+            continue
+        up = len(range(period - r, n, period))
+        part = chars[pos:pos + down + up]
+        out[r::period], out[period - r::period] = part[0::2], part[1::2]
+        pos += down + up
+    return out
+
+
+def _columnar_decrypt(chars, key: str):
+    # Same as fractionation.columnar_bytes, for either kind of buffer
+    cols, n = len(key), len(chars)
+    out = _blank(chars, n)
+    pos = 0
+    for c in column_order(key):
+        length = len(range(c, n, cols))
+        out[c::cols] = chars[pos:pos + length]
+        pos += length
+    return out
+
+
+def _adfgvx_file(source, size: int, grid, columnar_key: str, decrypt: bool, fout,
+                 chunk_bytes: int, progress) -> None:
+    """ADFGVX over a mapped file, as fractionation.fractionated_columnar."""
+    marks = b'ADFGVX'
+    coords = bytes(range(len(marks)))
+    if not decrypt:
+        seq = bytearray()
+        decoder = codecs.getincrementaldecoder('utf-8')('surrogateescape')
+        for start in range(0, size, chunk_bytes):
+            text = decoder.decode(source[start:start + chunk_bytes],
+                                  final=start + chunk_bytes >= size)
+            seq += interleave(grid.planes(grid.cells(text)))
+            if progress:
+                progress(min(start + chunk_bytes, size), size)
+        seq = seq.translate(bytes.maketrans(coords, marks))
+        for c in column_order(columnar_key):
+            fout.write(seq[c::len(columnar_key)])
+        return
+    for start in range(0, size, chunk_bytes):
+        if source[start:start + chunk_bytes].translate(None, marks):
+            raise ValueError("ADFGVX ciphertext may only contain the letters ADFGVX")
+    seq = _columnar_decrypt(bytearray(source), columnar_key) if size else bytearray()
+    seq = seq.translate(bytes.maketrans(marks, coords))
+    if progress:
+        progress(size, size)
+    # Even chunks keep coordinate pairs together; a dangling last one is ignored
+    step = max(2, chunk_bytes - chunk_bytes % 2)
+    for start in range(0, len(seq) - len(seq) % 2, step):
+        cells = grid.recombine(deinterleave(bytes(seq[start:start + step]), grid.dims))
+        fout.write(grid.text(cells).encode('ascii'))
+
+
+def transpose_file(src: str, dst: str, cipher: str, key, decrypt: bool = False,
+                   chunk_bytes: int = 1 << 20, progress=None) -> None:
+    """
+    Encrypt (or decrypt) a UTF-8 file into dst with a transposition. The
+    output equals the module's encrypt or decrypt on the whole text.
+
+    Args:
+        src: Input file
+        dst: Output file
+        cipher: One of TRANSPOSE_CIPHERS
+        key: Rails (int), columnar keyword, or (polybius key, columnar key)
+        decrypt: Decrypt instead of encrypt
+        chunk_bytes: Input bytes read and normalized at a time
+        progress: Optional callback receiving (bytes read, file size)
+    """
+    if cipher not in TRANSPOSE_CIPHERS:
+        raise ValueError(f"Unknown transposition: {cipher}")
+    columnar_key = key[1] if cipher == 'adfgvx' else key
+    # The modules return the text unchanged for a key that does nothing
+    identity = key < 2 if cipher == 'rail_fence' else not columnar_key
+    profile = None if identity or decrypt or cipher == 'adfgvx' else 'strip_upper'
+    size = os.path.getsize(src)
+    with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+        # Empty files cannot be mapped
+        source = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        try:
+            if cipher == 'adfgvx' and not identity:
+                _adfgvx_file(source, size, compile_grid('6x6', key[0]), columnar_key, decrypt,
+                             fout, chunk_bytes, progress)
+                return
+            chars = _read_chars(source, size, chunk_bytes, profile, progress)
+        finally:
+            if size:
+                source.close()
+        if identity or not chars:
+            _write_chars(fout, chars)
+        elif cipher == 'rail_fence' and decrypt:
+            _write_chars(fout, _rail_fence_decrypt(chars, key))
+        elif cipher == 'rail_fence':
+            _rail_fence_encrypt(chars, key, lambda part: _write_chars(fout, part))
+        elif decrypt:
+            _write_chars(fout, _columnar_decrypt(chars, columnar_key))
+        else:
+            for c in column_order(columnar_key):
+                _write_chars(fout, chars[c::len(columnar_key)])
@@ -0,0 +1,53 @@
+"""
+Keyed monoalphabetic substitution cipher.
+The key is a 26-letter cipher alphabet: plaintext A becomes key[0], B
+becomes key[1] and so on. Each key is compiled once into a str.translate
+table, so encryption is a single pass over the text. Caesar and Atbash
+are the particular keys caesar_key(shift) and ATBASH_KEY.
+Preserves case and non-letter characters.
+"""
+
+import string
+from functools import lru_cache
+
+ATBASH_KEY = string.ascii_uppercase[::-1]
+
+
+def caesar_key(shift: int) -> str:
+    """Cipher alphabet of a Caesar shift."""
+    shift %= 26
+    return string.ascii_uppercase[shift:] + string.ascii_uppercase[:shift]
+
+
+def keyword_key(keyword: str) -> str:
+    """Cipher alphabet from a keyword: its distinct letters, then the rest of A-Z."""
+    seen = dict.fromkeys(c for c in keyword.upper() if c in string.ascii_uppercase)
+    return ''.join(seen) + ''.join(c for c in string.ascii_uppercase if c not in seen)
+
+
+@lru_cache(maxsize=256)
+def _tables(key: str) -> tuple[dict, dict]:
+    """(encrypt, decrypt) translate tables of a cipher alphabet."""
+    alphabet = key.upper()
+    if len(alphabet) != 26 or set(alphabet) != set(string.ascii_uppercase):
+        raise ValueError("Substitution key must be a permutation of the 26 letters A-Z")
+    upper, lower = string.ascii_uppercase, string.ascii_lowercase
+    encrypt = str.maketrans(upper + lower, alphabet + alphabet.lower())
+    decrypt = str.maketrans(alphabet + alphabet.lower(), upper + lower)
+    return encrypt, decrypt
+
+
+def encrypt(plaintext: str, key: str) -> str:
+    """
+    Encrypt text with a 26-letter cipher alphabet.
+    Preserves case and non-letter characters.
+    """
+    return plaintext.translate(_tables(key)[0])
+
+
+def decrypt(ciphertext: str, key: str) -> str:
+    """
+    Decrypt text with a 26-letter cipher alphabet.
+    Preserves case and non-letter characters.
+    """
+    return ciphertext.translate(_tables(key)[1])
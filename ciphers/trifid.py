@@ -0,0 +1,32 @@
+"""
+Trifid cipher implementation.
+Bifid in three dimensions: each character is fractionated into its
+layer, row and column in a keyed 3x3x3 cube holding A-Z and '+'.
+Other characters are dropped.
+"""
+
+from .fractionation import compile_grid, delastelle
+
+
+def encrypt(plaintext: str, key: str = '', period: int = 5) -> str:
+    """
+    Encrypt text using Trifid cipher.
+
+    Args:
+        plaintext: Text to encrypt
+        key: Optional keyword that arranges the cube
+        period: Letters per block (0 for the whole message)
+    """
+    return delastelle(plaintext, compile_grid('3x3x3', key), period)
+
+
+def decrypt(ciphertext: str, key: str = '', period: int = 5) -> str:
+    """
+    Decrypt text using Trifid cipher.
+
+    Args:
+        ciphertext: Text to decrypt
+        key: Keyword used for encryption
+        period: Period used for encryption
+    """
+    return delastelle(ciphertext, compile_grid('3x3x3', key), period, decrypt=True)
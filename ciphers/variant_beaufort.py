@@ -0,0 +1,21 @@
+"""
+Variant Beaufort cipher implementation.
+Subtracts the repeating key from the plaintext (c = p - k): encryption
+is Vigenere decryption and vice versa.
+Preserves case and non-letter characters.
+"""
+
+from .polyalphabetic import key_codes, periodic
+
+
+def encrypt(plaintext: str, key: str) -> str:
+    """
+    Encrypt text using Variant Beaufort cipher with a repeating key word.
+    Non-letters in the key are ignored.
+    """
+    return periodic(plaintext, key_codes(key, 'Variant Beaufort'), 'variant')
+
+
+def decrypt(ciphertext: str, key: str) -> str:
+    """Decrypt Variant Beaufort ciphertext with the key used to encrypt it."""
+    return periodic(ciphertext, key_codes(key, 'Variant Beaufort'), 'variant', decrypt=True)
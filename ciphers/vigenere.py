@@ -1,31 +1,19 @@
 """
 Vigenere cipher implementation.
-Polyalphabetic substitution cipher using a repeating key word.
+Polyalphabetic substitution cipher using a repeating key word
+(a periodic key on the Vigenere tableau of ciphers.polyalphabetic).
 """
 
+from .polyalphabetic import key_codes, periodic
+
+
 def encrypt(plaintext: str, key: str) -> str:
     """
     Encrypt text using Vigenere cipher with given key.
     Key must contain letters; non-letters are stripped.
     Preserves case and non-letter characters in plaintext.
     """
-    key = ''.join([k for k in key if k.isalpha()])
-    if not key:
-        raise ValueError("Key must contain letters for Vigenere")
-    result = []
-    ki = 0
-    for ch in plaintext:
-        if ch.isalpha():
-            k = key[ki % len(key)]
-            shift = ord(k.lower()) - 97
-            if ch.isupper():
-                result.append(chr((ord(ch) - 65 + shift) % 26 + 65))
-            else:
-                result.append(chr((ord(ch) - 97 + shift) % 26 + 97))
-            ki += 1
-        else:
-            result.append(ch)
-    return ''.join(result)
+    return periodic(plaintext, key_codes(key, 'Vigenere'))
 
 
 def decrypt(ciphertext: str, key: str) -> str:
@@ -34,20 +22,4 @@ def decrypt(ciphertext: str, key: str) -> str:
     Key must contain letters; non-letters are stripped.
     Preserves case and non-letter characters in ciphertext.
     """
-    key = ''.join([k for k in key if k.isalpha()])
-    if not key:
-        raise ValueError("Key must contain letters for Vigenere")
-    result = []
-    ki = 0
-    for ch in ciphertext:
-        if ch.isalpha():
-            k = key[ki % len(key)]
-            shift = ord(k.lower()) - 97
-            if ch.isupper():
-                result.append(chr((ord(ch) - 65 - shift) % 26 + 65))
-            else:
-                result.append(chr((ord(ch) - 97 - shift) % 26 + 97))
-            ki += 1
-        else:
-            result.append(ch)
-    return ''.join(result)
\ No newline at end of file
+    return periodic(ciphertext, key_codes(key, 'Vigenere'), decrypt=True)
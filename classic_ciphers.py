@@ -6,8 +6,10 @@ Supports:
 - Caesar cipher (shift key integer)
 - Vigenere cipher (alphabetic key)
 
-This is intentionally self-contained so it doesn't rely on the other repository files
-which are present without .py extensions and expect interactive console input.
+Caesar, Hill and Playfair are implemented here rather than taken from the
+other repository files, which are present without .py extensions and expect
+interactive console input. Vigenere comes from the ciphers package, which
+shares its polyalphabetic engine.
 
 Run: python gui.py
 """
@@ -16,6 +18,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter.scrolledtext import ScrolledText
 
+from ciphers import vigenere
+
 
 def caesar_encrypt(plaintext: str, key: int) -> str:
     result = []
@@ -34,43 +38,11 @@ def caesar_decrypt(ciphertext: str, key: int) -> str:
 
 
 def vigenere_encrypt(plaintext: str, key: str) -> str:
-    key = ''.join([k for k in key if k.isalpha()])
-    if not key:
-        raise ValueError("Key must contain letters for Vigenere")
-    result = []
-    ki = 0
-    for ch in plaintext:
-        if ch.isalpha():
-            k = key[ki % len(key)]
-            shift = ord(k.lower()) - 97
-            if ch.isupper():
-                result.append(chr((ord(ch) - 65 + shift) % 26 + 65))
-            else:
-                result.append(chr((ord(ch) - 97 + shift) % 26 + 97))
-            ki += 1
-        else:
-            result.append(ch)
-    return ''.join(result)
+    return vigenere.encrypt(plaintext, key)
 
 
 def vigenere_decrypt(ciphertext: str, key: str) -> str:
-    key = ''.join([k for k in key if k.isalpha()])
-    if not key:
-        raise ValueError("Key must contain letters for Vigenere")
-    result = []
-    ki = 0
-    for ch in ciphertext:
-        if ch.isalpha():
-            k = key[ki % len(key)]
-            shift = ord(k.lower()) - 97
-            if ch.isupper():
-                result.append(chr((ord(ch) - 65 - shift) % 26 + 65))
-            else:
-                result.append(chr((ord(ch) - 97 - shift) % 26 + 97))
-            ki += 1
-        else:
-            result.append(ch)
-    return ''.join(result)
+    return vigenere.decrypt(ciphertext, key)
 
 
 # ---- Hill cipher (2x2) ----
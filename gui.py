@@ -13,17 +13,336 @@ Supports:
 - Columnar cipher (ordering key)
 - Autokey cipher (initial key, rest derived from plaintext)
 
+Open File / Save Output process a file on disk in chunks, without loading it
+into the text boxes; the panes then show a paged view of the files. While a
+file is processed the Save button becomes Cancel; a cancelled job, or one
+still running when the window closes, leaves no partial output behind.
+
+"Crack" searches for the key of the input ciphertext (Rail Fence, Columnar,
+ADFGVX, Autokey) in the background, showing the best decryption so far;
+press it again to stop.
+
+With "Live preview" ticked the output follows the input as you type: Caesar,
+Atbash and Vigenere patch just the edited span, the other ciphers rerun in a
+background thread once typing pauses.
+
 Run: python gui.py
 """
+import mmap
+import os
 import string
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 
 from ciphers import (
     caesar, vigenere, hill, playfair,
-    atbash, rail_fence, adfgvx, columnar, autokey
+    atbash, rail_fence, adfgvx, columnar, autokey, stream
 )
+from ciphers.analysis import solvers
+
+
+# Ciphers where output character i depends only on input character i (and,
+# for Vigenere, on the number of letters before it), so live preview can
+# patch an edit in place instead of re-running the cipher on the whole text
+LOCAL_CIPHERS = ("Caesar", "Atbash", "Vigenere")
+# Pause in typing before the other ciphers (or a shifted Vigenere tail) rerun
+PREVIEW_DELAY_MS = 250
+_POLL_MS = 30
+_NON_LETTERS = bytes(c for c in range(128) if not chr(c).isalpha())
+# Ciphers that files are streamed through in chunks (ciphers.stream names)
+STREAM_CIPHERS = {"Caesar": "caesar", "Atbash": "atbash", "Vigenere": "vigenere",
+                  "Autokey": "autokey", "Hill": "hill", "Playfair": "playfair"}
+# Transpositions, which read the whole (memory-mapped) file before writing
+TRANSPOSE_CIPHERS = {"Rail Fence": "rail_fence", "Columnar": "columnar", "ADFGVX": "adfgvx"}
+# Bytes of a file decoded into a paged view at a time
+PAGE_BYTES = 64 * 1024
+# Ciphers the Crack button can attack (ciphers.analysis.solvers names)
+CRACK_SOLVERS = {"Rail Fence": "rail_fence", "Columnar": "columnar", "ADFGVX": "adfgvx",
+                 "Autokey": "autokey"}
+# Time limit of a Crack search
+CRACK_SECONDS = 60
+
+
+def run_cipher(cipher: str, mode: str, key: str, text: str) -> str:
+    """Run the selected cipher on text, raising ValueError for a bad key."""
+    if cipher == "Caesar":
+        if not key:
+            raise ValueError("Enter integer key for Caesar cipher")
+        try:
+            k = int(key)
+        except ValueError:
+            raise ValueError("Caesar key must be an integer")
+        if mode == "Encrypt":
+            return caesar.encrypt(text, k)
+        else:
+            return caesar.decrypt(text, k)
+    elif cipher == "Vigenere":
+        if not key or not any(ch.isalpha() for ch in key):
+            raise ValueError("Vigenere key must contain letters")
+        if mode == "Encrypt":
+            return vigenere.encrypt(text, key)
+        else:
+            return vigenere.decrypt(text, key)
+    elif cipher == "Hill":
+        # Hill expects a 4-letter key
+        if not key or not key.isalpha() or len(key) != 4:
+            raise ValueError("Hill key must be 4 letters (2x2 matrix)")
+        if mode == "Encrypt":
+            return hill.encrypt(text, key)
+        else:
+            return hill.decrypt(text, key)
+    elif cipher == "Playfair":
+        if not key or not any(ch.isalpha() for ch in key):
+            raise ValueError("Playfair key must contain letters")
+        if mode == "Encrypt":
+            return playfair.encrypt(text, key)
+        else:
+            return playfair.decrypt(text, key)
+    elif cipher == "Atbash":
+        # Atbash doesn't need a key
+        if mode == "Encrypt":
+            return atbash.encrypt(text)
+        else:
+            return atbash.decrypt(text)
+    elif cipher == "Rail Fence":
+        if not key:
+            raise ValueError("Enter number of rails")
+        try:
+            rails = int(key)
+            if rails < 2:
+                raise ValueError
+        except ValueError:
+            raise ValueError("Rail Fence key must be an integer greater than 1")
+        if mode == "Encrypt":
+            return rail_fence.encrypt(text, rails)
+        else:
+            return rail_fence.decrypt(text, rails)
+    elif cipher == "ADFGVX":
+        if not key or ',' not in key:
+            raise ValueError("ADFGVX requires two keys separated by comma")
+        polybius_key, columnar_key = map(str.strip, key.split(',', 1))
+        if not columnar_key:
+            raise ValueError("Columnar key is required for ADFGVX")
+        if mode == "Encrypt":
+            return adfgvx.encrypt(text, polybius_key, columnar_key)
+        else:
+            return adfgvx.decrypt(text, polybius_key, columnar_key)
+    elif cipher == "Columnar":
+        if not key:
+            raise ValueError("Enter a key for columnar transposition")
+        if mode == "Encrypt":
+            return columnar.encrypt(text, key)
+        else:
+            return columnar.decrypt(text, key)
+    elif cipher == "Autokey":
+        if not key:
+            raise ValueError("Enter an initial key for Autokey cipher")
+        if mode == "Encrypt":
+            return autokey.encrypt(text, key)
+        else:
+            return autokey.decrypt(text, key)
+    else:
+        raise ValueError("Unsupported cipher")
+
+
+def count_letters(text: str) -> int:
+    """Number of A-Z letters (the Vigenere key index after text)."""
+    return len(text.encode('ascii', 'ignore').translate(None, _NON_LETTERS))
+
+
+def changed_span(old: str, new: str) -> tuple[int, int, int]:
+    """
+    Smallest single edit turning old into new, as (start, old_end, new_end):
+    old[start:old_end] was replaced by new[start:new_end]. Prefix and suffix
+    are found by binary search over slice comparisons, which run in C.
+    """
+    limit = min(len(old), len(new))
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[:mid] == new[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    start = lo
+    lo, hi = 0, limit - start
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return start, len(old) - lo, len(new) - lo
+
+
+def key_letters(key: str) -> str:
+    """The ASCII letters of a Vigenere key, the only ones the cipher uses."""
+    return ''.join(k for k in key if k.isascii() and k.isalpha())
+
+
+def local_transform(cipher: str, mode: str, key: str, text: str, key_index: int = 0) -> str:
+    """
+    Run a position-local cipher on a span of the input.
+
+    Args:
+        cipher: One of LOCAL_CIPHERS
+        mode: "Encrypt" or "Decrypt"
+        key: Key as typed in the key field
+        text: Span of the input text
+        key_index: Letters before the span (selects the Vigenere key letter)
+    """
+    if cipher == "Vigenere":
+        letters = key_letters(key)
+        if not letters:
+            raise ValueError("Vigenere key must contain letters")
+        shift = key_index % len(letters)
+        key = letters[shift:] + letters[:shift]
+    return run_cipher(cipher, mode, key, text)
+
+
+def format_key(cipher: str, key) -> str:
+    """A solver's key as typed into the key box."""
+    if cipher == "ADFGVX":
+        # The full square works as a Polybius keyword
+        return ','.join(key)
+    return str(key)
+
+
+class FileCancelled(Exception):
+    """Raised from the progress callback to stop a file job."""
+
+
+def process_file(src: str, dst: str, cipher: str, mode: str, key: str, progress=None) -> None:
+    """
+    Encrypt or decrypt the UTF-8 file src into dst.
+
+    Args:
+        src: Input file
+        dst: Output file
+        cipher, mode, key: As selected in the GUI
+        progress: Optional callback receiving (bytes done, file size)
+    """
+    # Validates the key before any output is written
+    run_cipher(cipher, mode, key, '')
+    if cipher in STREAM_CIPHERS:
+        stream_key = int(key) if cipher == "Caesar" else key
+        stream.process_file(src, dst, STREAM_CIPHERS[cipher], stream_key,
+                            decrypt=mode == "Decrypt", progress=progress)
+        return
+    if cipher == "Rail Fence":
+        transpose_key = int(key)
+    elif cipher == "ADFGVX":
+        transpose_key = tuple(map(str.strip, key.split(',', 1)))
+    else:
+        transpose_key = key
+    stream.transpose_file(src, dst, TRANSPOSE_CIPHERS[cipher], transpose_key,
+                          decrypt=mode == "Decrypt", progress=progress)
+
+
+def _remove_partial(job, dst: str) -> None:
+    """Delete the output of a file job that did not complete."""
+    if (job.cancelled() or job.exception() is not None) and os.path.exists(dst):
+        os.remove(dst)
+
+
+class PagedView(ttk.Frame):
+    """
+    Read-only view of a UTF-8 file of any size. The file is memory-mapped
+    and only the page on screen is decoded into the text widget; the
+    scrollbar and the page buttons move through the whole file.
+    """
+
+    def __init__(self, master, page_bytes: int = PAGE_BYTES):
+        super().__init__(master)
+        self.page_bytes = page_bytes
+        self.path = None
+        self._file = None
+        self._map = None
+        self.size = self.start = self.end = 0
+
+        nav = ttk.Frame(self)
+        nav.pack(side=tk.BOTTOM, fill=tk.X)
+        ttk.Button(nav, text="<", width=3, command=self.prev_page).pack(side=tk.LEFT)
+        ttk.Button(nav, text=">", width=3, command=self.next_page).pack(side=tk.LEFT)
+        self.position = ttk.Label(nav, text="")
+        self.position.pack(side=tk.LEFT, padx=(6, 0))
+        self.scrollbar = ttk.Scrollbar(self, command=self._on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text = tk.Text(self, height=12, state=tk.DISABLED)
+        self.text.pack(fill=tk.BOTH, expand=True)
+
+    def open(self, path: str):
+        self.close()
+        self.path = path
+        self._file = open(path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        # Empty files cannot be mapped
+        if self.size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.show(0)
+
+    def close(self):
+        """Release the mapping (needed before the file is rewritten)."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.path = None
+        self.size = self.start = self.end = 0
+        self._set_text('')
+        self.position.config(text="")
+
+    def show(self, offset: int, line_start: bool = False):
+        """Display the page starting at byte offset."""
+        if not self._map:
+            self._set_text('')
+            return
+        offset = max(0, min(offset, self.size - 1))
+        if line_start and offset:
+            newline = self._map.find(b'\n', offset, offset + 4096)
+            if newline != -1:
+                offset = min(newline + 1, self.size - 1)
+        # Pages start and end on UTF-8 character boundaries
+        while offset < self.size and self._map[offset] & 0xC0 == 0x80:
+            offset += 1
+        end = min(self.size, offset + self.page_bytes)
+        while offset < end < self.size and self._map[end] & 0xC0 == 0x80:
+            end -= 1
+        self.start, self.end = offset, end
+        self._set_text(self._map[offset:end].decode('utf-8', 'replace'))
+        self.scrollbar.set(offset / self.size, end / self.size)
+        self.position.config(text=f"bytes {offset:,}-{end:,} of {self.size:,}")
+
+    def next_page(self):
+        if self.end < self.size:
+            self.show(self.end)
+
+    def prev_page(self):
+        if self.start > 0:
+            self.show(self.start - self.page_bytes)
+
+    def page_text(self) -> str:
+        return self.text.get("1.0", "end-1c")
+
+    def _set_text(self, text: str):
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", text)
+        self.text.config(state=tk.DISABLED)
+
+    def _on_scroll(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.show(int(float(amount) * self.size), line_start=True)
+        elif unit == 'pages':
+            self.show(self.start + int(amount) * self.page_bytes)
+        else:
+            self.show(self.start + int(amount) * (self.page_bytes // 16), line_start=True)
 
 
 class CipherGUI(tk.Tk):
@@ -31,7 +350,26 @@ class CipherGUI(tk.Tk):
         super().__init__()
         self.title("Classic Ciphers - GUI")
         self.geometry("700x580")  # Made taller to accommodate instructions
+        # Live preview state: the input text the output mirrors character for
+        # character (None when it does not), the first output position still
+        # waiting for a rerun, and a counter that retires outdated reruns
+        self._live_source = None
+        self._dirty_from = None
+        self._generation = 0
+        self._after_id = None
+        self._job = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # File mode: the opened input file and the running file job
+        self._file_path = None
+        self._file_job = None
+        self._file_dst = None
+        self._file_progress = (0, 0)
+        self._cancel = threading.Event()
+        # Crack: the running solver and the latest snapshot its thread posted
+        self._solver = None
+        self._crack_snapshot = None
         self._build()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def update_key_instructions(self, event=None):
         instructions = {
@@ -64,14 +402,17 @@ class CipherGUI(tk.Tk):
         cipher_cb.pack(side=tk.LEFT, padx=(6, 12))
 
         self.mode_var = tk.StringVar(value="Encrypt")
-        ttk.Radiobutton(top, text="Encrypt", variable=self.mode_var, value="Encrypt").pack(side=tk.LEFT)
-        ttk.Radiobutton(top, text="Decrypt", variable=self.mode_var, value="Decrypt").pack(side=tk.LEFT)
+        ttk.Radiobutton(top, text="Encrypt", variable=self.mode_var, value="Encrypt",
+                        command=self.on_settings_changed).pack(side=tk.LEFT)
+        ttk.Radiobutton(top, text="Decrypt", variable=self.mode_var, value="Decrypt",
+                        command=self.on_settings_changed).pack(side=tk.LEFT)
 
         keyfrm = ttk.Frame(frm)
         keyfrm.pack(fill=tk.X)
         ttk.Label(keyfrm, text="Key:").pack(side=tk.LEFT)
         self.key_entry = ttk.Entry(keyfrm)
         self.key_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(6, 0))
+        self.key_entry.bind('<KeyRelease>', self.on_settings_changed)
 
         # Key instructions
         self.key_instructions = ttk.Label(frm, text="", wraplength=680)
@@ -79,6 +420,7 @@ class CipherGUI(tk.Tk):
         
         # Update key instructions when cipher is changed
         cipher_cb.bind('<<ComboboxSelected>>', self.update_key_instructions)
+        cipher_cb.bind('<<ComboboxSelected>>', self.on_settings_changed, add='+')
         self.update_key_instructions()
 
         mid = ttk.Frame(frm)
@@ -89,12 +431,15 @@ class CipherGUI(tk.Tk):
         ttk.Label(left, text="Input:").pack(anchor=tk.W)
         self.input_text = ScrolledText(left, height=12)
         self.input_text.pack(fill=tk.BOTH, expand=True)
+        self.input_text.bind('<<Modified>>', self.on_input_modified)
+        self.input_view = PagedView(left)
 
         right = ttk.Frame(mid)
         right.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         ttk.Label(right, text="Output:").pack(anchor=tk.W)
         self.output_text = ScrolledText(right, height=12)
         self.output_text.pack(fill=tk.BOTH, expand=True)
+        self.output_view = PagedView(right)
 
         btnfrm = ttk.Frame(frm)
         btnfrm.pack(fill=tk.X, pady=(8, 0))
@@ -104,101 +449,342 @@ class CipherGUI(tk.Tk):
         copy_btn = ttk.Button(btnfrm, text="Copy Output", command=self.copy_output)
         copy_btn.pack(side=tk.LEFT, padx=(6, 0))
 
+        open_btn = ttk.Button(btnfrm, text="Open File...", command=self.open_file)
+        open_btn.pack(side=tk.LEFT, padx=(6, 0))
+
+        self.save_btn = ttk.Button(btnfrm, text="Save Output...", command=self.save_output)
+        self.save_btn.pack(side=tk.LEFT, padx=(6, 0))
+
+        self.crack_btn = ttk.Button(btnfrm, text="Crack", command=self.on_crack)
+        self.crack_btn.pack(side=tk.LEFT, padx=(6, 0))
+
+        self.live_var = tk.BooleanVar(value=False)
+        live_cb = ttk.Checkbutton(btnfrm, text="Live preview", variable=self.live_var,
+                                  command=self.on_settings_changed)
+        live_cb.pack(side=tk.LEFT, padx=(12, 0))
+        self.status_label = ttk.Label(btnfrm, text="")
+        self.status_label.pack(side=tk.LEFT, padx=(6, 0))
+
         clear_btn = ttk.Button(btnfrm, text="Clear", command=self.clear_all)
         clear_btn.pack(side=tk.RIGHT)
 
     def on_run(self):
+        if self._file_path:
+            # A file is only processed straight to disk
+            self.save_output()
+            return
         cipher = self.cipher_var.get()
         mode = self.mode_var.get()
         key = self.key_entry.get().strip()
         text = self.input_text.get("1.0", tk.END).rstrip('\n')
         try:
-            if cipher == "Caesar":
-                if not key:
-                    raise ValueError("Enter integer key for Caesar cipher")
-                try:
-                    k = int(key)
-                except ValueError:
-                    raise ValueError("Caesar key must be an integer")
-                if mode == "Encrypt":
-                    out = caesar.encrypt(text, k)
-                else:
-                    out = caesar.decrypt(text, k)
-            elif cipher == "Vigenere":
-                if not key or not any(ch.isalpha() for ch in key):
-                    raise ValueError("Vigenere key must contain letters")
-                if mode == "Encrypt":
-                    out = vigenere.encrypt(text, key)
-                else:
-                    out = vigenere.decrypt(text, key)
-            elif cipher == "Hill":
-                # Hill expects a 4-letter key
-                if not key or not key.isalpha() or len(key) != 4:
-                    raise ValueError("Hill key must be 4 letters (2x2 matrix)")
-                if mode == "Encrypt":
-                    out = hill.encrypt(text, key)
-                else:
-                    out = hill.decrypt(text, key)
-            elif cipher == "Playfair":
-                if not key or not any(ch.isalpha() for ch in key):
-                    raise ValueError("Playfair key must contain letters")
-                if mode == "Encrypt":
-                    out = playfair.encrypt(text, key)
-                else:
-                    out = playfair.decrypt(text, key)
-            elif cipher == "Atbash":
-                # Atbash doesn't need a key
-                if mode == "Encrypt":
-                    out = atbash.encrypt(text)
-                else:
-                    out = atbash.decrypt(text)
-            elif cipher == "Rail Fence":
-                if not key:
-                    raise ValueError("Enter number of rails")
-                try:
-                    rails = int(key)
-                    if rails < 2:
-                        raise ValueError
-                except ValueError:
-                    raise ValueError("Rail Fence key must be an integer greater than 1")
-                if mode == "Encrypt":
-                    out = rail_fence.encrypt(text, rails)
-                else:
-                    out = rail_fence.decrypt(text, rails)
-            elif cipher == "ADFGVX":
-                if not key or ',' not in key:
-                    raise ValueError("ADFGVX requires two keys separated by comma")
-                polybius_key, columnar_key = map(str.strip, key.split(',', 1))
-                if not columnar_key:
-                    raise ValueError("Columnar key is required for ADFGVX")
-                if mode == "Encrypt":
-                    out = adfgvx.encrypt(text, polybius_key, columnar_key)
-                else:
-                    out = adfgvx.decrypt(text, polybius_key, columnar_key)
-            elif cipher == "Columnar":
-                if not key:
-                    raise ValueError("Enter a key for columnar transposition")
-                if mode == "Encrypt":
-                    out = columnar.encrypt(text, key)
-                else:
-                    out = columnar.decrypt(text, key)
-            elif cipher == "Autokey":
-                if not key:
-                    raise ValueError("Enter an initial key for Autokey cipher")
-                if mode == "Encrypt":
-                    out = autokey.encrypt(text, key)
-                else:
-                    out = autokey.decrypt(text, key)
-            else:
-                raise ValueError("Unsupported cipher")
+            out = run_cipher(cipher, mode, key, text)
         except Exception as e:
             messagebox.showerror("Error", str(e))
             return
+        # The output no longer mirrors the input character for character
+        self._live_source = None
         self.output_text.delete("1.0", tk.END)
         self.output_text.insert(tk.END, out)
 
+    def on_input_modified(self, event=None):
+        if not self.input_text.edit_modified():
+            return
+        # Reset the flag so the next edit fires <<Modified>> again
+        self.input_text.edit_modified(False)
+        if self.live_var.get():
+            self._live_edit()
+
+    def on_settings_changed(self, event=None):
+        """Cipher, key, mode or the live toggle changed: recompute everything."""
+        self._generation += 1
+        self._live_source = None
+        self._dirty_from = None
+        if not self.live_var.get() or self._file_path:
+            if self._after_id:
+                self.after_cancel(self._after_id)
+                self._after_id = None
+            self.status_label.config(text="")
+            return
+        self._schedule_rerun(0)
+
+    def _live_edit(self):
+        """Patch the output for the latest edit, or schedule a rerun."""
+        self._generation += 1
+        text = self.input_text.get("1.0", "end-1c")
+        cipher = self.cipher_var.get()
+        old = self._live_source
+        if cipher not in LOCAL_CIPHERS or old is None or self._output_length() != len(old):
+            self._live_source = None
+            self._schedule_rerun(0)
+            return
+        mode = self.mode_var.get()
+        key = self.key_entry.get().strip()
+        start, old_end, new_end = changed_span(old, text)
+        try:
+            key_index = count_letters(text[:start]) if cipher == "Vigenere" else 0
+            patch = local_transform(cipher, mode, key, text[start:new_end], key_index)
+        except Exception as e:
+            self._live_source = None
+            self.status_label.config(text=str(e))
+            return
+        self.output_text.delete(f"1.0 + {start} chars", f"1.0 + {old_end} chars")
+        self.output_text.insert(f"1.0 + {start} chars", patch)
+        self._live_source = text
+
+        dirty = self._dirty_from
+        if dirty is not None and dirty > start:
+            dirty = max(new_end, dirty + new_end - old_end)
+        if cipher == "Vigenere" and new_end < len(text):
+            # Adding or removing letters moves every later letter to another key
+            # letter; the tail is re-encrypted once typing pauses
+            delta = count_letters(text[start:new_end]) - count_letters(old[start:old_end])
+            if delta % len(key_letters(key)):
+                dirty = new_end if dirty is None else min(dirty, new_end)
+        self._dirty_from = dirty
+        if dirty is None:
+            self.status_label.config(text="Preview up to date")
+        else:
+            self._schedule_rerun(dirty)
+
+    def _output_length(self) -> int:
+        return int(self.output_text.tk.call(self.output_text._w, 'count', '-chars', '1.0', 'end-1c'))
+
+    def _schedule_rerun(self, start: int):
+        """Debounce: rerun from output position start once typing pauses."""
+        self._dirty_from = start if self._dirty_from is None else min(self._dirty_from, start)
+        if self._after_id:
+            self.after_cancel(self._after_id)
+        self._after_id = self.after(PREVIEW_DELAY_MS, self._start_rerun)
+        self.status_label.config(text="Updating preview...")
+
+    def _start_rerun(self):
+        self._after_id = None
+        if self._job is not None:
+            # One rerun at a time; try again when the running one finishes
+            self._after_id = self.after(PREVIEW_DELAY_MS, self._start_rerun)
+            return
+        text = self.input_text.get("1.0", "end-1c")
+        cipher = self.cipher_var.get()
+        mode = self.mode_var.get()
+        key = self.key_entry.get().strip()
+        if cipher in LOCAL_CIPHERS:
+            start = (self._dirty_from or 0) if self._live_source is not None else 0
+            key_index = count_letters(text[:start]) if cipher == "Vigenere" else 0
+            self._job = self._executor.submit(local_transform, cipher, mode, key, text[start:],
+                                              key_index)
+            source = text
+        else:
+            # Same text as the Run button, so the result matches it exactly
+            start, source = 0, None
+            self._job = self._executor.submit(run_cipher, cipher, mode, key, text.rstrip('\n'))
+        # The cipher runs in a worker thread; poll so Tk is only touched here
+        self.after(_POLL_MS, self._finish_rerun, self._generation, start, source)
+
+    def _finish_rerun(self, generation: int, start: int, source):
+        if not self._job.done():
+            self.after(_POLL_MS, self._finish_rerun, generation, start, source)
+            return
+        job, self._job = self._job, None
+        if generation != self._generation or not self.live_var.get():
+            # Edited again meanwhile; that edit scheduled its own rerun
+            return
+        try:
+            out = job.result()
+        except Exception as e:
+            self._live_source = None
+            self._dirty_from = None
+            self.status_label.config(text=str(e))
+            return
+        self.output_text.delete(f"1.0 + {start} chars", tk.END)
+        self.output_text.insert(tk.END, out)
+        self._live_source = source
+        self._dirty_from = None
+        self.status_label.config(text="Preview up to date")
+
+    def on_crack(self):
+        if self._solver is not None:
+            self._solver.cancel()
+            return
+        cipher = self.cipher_var.get()
+        if cipher not in CRACK_SOLVERS or self._file_path:
+            messagebox.showerror("Error", "Crack works on typed Rail Fence, Columnar, "
+                                          "ADFGVX or Autokey ciphertext")
+            return
+        text = self.input_text.get("1.0", tk.END).rstrip('\n')
+        try:
+            # In-process: a worker thread keeps Tk responsive without forking it
+            solver = solvers.solver(CRACK_SOLVERS[cipher], text, seconds=CRACK_SECONDS,
+                                    workers=1)
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self._solver = solver
+        self._crack_snapshot = None
+        self.crack_btn.config(text="Stop")
+        threading.Thread(target=self._crack_worker, args=(solver,), daemon=True).start()
+        self.after(_POLL_MS, self._poll_crack, solver, None)
+
+    def _crack_worker(self, solver):
+        # Runs in its own thread: only record snapshots for the poll
+        try:
+            for snap in solver:
+                self._crack_snapshot = snap
+        except Exception as e:
+            self._crack_snapshot = e
+
+    def _poll_crack(self, solver, shown):
+        if solver is not self._solver:
+            return
+        snap = self._crack_snapshot
+        if isinstance(snap, Exception):
+            self._stop_crack()
+            messagebox.showerror("Error", str(snap))
+            return
+        if snap is not None and snap.key is not None and snap.key != shown:
+            shown = snap.key
+            self._live_source = None
+            self.output_text.delete("1.0", tk.END)
+            self.output_text.insert(tk.END, snap.plaintext)
+        if snap is not None:
+            state = "Best key" if snap.done else f"Cracking ({snap.stage})..."
+            self.status_label.config(text=f"{state} score {snap.score:.0f}, "
+                                          f"{snap.keys_per_second:,.0f} keys/s, {snap.elapsed:.0f}s")
+        if snap is None or not snap.done:
+            self.after(100, self._poll_crack, solver, shown)
+            return
+        self._stop_crack()
+        if snap.key is not None:
+            cipher = self.cipher_var.get()
+            key = format_key(cipher, snap.key)
+            self.key_entry.delete(0, tk.END)
+            self.key_entry.insert(0, key)
+            self.mode_var.set("Decrypt")
+            # The solver's plaintext is letters only; show the cipher's own output
+            text = self.input_text.get("1.0", tk.END).rstrip('\n')
+            try:
+                out = run_cipher(cipher, "Decrypt", key, text)
+            except Exception:
+                return
+            self.output_text.delete("1.0", tk.END)
+            self.output_text.insert(tk.END, out)
+
+    def _stop_crack(self):
+        if self._solver is not None:
+            self._solver.cancel()
+        self._solver = None
+        self.crack_btn.config(text="Crack")
+
+    def open_file(self):
+        path = filedialog.askopenfilename(title="Open input file")
+        if not path:
+            return
+        self._file_path = path
+        self._show_pane(self.input_text, self.input_view)
+        self.input_view.open(path)
+        self.status_label.config(text=f"{os.path.basename(path)}: {self.input_view.size:,} bytes")
+
+    def save_output(self):
+        if self._file_job is not None:
+            # The button reads Cancel while a file job runs
+            self._cancel.set()
+            self.status_label.config(text="Cancelling...")
+            return
+        dst = filedialog.asksaveasfilename(title="Save output as")
+        if not dst:
+            return
+        if not self._file_path:
+            with open(dst, 'w', encoding='utf-8') as fh:
+                fh.write(self.output_text.get("1.0", tk.END).rstrip('\n'))
+            self.status_label.config(text=f"Saved {os.path.basename(dst)}")
+            return
+        if os.path.abspath(dst) == os.path.abspath(self._file_path):
+            messagebox.showerror("Error", "Choose an output file different from the input")
+            return
+        cipher = self.cipher_var.get()
+        mode = self.mode_var.get()
+        key = self.key_entry.get().strip()
+        try:
+            run_cipher(cipher, mode, key, '')
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        # Release any mapping of a previous output before it is overwritten
+        self.output_view.close()
+        self._cancel.clear()
+        self._file_progress = (0, self.input_view.size)
+        self._file_job = self._executor.submit(process_file, self._file_path, dst, cipher,
+                                               mode, key, self._on_file_progress)
+        self._file_dst = dst
+        self.save_btn.config(text="Cancel")
+        self.after(_POLL_MS, self._finish_file, dst, time.perf_counter())
+
+    def _on_file_progress(self, done: int, size: int):
+        # Runs in the worker thread: only record the numbers for the poll
+        self._file_progress = (done, size)
+        if self._cancel.is_set():
+            raise FileCancelled()
+
+    def _finish_file(self, dst: str, started: float):
+        job = self._file_job
+        if not job.done():
+            done, size = self._file_progress
+            percent = 100 * done / size if size else 0
+            self.status_label.config(text=f"Processing... {percent:.0f}%")
+            self.after(100, self._finish_file, dst, started)
+            return
+        self._file_job = self._file_dst = None
+        self.save_btn.config(text="Save Output...")
+        try:
+            job.result()
+        except Exception as e:
+            if os.path.exists(dst):
+                os.remove(dst)
+            if not isinstance(e, FileCancelled):
+                messagebox.showerror("Error", str(e))
+            self.status_label.config(text="")
+            return
+        if self._cancel.is_set():
+            # Cancelled after the last progress call: drop the finished output too
+            if os.path.exists(dst):
+                os.remove(dst)
+            self.status_label.config(text="")
+            return
+        elapsed = time.perf_counter() - started
+        size = self.input_view.size
+        self._show_pane(self.output_text, self.output_view)
+        self.output_view.open(dst)
+        self.status_label.config(text=f"Wrote {os.path.basename(dst)}: {size / 1e6:.1f} MB "
+                                      f"in {elapsed:.1f}s")
+
+    def _show_pane(self, text_widget, view: PagedView):
+        """Swap a pane from its text box to its paged file view."""
+        text_widget.pack_forget()
+        view.pack(fill=tk.BOTH, expand=True)
+
+    def _show_text_panes(self):
+        for text_widget, view in ((self.input_text, self.input_view),
+                                  (self.output_text, self.output_view)):
+            view.close()
+            view.pack_forget()
+            text_widget.pack(fill=tk.BOTH, expand=True)
+
+    def on_close(self):
+        self._cancel.set()
+        self._stop_crack()
+        if self._file_job is not None:
+            # _finish_file will not run after destroy(); the job stops at its
+            # next chunk and the worker removes what it wrote
+            self._file_job.add_done_callback(
+                lambda job, dst=self._file_dst: _remove_partial(job, dst))
+        self.destroy()
+
     def copy_output(self):
-        out = self.output_text.get("1.0", tk.END).rstrip('\n')
+        if self.output_view.path:
+            # Only the page on screen; whole output files stay on disk
+            out = self.output_view.page_text()
+        else:
+            out = self.output_text.get("1.0", tk.END).rstrip('\n')
         self.clipboard_clear()
         self.clipboard_append(out)
         messagebox.showinfo("Copied", "Output copied to clipboard")
@@ -207,6 +793,11 @@ class CipherGUI(tk.Tk):
         self.input_text.delete("1.0", tk.END)
         self.output_text.delete("1.0", tk.END)
         self.key_entry.delete(0, tk.END)
+        self._live_source = None
+        self._cancel.set()
+        self._stop_crack()
+        self._file_path = None
+        self._show_text_panes()
 
 
 def main():